@@ -1,27 +1,70 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from fastapi import Request, HTTPException
 from jose import jwt, JWTError
-from app.core.config import JWT_SECRET_KEY, JWT_ALGORITHM
+from app.core.config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_CLAIMS_CACHE_SIZE
+from app.core.principals import require_active
 
-def get_current_user(request: Request):
-    token = request.cookies.get("access_token")
+# Verified token -> claims, keyed by token hash. Entries are dropped once
+# the token's `exp` passes, so a cache hit is never more permissive than
+# a fresh jwt.decode.
+_claims_cache: OrderedDict[bytes, dict] = OrderedDict()
+_claims_cache_lock = threading.Lock()
 
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+
+def _decode_token(token: str) -> dict | None:
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+
+    with _claims_cache_lock:
+        claims = _claims_cache.get(key)
+        if claims is not None:
+            if claims.get("exp", 0) > now:
+                _claims_cache.move_to_end(key)
+                return claims
+            del _claims_cache[key]
 
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
+        claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
     except JWTError:
+        return None
+
+    with _claims_cache_lock:
+        _claims_cache[key] = claims
+        if len(_claims_cache) > JWT_CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+
+    return claims
+
+
+def get_token_claims(request: Request) -> dict | None:
+    """
+    Decode the access_token cookie at most once per request; the rate
+    limiter key function and the auth dependencies share the result.
+    """
+    if not hasattr(request.state, "token_claims"):
+        token = request.cookies.get("access_token")
+        request.state.token_claims = _decode_token(token) if token else None
+
+    return request.state.token_claims
+
+
+async def get_current_user(request: Request):
+    if not request.cookies.get("access_token"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    payload = get_token_claims(request)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    # The token outlives a deactivation; the principal cache does not
+    # (app/core/principals.py), so access ends within its TTL
+    await require_active(payload)
 
-def get_current_user_optional(request: Request):
-    token = request.cookies.get("access_token")
-    if not token:
-        return None
+    return payload
 
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload  # contains user_id / role etc
-    except JWTError:
-        return None
+
+def get_current_user_optional(request: Request):
+    return get_token_claims(request)  # contains user_id / role etc
@@ -0,0 +1,183 @@
+"""
+Read-through cache for task list pages.
+
+Entries are keyed by a per-scope version, where a scope is one user's view
+of the list: ("tasks", company_id, role, user_id). Mutations bump the
+version of every scope they touch, which invalidates all of that user's
+cached pages in O(1); the orphaned entries age out through TTL / LRU.
+
+Backends, chosen with TASK_LIST_CACHE_URI:
+- memory://                  per-process OrderedDict with LRU eviction
+- sqlite:///./cache.sqlite   shared by all workers on one host
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from app.core.config import TASK_LIST_CACHE_URI, TASK_LIST_CACHE_TTL_SECONDS, TASK_LIST_CACHE_MAX_ENTRIES
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self.versions: dict[tuple, int] = {}
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value, ttl: float):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def version(self, scope: tuple) -> int:
+        return self.versions.get(scope, 0)
+
+    def bump(self, scope: tuple):
+        with self.lock:
+            self.versions[scope] = self.versions.get(scope, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.versions.clear()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+class SQLiteCacheBackend:
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.evictions = 0
+        self.writes = 0
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_versions ("
+            " scope TEXT PRIMARY KEY, version INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: float):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=_json_default), time.time() + ttl)
+        )
+
+        # Trim occasionally: expired rows first, then the soonest-to-expire
+        self.writes += 1
+        if self.writes % 500 == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            self.evictions += conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                " SELECT key FROM cache_entries ORDER BY expires_at"
+                " LIMIT max(0, (SELECT count(*) FROM cache_entries) - ?))",
+                (self.max_entries,)
+            ).rowcount
+
+    def version(self, scope: tuple) -> int:
+        row = self._conn().execute(
+            "SELECT version FROM cache_versions WHERE scope = ?", (repr(scope),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, scope: tuple):
+        self._conn().execute(
+            "INSERT INTO cache_versions (scope, version) VALUES (?, 1) "
+            "ON CONFLICT(scope) DO UPDATE SET version = version + 1",
+            (repr(scope),)
+        )
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_versions")
+
+
+def _backend_from_uri(uri: str):
+    if uri.startswith("sqlite://"):
+        # Same convention as SQLAlchemy: sqlite:///relative, sqlite:////absolute
+        return SQLiteCacheBackend(uri.split("://", 1)[1][1:], TASK_LIST_CACHE_MAX_ENTRIES)
+    return MemoryCacheBackend(TASK_LIST_CACHE_MAX_ENTRIES)
+
+
+_backend = _backend_from_uri(TASK_LIST_CACHE_URI)
+
+# Hit/miss counters for this process
+cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def task_list_scope(company_id: int, role: str, user_id: int) -> tuple:
+    return ("tasks", company_id, role, user_id)
+
+
+def task_list_key(scope: tuple, *parts) -> str:
+    return ":".join(str(p) for p in (*scope, _backend.version(scope), *parts))
+
+
+def get_task_list(key: str):
+    value = _backend.get(key)
+    cache_stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def set_task_list(key: str, value):
+    _backend.set(key, value, TASK_LIST_CACHE_TTL_SECONDS)
+
+
+def invalidate_task_lists(company_id: int, manager_ids=(), reportee_ids=()):
+    for manager_id in set(manager_ids) - {None}:
+        _backend.bump(task_list_scope(company_id, "MANAGER", manager_id))
+        cache_stats["invalidations"] += 1
+    for reportee_id in set(reportee_ids) - {None}:
+        _backend.bump(task_list_scope(company_id, "REPORTEE", reportee_id))
+        cache_stats["invalidations"] += 1
+
+
+def get_cache_stats() -> dict:
+    return {**cache_stats, "evictions": _backend.evictions}
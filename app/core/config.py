@@ -9,20 +9,136 @@ JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30)
 )
-BCRYPT_ROUNDS = 12
+
+# Max verified tokens kept in the per-process claims cache
+JWT_CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", 10000))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# bcrypt runs in a dedicated process pool; once MAX_PENDING hashes are
+# queued or running, new login/signup requests get a fast 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+# Reportee imports hash in their own, smaller pool, so a large import
+# never takes the workers or queue slots that logins need
+PASSWORD_HASH_IMPORT_WORKERS = int(os.getenv("PASSWORD_HASH_IMPORT_WORKERS", max(1, PASSWORD_HASH_WORKERS // 4)))
 
 class RateLimits:
     signup = "1/minute"
     login = "3/minute"
     create_reportee = "20/minute"
+    create_reportee_bulk = "2/minute"
+    reportee_import_status = "30/minute"
     task_list = "5/minute"
+    task_detail = "30/minute"
+    task_events = "10/minute"
+    task_changes = "30/minute"
+    task_stats = "30/minute"
+    task_team = "10/minute"
+    team = "30/minute"
     task_assign = "2/minute"
     task_delete = "1/minute"
     task_status_update = "3/minute"
     task_status_self_update = "5/minute"
     task_create = "10/minute"
+    # Bulk endpoints are charged per item, not per request. A batch is one
+    # transaction whatever its size, so 400 items/minute is two full
+    # batches (TASK_BULK_MAX_ITEMS) a minute: about the write transactions
+    # the single-item limits above allow, not 400 times as many.
+    task_bulk_create = "400/minute"
+    task_bulk_assign = "400/minute"
+    task_bulk_status_update = "400/minute"
 
 RATE_LIMITS = RateLimits()
 
+# Where limiter counters live. memory:// is per-process; use
+# sqlite:///./rate_limits.sqlite to share them between workers on one host,
+# or redis://host:6379 (needs the `redis` package) across hosts.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+# Only for load tests / benchmarks; never turn this off in production
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+
+# Default GET /tasks page size; clients may ask for up to TASK_LIST_MAX_PAGE_SIZE
+TASK_LIST_PAGINATION_SIZE = int(os.getenv("TASK_LIST_PAGINATION_SIZE", 5))
+TASK_LIST_MAX_PAGE_SIZE = int(os.getenv("TASK_LIST_MAX_PAGE_SIZE", 100))
+
+# Members per GET /users/me/team page
+TEAM_PAGE_SIZE = int(os.getenv("TEAM_PAGE_SIZE", 50))
+
+# Max rows accepted by a single POST /users/reportees/bulk import
+REPORTEE_BULK_MAX_ROWS = 1000
+# Rows hashed per process-pool job; job progress is saved after each chunk
+REPORTEE_BULK_CHUNK_SIZE = 25
+
+# Max items accepted by a single /tasks/bulk* request
+TASK_BULK_MAX_ITEMS = 200
+
+# Read-through cache for GET /tasks pages (memory:// or sqlite:///path)
+TASK_LIST_CACHE_URI = os.getenv("TASK_LIST_CACHE_URI", "memory://")
+TASK_LIST_CACHE_TTL_SECONDS = int(os.getenv("TASK_LIST_CACHE_TTL_SECONDS", 30))
+TASK_LIST_CACHE_MAX_ENTRIES = int(os.getenv("TASK_LIST_CACHE_MAX_ENTRIES", 10000))
+
+# Per-process cache of user principals (company, role, is_active, manager)
+# behind the auth check and the "is this my company's reportee" lookups. A
+# deactivation made elsewhere takes effect within the TTL
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 50000))
+
+# Max changes returned per GET /tasks/changes call (has_more tells the client to call again)
+TASK_SYNC_BATCH_SIZE = int(os.getenv("TASK_SYNC_BATCH_SIZE", 500))
+
+# How long a cached task total may be served for cursor pagination
+TASK_COUNT_CACHE_TTL_SECONDS = int(os.getenv("TASK_COUNT_CACHE_TTL_SECONDS", 30))
+TASK_COUNT_CACHE_MAX_ENTRIES = int(os.getenv("TASK_COUNT_CACHE_MAX_ENTRIES", 10000))
+
+# Startup. With several workers, run `python -m app.db.migrations` once in the
+# deploy step and set RUN_MIGRATIONS_ON_STARTUP=false so workers start faster
+# and don't race each other on the schema.
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+DB_CHECK_ON_STARTUP = os.getenv("DB_CHECK_ON_STARTUP", "true").lower() == "true"
+
+# Tenant sharding (DB_SHARD_URLS, app/db/sharding.py). Workers cache which
+# shard a company lives on for SHARD_MAP_TTL_SECONDS, which is also how long
+# a company move waits before copying. Task ids are taken from the
+# directory SHARD_ID_BLOCK_SIZE at a time.
+SHARD_MAP_TTL_SECONDS = float(os.getenv("SHARD_MAP_TTL_SECONDS", 5))
+SHARD_ID_BLOCK_SIZE = int(os.getenv("SHARD_ID_BLOCK_SIZE", 1000))
+
+# Read-your-writes: for this long after a client's own mutation its reads
+# skip the read pool (DB_READ_ROUTING) and go to the writer, so a replica
+# that lags behind never shows it data older than its own change
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# /metrics: statements slower than this are logged and counted; a request
+# that runs the same statement this many times is flagged as a likely N+1
+METRICS_SLOW_QUERY_MS = int(os.getenv("METRICS_SLOW_QUERY_MS", 200))
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", 10))
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Optional single-writer group commit for task status updates
+# (app/core/write_queue.py). One writer applies every update queued within
+# TASK_WRITE_BATCH_WINDOW_MS (at most TASK_WRITE_BATCH_MAX) in one
+# transaction: a longer window means fewer commits but adds up to that much
+# latency per request. TASK_WRITE_SYNCHRONOUS sets PRAGMA synchronous for
+# those commits (e.g. FULL: acknowledged updates survive power loss, at one
+# fsync per batch instead of per request); empty keeps the engine's setting.
+TASK_WRITE_QUEUE_ENABLED = os.getenv("TASK_WRITE_QUEUE_ENABLED", "false").lower() == "true"
+TASK_WRITE_BATCH_WINDOW_MS = float(os.getenv("TASK_WRITE_BATCH_WINDOW_MS", 2))
+TASK_WRITE_BATCH_MAX = int(os.getenv("TASK_WRITE_BATCH_MAX", 64))
+TASK_WRITE_SYNCHRONOUS = os.getenv("TASK_WRITE_SYNCHRONOUS", "")
 
-TASK_LIST_PAGINATION_SIZE = 5
\ No newline at end of file
+# Task change feed (GET /tasks/events)
+# memory: events fan out inside this process only
+# database: every worker polls the task_events log, so events reach
+#           subscribers connected to any worker
+TASK_EVENT_BROKER = os.getenv("TASK_EVENT_BROKER", "memory")
+TASK_EVENT_POLL_INTERVAL_MS = int(os.getenv("TASK_EVENT_POLL_INTERVAL_MS", 500))
+TASK_EVENT_QUEUE_SIZE = int(os.getenv("TASK_EVENT_QUEUE_SIZE", 100))
+TASK_EVENT_REPLAY_LIMIT = int(os.getenv("TASK_EVENT_REPLAY_LIMIT", 500))
+TASK_EVENT_HEARTBEAT_SECONDS = int(os.getenv("TASK_EVENT_HEARTBEAT_SECONDS", 15))
+TASK_EVENT_RETENTION_HOURS = int(os.getenv("TASK_EVENT_RETENTION_HOURS", 72))
+# How often each worker deletes events older than the retention window
+TASK_EVENT_PRUNE_INTERVAL_SECONDS = int(os.getenv("TASK_EVENT_PRUNE_INTERVAL_SECONDS", 3600))
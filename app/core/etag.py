@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import dialect_insert
+from app.models.task_list_version import TaskListVersion
+
+_TASK_ETAG_TIME_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+# ---- Task list versions ----
+
+async def get_task_list_version(db: AsyncSession, company_id: int, role: str, user_id: int) -> int:
+    version = await db.scalar(
+        select(TaskListVersion.version).where(
+            TaskListVersion.company_id == company_id,
+            TaskListVersion.role == role,
+            TaskListVersion.user_id == user_id
+        )
+    )
+    return version or 0
+
+
+async def bump_task_list_versions(db: AsyncSession, company_id: int, manager_ids=(), reportee_ids=()):
+    """
+    Must run inside the mutation's transaction (before commit), so the new
+    version becomes visible exactly when the change does.
+    """
+    rows = sorted(
+        [{"company_id": company_id, "role": "MANAGER", "user_id": uid} for uid in set(manager_ids) - {None}]
+        + [{"company_id": company_id, "role": "REPORTEE", "user_id": uid} for uid in set(reportee_ids) - {None}],
+        key=lambda row: (row["role"], row["user_id"])
+    )
+    if not rows:
+        return
+
+    insert = dialect_insert(db)
+    stmt = insert(TaskListVersion).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["company_id", "role", "user_id"],
+            set_={"version": TaskListVersion.version + 1, "updated_at": datetime.utcnow()}
+        )
+    )
+
+
+# ---- ETag helpers ----
+
+def list_etag(*parts) -> str:
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def task_etag(task_id: int, updated_at: datetime) -> str:
+    return f'"{task_id}-{updated_at.strftime(_TASK_ETAG_TIME_FORMAT)}"'
+
+
+def _header_etags(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in value.split(",")]
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True when the client already has this representation (send 304)."""
+    tags = _header_etags(request.headers.get("if-none-match"))
+    return "*" in tags or etag in tags
+
+
+def check_if_match(request: Request, current_etag: str):
+    """Reject the write with 412 if the client's copy is stale."""
+    tags = _header_etags(request.headers.get("if-match"))
+    if tags and "*" not in tags and current_etag not in tags:
+        raise HTTPException(
+            status_code=412,
+            detail="Task was modified by someone else; refetch and retry"
+        )
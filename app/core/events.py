@@ -0,0 +1,263 @@
+"""
+Task change feed: an in-process fan-out hub plus a pluggable broker.
+
+Routes add TaskEvent rows inside their transaction (`task_event`) and hand
+them to the broker after commit (`publish_task_events`). The broker
+delivers them to the hub of every worker; the hub pushes each event to the
+bounded queues of the subscribers allowed to see it.
+
+A subscriber whose queue fills up is not allowed to slow anyone down: its
+queue is dropped and it is told to reconnect, resuming from the persisted
+log with Last-Event-ID.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, or_, select
+from app.db.sharding import shards, tenant_session
+from app.models.task_event import TaskEvent
+from app.core.config import (
+    TASK_EVENT_BROKER,
+    TASK_EVENT_POLL_INTERVAL_MS,
+    TASK_EVENT_PRUNE_INTERVAL_SECONDS,
+    TASK_EVENT_QUEUE_SIZE,
+    TASK_EVENT_REPLAY_LIMIT,
+    TASK_EVENT_RETENTION_HOURS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Put on a subscriber's queue when it fell behind; the stream then closes
+LAGGED = None
+
+
+def task_event(event_type: str, task_id: int, company_id: int, created_by_id: int,
+               assigned_to_id: int | None, status: str | None, change_seq: int,
+               previous_assigned_to_id: int | None = None) -> TaskEvent:
+    return TaskEvent(
+        type=event_type,
+        task_id=task_id,
+        company_id=company_id,
+        created_by_id=created_by_id,
+        assigned_to_id=assigned_to_id,
+        previous_assigned_to_id=previous_assigned_to_id,
+        status=status,
+        change_seq=change_seq
+    )
+
+
+async def insert_task_events(db, events: list[TaskEvent]):
+    """
+    Write a batch of events with one multi-row INSERT and fill in their ids
+    (db.add_all would flush one INSERT ... RETURNING per event on SQLite).
+    Rows come back unordered, so each event needs its own change_seq.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for event in events:
+        event.created_at = now
+        rows.append({column.key: getattr(event, column.key) for column in TaskEvent.__table__.columns if column.key != "id"})
+
+    ids = dict((await db.execute(insert(TaskEvent).returning(TaskEvent.change_seq, TaskEvent.id), rows)).all())
+    for event in events:
+        event.id = ids[event.change_seq]
+
+
+def serialize_event(event: TaskEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.type,
+        "company_id": event.company_id,
+        "task_id": event.task_id,
+        "status": event.status,
+        "created_by_id": event.created_by_id,
+        "assigned_to_id": event.assigned_to_id,
+        "previous_assigned_to_id": event.previous_assigned_to_id,
+        "change_seq": event.change_seq,
+        "created_at": event.created_at.isoformat() if event.created_at else None
+    }
+
+
+def event_audience(event: dict) -> list[tuple]:
+    # Managers see events for tasks they created, reportees for tasks
+    # assigned to them (including a task being reassigned away)
+    company_id = event["company_id"]
+    scopes = [(company_id, "MANAGER", event["created_by_id"])]
+    for reportee_id in {event["assigned_to_id"], event["previous_assigned_to_id"]} - {None}:
+        scopes.append((company_id, "REPORTEE", reportee_id))
+    return scopes
+
+
+def audience_filter(company_id: int, role: str, user_id: int):
+    if role == "MANAGER":
+        visible = TaskEvent.created_by_id == user_id
+    else:
+        visible = or_(TaskEvent.assigned_to_id == user_id, TaskEvent.previous_assigned_to_id == user_id)
+    return (TaskEvent.company_id == company_id, visible)
+
+
+async def replay_events(company_id: int, role: str, user_id: int, after_id: int) -> list[dict]:
+    """One page (TASK_EVENT_REPLAY_LIMIT) of the caller's events after `after_id`; page until a short one."""
+    async with tenant_session(company_id, read=True) as db:
+        events = await db.scalars(
+            select(TaskEvent)
+            .where(TaskEvent.id > after_id, *audience_filter(company_id, role, user_id))
+            .order_by(TaskEvent.id)
+            .limit(TASK_EVENT_REPLAY_LIMIT)
+        )
+        return [serialize_event(event) for event in events]
+
+
+# ---- Hub ----
+
+class Subscriber:
+    def __init__(self, scope: tuple):
+        self.scope = scope
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=TASK_EVENT_QUEUE_SIZE)
+        self.lagged = False
+
+
+class TaskEventHub:
+    def __init__(self):
+        self.subscribers: dict[tuple, set[Subscriber]] = {}
+
+    def subscribe(self, company_id: int, role: str, user_id: int) -> Subscriber:
+        subscriber = Subscriber((company_id, role, user_id))
+        self.subscribers.setdefault(subscriber.scope, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.subscribers.get(subscriber.scope)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.scope]
+
+    def dispatch(self, event: dict):
+        for scope in event_audience(event):
+            for subscriber in self.subscribers.get(scope, ()):
+                if subscriber.lagged:
+                    continue
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Backpressure: drop the backlog, tell the client to resume from the log
+                    subscriber.lagged = True
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.queue.put_nowait(LAGGED)
+
+
+hub = TaskEventHub()
+
+
+# ---- Brokers ----
+
+class InProcessBroker:
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, events: list[dict]):
+        for event in events:
+            hub.dispatch(event)
+
+
+class DatabasePollingBroker:
+    """
+    Multi-worker broker that needs nothing beyond the database: every
+    worker tails the task_events log (of every shard) and feeds its own hub.
+    """
+
+    def __init__(self):
+        self.last_ids = {}  # shard index -> last event id seen
+        self.task: asyncio.Task | None = None
+
+    async def start(self):
+        for shard in shards:
+            async with shard.session() as db:
+                self.last_ids[shard.index] = await db.scalar(select(func.max(TaskEvent.id))) or 0
+        self.task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def publish(self, events: list[dict]):
+        # Delivered by the poll loop, the same path other workers use
+        pass
+
+    async def _poll(self):
+        while True:
+            for shard in shards:
+                try:
+                    async with shard.session() as db:
+                        events = (await db.scalars(
+                            select(TaskEvent)
+                            .where(TaskEvent.id > self.last_ids[shard.index])
+                            .order_by(TaskEvent.id)
+                            .limit(1000)
+                        )).all()
+                        for event in events:
+                            hub.dispatch(serialize_event(event))
+                            self.last_ids[shard.index] = event.id
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Task event poll failed (shard %d)", shard.index)
+
+            await asyncio.sleep(TASK_EVENT_POLL_INTERVAL_MS / 1000)
+
+
+BROKERS = {
+    "memory": InProcessBroker,
+    "database": DatabasePollingBroker,
+}
+
+broker = BROKERS[TASK_EVENT_BROKER]()
+
+
+# ---- Retention ----
+
+async def prune_task_events(db):
+    cutoff = datetime.utcnow() - timedelta(hours=TASK_EVENT_RETENTION_HOURS)
+    await db.execute(delete(TaskEvent).where(TaskEvent.created_at < cutoff))
+    await db.commit()
+
+
+async def _prune_loop():
+    # Whatever the broker: the log is written by every route either way
+    while True:
+        for shard in shards:
+            try:
+                async with shard.session() as db:
+                    await prune_task_events(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task event pruning failed (shard %d)", shard.index)
+        await asyncio.sleep(TASK_EVENT_PRUNE_INTERVAL_SECONDS)
+
+
+_pruner: asyncio.Task | None = None
+
+
+async def start_event_pruning():
+    global _pruner
+    _pruner = asyncio.create_task(_prune_loop())
+
+
+async def stop_event_pruning():
+    global _pruner
+    if _pruner:
+        _pruner.cancel()
+        _pruner = None
+
+
+def publish_task_events(events: list[TaskEvent]):
+    """Call after commit, once the events have ids."""
+    broker.publish([serialize_event(event) for event in events])
@@ -0,0 +1,89 @@
+"""
+Reporting hierarchy as a closure table (user_hierarchy).
+
+Every user has a row (self, self, 0) plus one row per manager above them,
+written when the user is created. Reading a team, at any depth, is then
+a range read on ix_user_hierarchy_subtree; writing a user costs one row
+per level above them.
+"""
+
+from sqlalchemy import delete, func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.models.user_hierarchy import UserHierarchy
+
+
+async def add_to_hierarchy(db: AsyncSession, company_id: int, user_ids: list[int], manager_id: int | None = None):
+    """
+    Attach newly created users under `manager_id` (None for top-level
+    managers). Call in the transaction that inserts the users.
+    """
+    ancestors = []
+    if manager_id is not None:
+        ancestors = (await db.execute(manager_chain_query(manager_id))).all()
+
+    rows = []
+    for user_id in user_ids:
+        rows.append({"ancestor_id": user_id, "descendant_id": user_id, "company_id": company_id, "depth": 0})
+        rows.extend(
+            {"ancestor_id": ancestor_id, "descendant_id": user_id, "company_id": company_id, "depth": depth + 1}
+            for ancestor_id, depth in ancestors
+        )
+
+    if rows:
+        await db.execute(insert(UserHierarchy), rows)
+
+
+def manager_chain_query(user_id: int):
+    """`user_id` and everyone above them, with their distance (ix_user_hierarchy_ancestors)."""
+    return select(UserHierarchy.ancestor_id, UserHierarchy.depth).where(
+        UserHierarchy.descendant_id == user_id
+    )
+
+
+def _subtree(manager_id: int) -> tuple:
+    return (UserHierarchy.ancestor_id == manager_id, UserHierarchy.depth > 0)
+
+
+def team_size_query(manager_id: int):
+    # Users never move between companies, so the subtree is already
+    # tenant-scoped and the count stays on the index
+    return select(func.count()).select_from(UserHierarchy).where(*_subtree(manager_id))
+
+
+def team_members_query(manager_id: int, after: tuple | None = None):
+    """Everyone below `manager_id`, nearest levels first, after a (depth, id) keyset cursor."""
+    query = (
+        select(User.id, User.username, User.role, User.manager_id, User.is_active, UserHierarchy.depth)
+        .join(UserHierarchy, UserHierarchy.descendant_id == User.id)
+        .where(*_subtree(manager_id))
+        .order_by(UserHierarchy.depth, UserHierarchy.descendant_id)
+    )
+    if after is not None:
+        query = query.where(tuple_(UserHierarchy.depth, UserHierarchy.descendant_id) > after)
+    return query
+
+
+def team_member_ids(manager_id: int):
+    """Subquery of everyone below `manager_id`, at any depth."""
+    return select(UserHierarchy.descendant_id).where(*_subtree(manager_id))
+
+
+# Rebuilt from users.manager_id; only the migration and the benchmark
+# seeder need the recursive walk
+_REBUILD = text("""
+    WITH RECURSIVE chain (ancestor_id, descendant_id, company_id, depth) AS (
+        SELECT id, id, company_id, 0 FROM users
+        UNION ALL
+        SELECT users.manager_id, chain.descendant_id, chain.company_id, chain.depth + 1
+        FROM chain JOIN users ON users.id = chain.ancestor_id
+        WHERE users.manager_id IS NOT NULL
+    )
+    INSERT INTO user_hierarchy (ancestor_id, descendant_id, company_id, depth)
+    SELECT ancestor_id, descendant_id, company_id, depth FROM chain
+""")
+
+
+def rebuild_hierarchy(conn):
+    conn.execute(delete(UserHierarchy))
+    conn.execute(_REBUILD)
@@ -0,0 +1,252 @@
+"""
+In-process request/DB metrics, rendered in Prometheus text format on /metrics.
+
+- the HTTP middleware in main.py opens a RequestStats per request and
+  records latency and status per route template
+- engine events count and time every statement against the current
+  request, log slow ones and flag N+1 patterns (same statement repeated)
+- session events measure how long a session waited for its pooled
+  connection; pool events count checkouts and newly opened connections
+
+Metrics are per process; with several workers scrape each one (or put
+them behind a multiprocess-aware exporter).
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import METRICS_SLOW_QUERY_MS, METRICS_N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+# ---- Metric types ----
+
+def _label_str(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [bucket counts..., +Inf count, sum]
+        self.values: dict[tuple, list[float]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            data = self.values.get(key)
+            if data is None:
+                data = self.values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[index] += 1
+            data[-2] += 1
+            data[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, data in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, data):
+                    lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {data[-2]}")
+                lines.append(f"{self.name}_count{_label_str(key)} {data[-2]}")
+                lines.append(f"{self.name}_sum{_label_str(key)} {data[-1]}")
+        return lines
+
+
+class Gauge:
+    """Read at scrape time from a callback returning {labels_tuple: value}."""
+
+    def __init__(self, name: str, help_text: str, collect):
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+_registry: list = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+http_requests = _register(Counter("http_requests_total", "HTTP requests by route and status"))
+http_latency = _register(Histogram("http_request_duration_seconds", "HTTP request latency"))
+db_queries_per_request = _register(Histogram(
+    "db_queries_per_request", "SQL statements executed per request", QUERY_COUNT_BUCKETS
+))
+db_time_per_request = _register(Histogram("db_request_query_seconds", "Total SQL time per request"))
+db_query_latency = _register(Histogram("db_query_duration_seconds", "Latency of single SQL statements"))
+db_slow_queries = _register(Counter("db_slow_queries_total", "Statements slower than METRICS_SLOW_QUERY_MS"))
+db_n_plus_one = _register(Counter(
+    "db_n_plus_one_total", "Requests that repeated one statement METRICS_N_PLUS_ONE_THRESHOLD+ times"
+))
+db_pool_wait = _register(Histogram("db_pool_checkout_wait_seconds", "Time a session waited for a pooled connection"))
+db_pool_checkouts = _register(Counter("db_pool_checkouts_total", "Connections handed out by the pool"))
+db_pool_connects = _register(Counter("db_pool_connections_opened_total", "New database connections opened by the pool"))
+password_hash_latency = _register(Histogram("password_hash_duration_seconds", "bcrypt job latency incl. queueing"))
+password_hash_rejections = _register(Counter("password_hash_rejections_total", "bcrypt jobs shed with 503"))
+rate_limit_rejections = _register(Counter("rate_limit_rejections_total", "Requests rejected with 429"))
+write_batch_size = _register(Histogram(
+    "task_write_batch_size", "Status updates per group commit (TASK_WRITE_QUEUE_ENABLED)", BATCH_SIZE_BUCKETS
+))
+
+
+def register_gauge(name: str, help_text: str, collect):
+    _register(Gauge(name, help_text, collect))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- Per-request DB stats ----
+
+@dataclass
+class RequestStats:
+    path: str = ""
+    route: str = "unmatched"
+    query_count: int = 0
+    query_seconds: float = 0.0
+    statements: dict = field(default_factory=dict)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def start_request(path: str) -> RequestStats:
+    stats = RequestStats(path=path)
+    _current.set(stats)
+    return stats
+
+
+def finish_request(stats: RequestStats, method: str, status_code: int, elapsed: float):
+    http_requests.inc(method=method, route=stats.route, status=status_code)
+    http_latency.observe(elapsed, method=method, route=stats.route)
+    db_queries_per_request.observe(stats.query_count, method=method, route=stats.route)
+    db_time_per_request.observe(stats.query_seconds, method=method, route=stats.route)
+
+    repeated = {sql: count for sql, count in stats.statements.items() if count >= METRICS_N_PLUS_ONE_THRESHOLD}
+    if repeated:
+        db_n_plus_one.inc(route=stats.route)
+        sql, count = max(repeated.items(), key=lambda item: item[1])
+        logger.warning("Possible N+1 on %s %s: %d x %s", method, stats.route, count, sql[:200])
+
+
+def route_label(scope: dict) -> str:
+    # Route template (/tasks/{task_id}), never the raw path, to keep label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+# ---- Engine instrumentation ----
+
+# The start time lives on the statement's execution context, so a
+# statement that raises (no after_cursor_execute) leaves nothing behind
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "metrics_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    db_query_latency.observe(elapsed)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_seconds += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    if elapsed * 1000 >= METRICS_SLOW_QUERY_MS:
+        db_slow_queries.inc()
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000, stats.path if stats else "-", statement[:500]
+        )
+
+
+# Engine -> label for the pool wait histogram (sessions only see the connection)
+_engine_names: dict = {}
+
+
+def _session_transaction_created(session, transaction):
+    # The root transaction is created just before the session asks the pool for a connection
+    if transaction.parent is None:
+        session.info["connection_wait_start"] = time.perf_counter()
+
+
+def _session_began(session, transaction, connection):
+    start = session.info.pop("connection_wait_start", None)
+    if start is not None:
+        db_pool_wait.observe(time.perf_counter() - start, engine=_engine_names.get(connection.engine, "other"))
+
+
+def instrument_engine(engine, name: str):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    # Pool events: checkout fires once a connection is handed out, connect
+    # when the pool had to open a new one
+    event.listen(engine, "checkout", lambda *args: db_pool_checkouts.inc(engine=name))
+    event.listen(engine, "connect", lambda *args: db_pool_connects.inc(engine=name))
+
+    # The pool has no "before checkout" event, so the wait is timed on the
+    # session side: from its transaction starting to its connection beginning
+    _engine_names[engine] = name
+    if not event.contains(Session, "after_begin", _session_began):
+        event.listen(Session, "after_transaction_create", _session_transaction_created)
+        event.listen(Session, "after_begin", _session_began)
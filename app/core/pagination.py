@@ -0,0 +1,79 @@
+import base64
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from fastapi import HTTPException
+from app.core.config import TASK_COUNT_CACHE_TTL_SECONDS, TASK_COUNT_CACHE_MAX_ENTRIES
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """
+    Opaque keyset cursor built from the (created_at, id) sort key
+    of the last row on a page.
+    """
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_member_cursor(depth: int, user_id: int) -> str:
+    """Keyset cursor for team listings, ordered by (depth, user id)."""
+    raw = json.dumps([depth, user_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_member_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        depth, user_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(depth), int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Small per-process cache of list totals so cursor clients can still
+# show an approximate count without paying for COUNT(*) on every page.
+# Keys carry two versions, as the page cache's (app/core/cache.py) do: the
+# user's list version from the database, which other workers' writes bump
+# too, and a per-process version that invalidating a scope bumps in O(1).
+# Orphaned totals age out through TTL / LRU.
+_count_cache: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+_count_versions: dict[tuple, int] = {}
+
+
+def task_count_scope(role: str, user_id: int, company_id: int) -> tuple:
+    return ("tasks", role, user_id, company_id)
+
+
+def task_count_key(scope: tuple, list_version: int, *filters) -> tuple:
+    return (*scope, _count_versions.get(scope, 0), list_version, *filters)
+
+
+async def get_cached_count(key: tuple, count_fn) -> int:
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+
+    if cached and cached[0] > now:
+        _count_cache.move_to_end(key)
+        return cached[1]
+
+    total = await count_fn()
+    _count_cache[key] = (now + TASK_COUNT_CACHE_TTL_SECONDS, total)
+    _count_cache.move_to_end(key)
+    while len(_count_cache) > TASK_COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.popitem(last=False)
+    return total
+
+
+def invalidate_cached_count(scope: tuple):
+    # Drops the user's plain total and every filtered total under it
+    _count_versions[scope] = _count_versions.get(scope, 0) + 1
@@ -2,7 +2,9 @@ from fastapi import Depends, HTTPException
 from app.core.auth import get_current_user
 from app.core.auth import get_current_user
 
-def require_manager(user=Depends(get_current_user)):
+# get_current_user has already checked that the account is active
+
+async def require_manager(user=Depends(get_current_user)):
     if user["role"] != "MANAGER":
         raise HTTPException(status_code=403, detail="Manager access required")
     return user
@@ -10,7 +12,7 @@ def require_manager(user=Depends(get_current_user)):
 
 
 
-def require_reportee(user=Depends(get_current_user)):
+async def require_reportee(user=Depends(get_current_user)):
     if user["role"] != "REPORTEE":
         raise HTTPException(status_code=403, detail="Reportee access required")
     return user
@@ -0,0 +1,123 @@
+"""
+Per-process cache of user principals: user_id -> (company_id, role,
+is_active, manager_id).
+
+Every authenticated request checks that the caller's account is still
+active, and task routes check that assignees are reportees of the caller's
+company; both are answered from memory. Entries expire after
+PRINCIPAL_CACHE_TTL_SECONDS, so a change made by another worker (or
+directly in the database) is picked up within that bound. Code that
+changes a user in this process calls `remember_principal` (new users) or
+`forget_principals` (deactivation, role or manager changes) after its
+commit, which takes effect here at once.
+
+Only existing users are cached: an unknown id always goes to the database,
+so a reportee created on another worker can be assigned right away.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.db.sharding import tenant_session
+from app.models.user import User
+from app.core.config import PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES
+
+
+class Principal(NamedTuple):
+    company_id: int
+    role: str
+    is_active: bool
+    manager_id: int | None
+
+
+# user_id -> (expires at, principal), least recently used first
+_principals: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+_principals_lock = threading.Lock()
+
+# Hit/miss counters for this process
+principal_stats = {"hits": 0, "misses": 0}
+
+
+def remember_principal(user_id: int, company_id: int, role, is_active: bool | None, manager_id: int | None) -> Principal:
+    principal = Principal(
+        company_id,
+        getattr(role, "value", role),
+        is_active is not False,  # NULL on rows that predate the column's default
+        manager_id
+    )
+    with _principals_lock:
+        _principals[user_id] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, principal)
+        _principals.move_to_end(user_id)
+        while len(_principals) > PRINCIPAL_CACHE_MAX_ENTRIES:
+            _principals.popitem(last=False)
+    return principal
+
+
+def forget_principals(user_ids):
+    with _principals_lock:
+        for user_id in user_ids:
+            _principals.pop(user_id, None)
+
+
+def principals_query(user_ids):
+    return select(User.id, User.company_id, User.role, User.is_active, User.manager_id).where(User.id.in_(user_ids))
+
+
+async def get_principals(company_id: int, user_ids, db=None) -> dict[int, Principal]:
+    """
+    Principals of those `user_ids` that exist, from memory where possible
+    and one IN query for the rest (on `db`, else on the read pool of
+    `company_id`'s shard).
+    """
+    now = time.monotonic()
+    principals, missing = {}, []
+
+    with _principals_lock:
+        for user_id in user_ids:
+            entry = _principals.get(user_id)
+            if entry is not None and entry[0] > now:
+                _principals.move_to_end(user_id)
+                principals[user_id] = entry[1]
+            else:
+                missing.append(user_id)
+
+    principal_stats["hits"] += len(principals)
+    principal_stats["misses"] += len(missing)
+    if not missing:
+        return principals
+
+    query = principals_query(missing)
+    if db is None:
+        async with tenant_session(company_id, read=True) as session:
+            rows = (await session.execute(query)).all()
+    else:
+        rows = (await db.execute(query)).all()
+
+    for row in rows:
+        principals[row.id] = remember_principal(*row)
+    return principals
+
+
+async def valid_reportee_ids(db, company_id: int, ids: set[int]) -> set[int]:
+    """The ids in `ids` that are active reportees of `company_id`."""
+    if not ids:
+        return set()
+
+    return {
+        user_id for user_id, principal in (await get_principals(company_id, ids, db)).items()
+        if principal.company_id == company_id and principal.role == "REPORTEE" and principal.is_active
+    }
+
+
+async def require_active(claims: dict):
+    """401 if the token's user no longer exists, 403 if the account was deactivated."""
+    user_id = int(claims["sub"])
+    principal = (await get_principals(claims["company_id"], [user_id])).get(user_id)
+
+    if principal is None or principal.company_id != claims["company_id"]:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail="Account is deactivated")
@@ -2,6 +2,8 @@ from slowapi import Limiter
 from fastapi import Request
 from slowapi.util import get_remote_address
 from app.core.auth import get_current_user_optional
+from app.core.config import RATE_LIMIT_STORAGE_URI, RATE_LIMIT_STRATEGY, RATE_LIMIT_ENABLED
+import app.core.rate_limit_storage  # noqa: F401  registers the sqlite:// scheme
 
 def rate_limit_key(request: Request) -> str:
     """
@@ -21,4 +23,38 @@ def rate_limit_key(request: Request) -> str:
     return get_remote_address(request)
 
 
-limiter = Limiter(key_func=rate_limit_key)
+# The sqlite:// storage keeps counters, not per-hit timestamps, so it can
+# back the counter strategies only. Fail at startup rather than on the
+# first rate-limited request.
+if RATE_LIMIT_STORAGE_URI.startswith("sqlite://") and RATE_LIMIT_STRATEGY == "moving-window":
+    raise RuntimeError(
+        "RATE_LIMIT_STRATEGY=moving-window is not supported with sqlite:// storage; "
+        "use sliding-window-counter or fixed-window, or memory:// / redis:// storage"
+    )
+
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    enabled=RATE_LIMIT_ENABLED
+)
+
+
+async def batch_weight(request: Request):
+    """
+    Dependency that records how many items a bulk payload carries, so
+    `batch_cost` can charge the limiter per item instead of per request.
+    It reads the body FastAPI already parsed for the route (Starlette
+    caches it) rather than validating it a second time; malformed bodies
+    count as one item and get their 422 from the route's own model.
+    """
+    try:
+        items = (await request.json()).get("items")
+    except (ValueError, AttributeError):
+        items = None
+
+    request.state.batch_weight = len(items) if isinstance(items, list) and items else 1
+
+
+def batch_cost(request: Request) -> int:
+    return getattr(request.state, "batch_weight", 1)
@@ -0,0 +1,167 @@
+"""
+Bulk reportee import: parse an upload, validate every row, hash passwords
+in parallel on the process pool and insert all users in one transaction.
+Progress and per-row errors are written to an ImportJob row that clients poll.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from app.db.sharding import tenant_session, reserve_usernames, release_usernames
+from app.models.import_job import ImportJob
+from app.models.user import User
+from app.schemas.user import ReporteeCreate
+from app.core.roles import UserRole
+from app.core.principals import remember_principal
+from app.core.job_status import JobStatus
+from app.core.security import hash_passwords_async, import_workers
+from app.core.hierarchy import add_to_hierarchy
+from app.core.config import REPORTEE_BULK_MAX_ROWS, REPORTEE_BULK_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# DictReader key for cells beyond the header
+EXTRA_CELLS = "__extra__"
+
+
+def parse_rows(content_type: str, body: bytes) -> list[dict]:
+    """
+    Accepts JSON ({"items": [{"username", "password"}, ...]}) or CSV with a
+    `username,password` header row.
+    """
+    try:
+        if content_type.startswith("text/csv"):
+            rows = list(csv.DictReader(io.StringIO(body.decode("utf-8-sig")), restkey=EXTRA_CELLS))
+        else:
+            rows = json.loads(body)["items"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Body must be JSON {\"items\": [...]} or CSV with username,password columns")
+
+    if not isinstance(rows, list) or not rows:
+        raise HTTPException(status_code=400, detail="No rows to import")
+
+    if len(rows) > REPORTEE_BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {REPORTEE_BULK_MAX_ROWS} rows per import")
+
+    return rows
+
+
+def _row_error(row: int | None, username, detail: str) -> dict:
+    # Bad rows may carry any JSON value as username; errors always hold a string
+    return {"row": row, "username": None if username is None else str(username), "detail": detail}
+
+
+async def run_import(job_id: int, rows: list[dict], company_id: int, manager_id: int):
+    async with tenant_session(company_id) as db:
+        job = await db.get(ImportJob, job_id)
+        job.status = JobStatus.RUNNING
+        await db.commit()
+
+        user_ids = {}
+        try:
+            errors = []
+            valid = []  # (row number, ReporteeCreate)
+            seen = set()
+
+            # 1️⃣ Per-row validation + duplicates inside the upload
+            for number, row in enumerate(rows, start=1):
+                if not isinstance(row, dict):
+                    errors.append(_row_error(number, None, "Row must be an object"))
+                    continue
+                if EXTRA_CELLS in row:
+                    errors.append(_row_error(number, row.get("username"), "Row has more cells than the header"))
+                    continue
+                try:
+                    reportee = ReporteeCreate.model_validate(row)
+                except ValidationError as e:
+                    errors.append(_row_error(number, row.get("username"), e.errors()[0]["msg"].removeprefix("Value error, ")))
+                    continue
+
+                if reportee.username in seen:
+                    errors.append(_row_error(number, reportee.username, "Duplicate username in upload"))
+                    continue
+
+                seen.add(reportee.username)
+                valid.append((number, reportee))
+
+            # 2️⃣ Existing usernames, one IN query for the whole upload
+            if valid:
+                existing = set(await db.scalars(
+                    select(User.username).where(User.username.in_(seen))
+                ))
+                for number, reportee in valid:
+                    if reportee.username in existing:
+                        errors.append(_row_error(number, reportee.username, "Username already exists"))
+                valid = [(n, r) for n, r in valid if r.username not in existing]
+
+            # Sharded: the names must also be free on every other shard
+            user_ids = await reserve_usernames(company_id, [reportee.username for _, reportee in valid])
+            for number, reportee in valid:
+                if reportee.username not in user_ids:
+                    errors.append(_row_error(number, reportee.username, "Username already exists"))
+            valid = [(n, r) for n, r in valid if r.username in user_ids]
+
+            job.processed_rows = len(rows) - len(valid)
+            job.errors = sorted(errors, key=lambda e: e["row"])
+            await db.commit()
+
+            # 3️⃣ Hash in chunks across the import pool; save progress as chunks finish
+            chunks = [
+                valid[i:i + REPORTEE_BULK_CHUNK_SIZE]
+                for i in range(0, len(valid), REPORTEE_BULK_CHUNK_SIZE)
+            ]
+            gate = asyncio.Semaphore(import_workers())
+
+            async def hash_chunk(chunk):
+                async with gate:
+                    return chunk, await hash_passwords_async([r.password for _, r in chunk])
+
+            new_users = []
+            for finished in asyncio.as_completed([hash_chunk(chunk) for chunk in chunks]):
+                chunk, hashes = await finished
+                new_users.extend(
+                    {
+                        "username": reportee.username,
+                        "password_hash": password_hash,
+                        "role": UserRole.REPORTEE,
+                        "company_id": company_id,
+                        "manager_id": manager_id
+                    }
+                    for (_, reportee), password_hash in zip(chunk, hashes)
+                )
+                job.processed_rows += len(chunk)
+                await db.commit()
+
+            # 4️⃣ Insert every user in one transaction (with their directory ids when sharded)
+            created_ids = []
+            if new_users:
+                for user in new_users:
+                    if user_ids[user["username"]] is not None:
+                        user["id"] = user_ids[user["username"]]
+                created_ids = (await db.scalars(
+                    insert(User).returning(User.id, sort_by_parameter_order=True),
+                    new_users
+                )).all()
+                await add_to_hierarchy(db, company_id, created_ids, manager_id)
+
+            job.created_rows = len(new_users)
+            job.status = JobStatus.COMPLETED
+            await db.commit()
+
+            # Assignable straight away, without a lookup
+            for user_id in created_ids:
+                remember_principal(user_id, company_id, UserRole.REPORTEE, True, manager_id)
+
+        except Exception:
+            logger.exception("Reportee import %d failed", job_id)
+            await db.rollback()
+            await release_usernames([name for name, user_id in user_ids.items() if user_id])
+            job = await db.get(ImportJob, job_id)
+            job.status = JobStatus.FAILED
+            job.errors = (job.errors or []) + [_row_error(None, None, "Import failed, no users were created")]
+            await db.commit()
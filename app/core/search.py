@@ -0,0 +1,98 @@
+"""
+Full-text task search for GET /tasks?q=...
+
+`tasks_fts` is a contentless SQLite FTS5 index over tasks.title and
+tasks.description, kept in sync by the triggers below (migration 7). Next
+to the text it stores a `scope` column holding one token per list the task
+appears on: `m<creator id>` and `a<assignee id>` (empty once the task is
+soft-deleted). A search ANDs the caller's scope token with the search
+terms, so FTS5 intersects two posting lists instead of ranking every
+matching task of every company and filtering afterwards.
+
+Other databases have no FTS5; there `q` falls back to a LIKE filter.
+"""
+
+import re
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+# bm25 column weights: a hit in the title counts ten times one in the description
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+MAX_SEARCH_TERMS = 8
+
+# Not part of Base.metadata: create_all must not try to create it as a plain table
+_meta = MetaData()
+
+tasks_fts = Table(
+    "tasks_fts",
+    _meta,
+    Column("rowid", Integer),
+    Column("title", String),
+    Column("description", String),
+    Column("scope", String),
+    # FTS5 hidden columns: the table-named one takes MATCH, rank orders by bm25
+    Column("tasks_fts", String),
+    Column("rank"),
+)
+
+
+def _scope(row: str) -> str:
+    return (
+        f"CASE WHEN {row}.is_deleted THEN '' ELSE "
+        f"'m' || {row}.created_by_id || COALESCE(' a' || {row}.assigned_to_id, '') END"
+    )
+
+
+def _index_row(row: str, command: str = "") -> str:
+    # Contentless tables delete with the 'delete' command and the exact values indexed
+    columns = "tasks_fts, rowid" if command else "rowid"
+    values = f"'{command}', {row}.id" if command else f"{row}.id"
+    return (
+        f"INSERT INTO tasks_fts ({columns}, title, description, scope) "
+        f"VALUES ({values}, {row}.title, COALESCE({row}.description, ''), {_scope(row)});"
+    )
+
+
+FTS_SCHEMA = [
+    # prefix='2 3' keeps short prefix searches ("fi*") off a full term scan
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, scope, content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+    f"INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('rank', 'bm25({TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, 0.0)')",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN {_index_row('new')} END",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN {_index_row('old', 'delete')} END",
+    # Status and change_seq writes leave the index alone
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update "
+    "AFTER UPDATE OF title, description, created_by_id, assigned_to_id, is_deleted ON tasks BEGIN "
+    f"{_index_row('old', 'delete')} {_index_row('new')} END",
+]
+
+FTS_BACKFILL = (
+    "INSERT INTO tasks_fts (rowid, title, description, scope) "
+    f"SELECT tasks.id, tasks.title, COALESCE(tasks.description, ''), {_scope('tasks')} FROM tasks"
+)
+
+_TERM = re.compile(r"\w+")
+
+
+def scope_token(role: str, user_id: int) -> str:
+    return f"{'m' if role == 'MANAGER' else 'a'}{user_id}"
+
+
+def search_terms(q: str) -> list[str]:
+    terms = _TERM.findall(q.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain letters or digits")
+    return terms
+
+
+def build_match(q: str, role: str, user_id: int) -> str:
+    """
+    FTS5 MATCH expression for the caller's search. User input never reaches
+    the query syntax: it is cut into word terms, each quoted, all of them
+    required, and the last one matched as a prefix so results follow typing.
+    """
+    phrases = [f'"{term}"' for term in search_terms(q)]
+    phrases[-1] += "*"
+    return f"scope:{scope_token(role, user_id)} AND {{title description}}:({' AND '.join(phrases)})"
@@ -1,9 +1,15 @@
+import asyncio
+import time
+from functools import partial
 import bcrypt
-from app.core.config import BCRYPT_ROUNDS
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_IMPORT_WORKERS
+from app.core.metrics import password_hash_latency, password_hash_rejections
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     password = password.strip()
-    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
@@ -12,3 +18,99 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password.strip().encode("utf-8"),
         hashed_password.encode("utf-8")
     )
+
+def hash_passwords(passwords: list[str], rounds: int = BCRYPT_ROUNDS) -> list[str]:
+    return [hash_password(password, rounds) for password in passwords]
+
+def needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<rounds>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+# ---- Async wrappers: keep bcrypt off the event loop ----
+
+_pool = None
+_import_pool = None
+_pending = 0
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # Imported lazily: multiprocessing is only needed once someone logs in
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _pool
+
+
+def _get_import_pool():
+    global _import_pool
+    if _import_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _import_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_IMPORT_WORKERS)
+    return _import_pool
+
+
+def shutdown_password_pool():
+    global _pool, _import_pool
+    for pool in (_pool, _import_pool):
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    _pool = _import_pool = None
+
+
+async def _run_bcrypt(fn, *args):
+    global _pending
+
+    # Bounded queue: shed load instead of letting logins pile up
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        password_hash_rejections.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+    _pending += 1
+    start = time.perf_counter()
+    try:
+        # PASSWORD_HASH_WORKERS=0 keeps hashing in the threadpool (dev/tests)
+        if PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), partial(fn, *args))
+    finally:
+        _pending -= 1
+        password_hash_latency.observe(time.perf_counter() - start, operation=fn.__name__)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_bcrypt(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_bcrypt(verify_password, plain_password, hashed_password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    # A whole import chunk is one job on the import pool. It takes no
+    # PASSWORD_HASH_MAX_PENDING slot: imports bound their own concurrency
+    # (import_workers) and never compete with logins for the main pool
+    start = time.perf_counter()
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(hash_passwords, passwords, BCRYPT_ROUNDS)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_import_pool(), partial(hash_passwords, passwords, BCRYPT_ROUNDS))
+    finally:
+        password_hash_latency.observe(time.perf_counter() - start, operation="hash_passwords")
+
+
+def import_workers() -> int:
+    """How many chunks an import hashes at once."""
+    return max(1, PASSWORD_HASH_IMPORT_WORKERS)
@@ -0,0 +1,63 @@
+"""
+Task change numbers and sync tokens for GET /tasks/changes.
+
+Every task write bumps the shard's one change_sequences row, as late as
+possible in its transaction. No per-worker blocks (as in reserve_ids):
+a sync token is only valid if numbers commit in order.
+"""
+
+import base64
+import json
+import time
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import dialect_insert
+from app.models.change_sequence import ChangeSequence
+from app.core.config import TASK_EVENT_RETENTION_HOURS
+
+TASK_SEQUENCE = "tasks"
+
+
+async def next_change_seq(db: AsyncSession, count: int = 1) -> int:
+    """
+    Reserve `count` consecutive task change numbers and return the first.
+
+    Must run inside the mutation's transaction. Bumping the counter row takes
+    the write lock (SQLite) / row lock (Postgres) until commit, so numbers
+    become visible in the order they were handed out and a reader never
+    sees seq N+1 committed before seq N.
+    """
+    insert = dialect_insert(db)
+    stmt = insert(ChangeSequence).values(name=TASK_SEQUENCE, value=count)
+    last = await db.scalar(
+        stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": ChangeSequence.value + count}
+        ).returning(ChangeSequence.value)
+    )
+    return last - count + 1
+
+
+def encode_sync_token(change_seq: int) -> str:
+    """
+    Opaque watermark for GET /tasks/changes: the last change_seq the
+    client has applied, plus when the token was issued.
+    """
+    raw = json.dumps([change_seq, int(time.time())], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> int:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        change_seq, issued_at = json.loads(base64.urlsafe_b64decode(padded))
+        change_seq, issued_at = int(change_seq), int(issued_at)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    # Reassignments away from a reportee are only kept in the task event
+    # log; once that has been pruned past the token, a delta could miss them
+    if time.time() - issued_at > TASK_EVENT_RETENTION_HOURS * 3600:
+        raise HTTPException(status_code=410, detail="Sync token expired; do a full sync")
+
+    return change_seq
@@ -0,0 +1,163 @@
+"""
+Statements the task routes run, built in one place so that
+tests/test_query_plans.py checks the plans of exactly these (with
+EXPLAIN QUERY PLAN) rather than copies of them.
+
+Builders return statements without LIMIT / OFFSET; the routes add those.
+"""
+
+from datetime import datetime
+from sqlalchemy import case, func, or_, select, tuple_, update
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.user_hierarchy import UserHierarchy
+from app.core.search import tasks_fts, build_match, search_terms
+
+# Only the columns a list page shows: plain rows, no ORM identity map
+TASK_LIST_COLUMNS = (Task.id, Task.title, Task.status, Task.assigned_to_id, Task.created_at, Task.updated_at)
+
+
+def owner_column(role: str):
+    """The column that puts a task in this role's view: tasks a manager created / a reportee is assigned."""
+    return {"MANAGER": Task.created_by_id, "REPORTEE": Task.assigned_to_id}.get(role)
+
+
+# ---- GET /tasks ----
+
+def task_list_filters(
+    role: str,
+    user_id: int,
+    company_id: int,
+    status=None,
+    assigned_to_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> list:
+    """The caller's live tasks plus the optional filters, all served by the feed / status feed indexes."""
+    filters = [
+        owner_column(role) == user_id,
+        Task.company_id == company_id,
+        Task.is_deleted == False
+    ]
+    if status is not None:
+        filters.append(Task.status == status)
+    if assigned_to_id is not None:
+        filters.append(Task.assigned_to_id == assigned_to_id)
+    if created_from is not None:
+        filters.append(Task.created_at >= created_from)
+    if created_to is not None:
+        filters.append(Task.created_at < created_to)
+    return filters
+
+
+def task_list_queries(filters: list, role: str, user_id: int, q: str | None = None, fts: bool = True):
+    """
+    (page query, count query) for `filters`. With `q`, ranked full-text
+    search over the caller's own tasks (app/core/search.py) when `fts`
+    (SQLite), else LIKE on title and description.
+    """
+    page_query = select(*TASK_LIST_COLUMNS)
+    count_query = select(func.count()).select_from(Task)
+
+    if q is not None and fts:
+        filters = [*filters, tasks_fts.c.tasks_fts.match(build_match(q, role, user_id))]
+        # FTS5 returns rows already in rank order, so there is no sort step
+        page_query = page_query.join(tasks_fts, tasks_fts.c.rowid == Task.id).order_by(tasks_fts.c.rank)
+        count_query = count_query.join(tasks_fts, tasks_fts.c.rowid == Task.id)
+    else:
+        if q is not None:
+            filters = [
+                *filters,
+                *(or_(Task.title.ilike(f"%{term}%"), Task.description.ilike(f"%{term}%")) for term in search_terms(q))
+            ]
+        page_query = page_query.order_by(Task.created_at.desc(), Task.id.desc())
+
+    return page_query.where(*filters), count_query.where(*filters)
+
+
+def after_cursor(query, created_at: datetime, task_id: int):
+    """Keyset: rows strictly after the last (created_at, id) seen."""
+    return query.where(tuple_(Task.created_at, Task.id) < (created_at, task_id))
+
+
+# ---- GET /tasks/team ----
+
+def team_tasks_query(manager_id: int, company_id: int, status=None, after: tuple | None = None):
+    """
+    Tasks assigned to anyone below `manager_id`: one join from the
+    user_hierarchy subtree to each member's assignee feed, newest first.
+    """
+    filters = [
+        UserHierarchy.ancestor_id == manager_id,
+        UserHierarchy.depth > 0,
+        Task.company_id == company_id,
+        Task.is_deleted == False
+    ]
+    if status is not None:
+        filters.append(Task.status == status)
+    if after is not None:
+        filters.append(tuple_(Task.created_at, Task.id) < after)
+
+    return (
+        select(*TASK_LIST_COLUMNS)
+        .join(UserHierarchy, UserHierarchy.descendant_id == Task.assigned_to_id)
+        .where(*filters)
+        .order_by(Task.created_at.desc(), Task.id.desc())
+    )
+
+
+# ---- GET /tasks/{task_id} ----
+
+def task_detail_query(task_id: int, role: str, user_id: int, company_id: int):
+    return select(Task).where(
+        Task.id == task_id,
+        owner_column(role) == user_id,
+        Task.company_id == company_id,
+        Task.is_deleted == False
+    )
+
+
+# ---- GET /tasks/changes ----
+
+def task_changes_query(company_id: int, role: str, user_id: int, after_seq: int, high_seq: int, live_only: bool = False):
+    """Tasks in the caller's view changed in (after_seq, high_seq]: one range scan on ix_tasks_*_changes."""
+    query = select(Task).where(
+        Task.company_id == company_id,
+        owner_column(role) == user_id,
+        Task.change_seq > after_seq,
+        Task.change_seq <= high_seq
+    )
+    if live_only:
+        query = query.where(Task.is_deleted == False)
+    return query.order_by(Task.change_seq)
+
+
+def revoked_tasks_query(company_id: int, user_id: int, after_seq: int, high_seq: int):
+    """Tasks reassigned away from reportee `user_id` in (after_seq, high_seq], from the event log."""
+    return select(TaskEvent.task_id, TaskEvent.change_seq).where(
+        TaskEvent.company_id == company_id,
+        TaskEvent.previous_assigned_to_id == user_id,
+        TaskEvent.assigned_to_id != user_id,
+        TaskEvent.change_seq > after_seq,
+        TaskEvent.change_seq <= high_seq
+    ).order_by(TaskEvent.change_seq)
+
+
+# ---- Mutations ----
+
+def task_state_query(*where):
+    """What a mutation reads before it writes: enough for its rules, the event and the counters."""
+    return select(
+        Task.id, Task.created_by_id, Task.assigned_to_id, Task.status, Task.updated_at, Task.change_seq
+    ).where(*where)
+
+
+def versioned_update(tasks, **values):
+    """UPDATE of these (read) tasks, skipping any whose change_seq moved since they were read."""
+    read_seqs = {task.id: task.change_seq for task in tasks}
+    return (
+        update(Task)
+        .where(Task.id.in_(read_seqs), Task.change_seq == case(read_seqs, value=Task.id))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,185 @@
+"""
+Precomputed task counts by status for dashboards (GET /tasks/stats).
+
+task_status_counts keeps one row per (company, scope, user, status):
+COMPANY (user_id 0) counts the whole company, MANAGER the tasks a manager
+created, REPORTEE the tasks assigned to a reportee. Soft-deleted tasks are
+not counted. Every task mutation adds its deltas in the same transaction
+as the change, so reading a dashboard is a primary-key lookup instead of
+a GROUP BY over all tasks.
+
+    python -m app.core.task_stats --check   # compare with a full recount, exit 1 on drift
+    python -m app.core.task_stats           # rebuild from a full recount
+"""
+
+from collections import Counter
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import dialect_insert
+from app.models.task import Task
+from app.models.task_status_count import TaskStatusCount
+from app.core.hierarchy import team_member_ids
+from app.core.task_status import TaskStatus
+
+
+def _count_keys(company_id: int, created_by_id: int, assigned_to_id: int | None, status) -> list[tuple]:
+    status = TaskStatus(status).value
+    keys = [(company_id, "COMPANY", 0, status), (company_id, "MANAGER", created_by_id, status)]
+    if assigned_to_id is not None:
+        keys.append((company_id, "REPORTEE", assigned_to_id, status))
+    return keys
+
+
+def count_change(deltas: Counter, before: tuple | None = None, after: tuple | None = None) -> Counter:
+    """
+    Add one task's change to `deltas`. `before` / `after` are the task's
+    (company_id, created_by_id, assigned_to_id, status) as read and as
+    written in this transaction; None when it is not counted (not created
+    yet / soft-deleted).
+    """
+    for key in _count_keys(*before) if before else ():
+        deltas[key] -= 1
+    for key in _count_keys(*after) if after else ():
+        deltas[key] += 1
+    return deltas
+
+
+async def apply_count_changes(db: AsyncSession, deltas: Counter):
+    """
+    Must run inside the mutation's transaction (before commit), like the
+    list version bump. Rows are upserted in key order so concurrent writers
+    lock them in the same order.
+    """
+    rows = [
+        {"company_id": company_id, "scope": scope, "user_id": user_id, "status": status, "count": delta}
+        for (company_id, scope, user_id, status), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    insert_stmt = dialect_insert(db)
+    stmt = insert_stmt(TaskStatusCount).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["company_id", "scope", "user_id", "status"],
+            set_={"count": TaskStatusCount.count + stmt.excluded["count"]}
+        )
+    )
+
+
+def status_counts_query(company_id: int, scope: str, user_id: int = 0):
+    return select(TaskStatusCount.status, TaskStatusCount.count).where(
+        TaskStatusCount.company_id == company_id,
+        TaskStatusCount.scope == scope,
+        TaskStatusCount.user_id == user_id
+    )
+
+
+def team_status_counts_query(company_id: int, manager_id: int):
+    return select(TaskStatusCount.status, TaskStatusCount.count).where(
+        TaskStatusCount.company_id == company_id,
+        TaskStatusCount.scope == "REPORTEE",
+        TaskStatusCount.user_id.in_(team_member_ids(manager_id))
+    )
+
+
+async def get_status_counts(db: AsyncSession, company_id: int, scope: str, user_id: int = 0) -> dict:
+    counts = {status: 0 for status in TaskStatus}
+    rows = await db.execute(status_counts_query(company_id, scope, user_id))
+    for status, count in rows:
+        counts[TaskStatus(status)] = count
+
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+async def get_team_status_counts(db: AsyncSession, company_id: int, manager_id: int) -> dict:
+    """Tasks assigned to anyone below the manager: their REPORTEE counters, summed."""
+    counts = {status: 0 for status in TaskStatus}
+    rows = await db.execute(team_status_counts_query(company_id, manager_id))
+    for status, count in rows:
+        counts[TaskStatus(status)] += count
+
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+# ---- Consistency check / rebuild (sync connection) ----
+
+def recount(conn) -> dict[tuple, int]:
+    live = Task.is_deleted == False
+    queries = {
+        "COMPANY": select(Task.company_id, literal(0), Task.status, func.count())
+            .where(live).group_by(Task.company_id, Task.status),
+        "MANAGER": select(Task.company_id, Task.created_by_id, Task.status, func.count())
+            .where(live).group_by(Task.company_id, Task.created_by_id, Task.status),
+        "REPORTEE": select(Task.company_id, Task.assigned_to_id, Task.status, func.count())
+            .where(live, Task.assigned_to_id.isnot(None))
+            .group_by(Task.company_id, Task.assigned_to_id, Task.status),
+    }
+
+    counts = {}
+    for scope, query in queries.items():
+        for company_id, user_id, status, count in conn.execute(query):
+            counts[(company_id, scope, user_id, status)] = count
+    return counts
+
+
+def find_drift(conn) -> dict[tuple, tuple[int, int]]:
+    """{key: (stored, recounted)} for every counter that disagrees with the tasks table."""
+    stored = {
+        (company_id, scope, user_id, status): count
+        for company_id, scope, user_id, status, count in conn.execute(select(
+            TaskStatusCount.company_id, TaskStatusCount.scope, TaskStatusCount.user_id,
+            TaskStatusCount.status, TaskStatusCount.count
+        ))
+        if count
+    }
+    actual = recount(conn)
+
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+def rebuild(conn) -> int:
+    # Delete first: the write lock is then held for the recount, so no
+    # task change can commit between reading and replacing the counters
+    conn.execute(delete(TaskStatusCount))
+    counts = recount(conn)
+    if counts:
+        conn.execute(insert(TaskStatusCount), [
+            {"company_id": company_id, "scope": scope, "user_id": user_id, "status": status, "count": count}
+            for (company_id, scope, user_id, status), count in counts.items()
+        ])
+    return len(counts)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.db.sharding import shards
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the task status counters")
+    parser.add_argument("--check", action="store_true", help="only compare with a full recount")
+    args = parser.parse_args()
+
+    if args.check:
+        drift = {}
+        for shard in shards:
+            with shard.engine.connect() as conn:
+                drift.update(find_drift(conn))
+
+        for key, (stored, actual) in sorted(drift.items()):
+            print(f"✗ {key}: stored {stored}, recount {actual}")
+        if drift:
+            sys.exit(1)
+        print("✓ task status counters match a full recount")
+
+    else:
+        rows = 0
+        for shard in shards:
+            with shard.engine.begin() as conn:
+                rows += rebuild(conn)
+        print(f"✓ rebuilt {rows} task status counters")
@@ -0,0 +1,193 @@
+"""
+Single-writer group commit for task status updates.
+
+SQLite has one writer at a time, so concurrent status updates each wait for
+the lock, write, and pay their own commit (fsync). With
+TASK_WRITE_QUEUE_ENABLED the routes hand their change to this queue
+instead: one writer task collects what arrives within
+TASK_WRITE_BATCH_WINDOW_MS (at most TASK_WRITE_BATCH_MAX jobs), applies the
+jobs one after another in a single session and commits once.
+
+Each job still gets its own outcome. A job checks its rules on a read
+before it writes, so an HTTPException (404, 409, 412, ...) leaves nothing
+behind (at most an unused change number, when the task changed between
+the read and the write) and only fails that request. Any other error rolls the batch back
+and every job is retried in its own transaction, so one bad job cannot
+take the others down.
+Requests are answered only after their batch committed.
+
+With several shards (app/db/sharding.py) each shard has its own writer:
+a batch is one transaction, and a transaction lives in one database.
+"""
+
+import asyncio
+import logging
+from fastapi import HTTPException
+from sqlalchemy import text
+from app.db.database import IS_SQLITE
+from app.db.sharding import shards
+from app.core.metrics import write_batch_size
+from app.core.config import (
+    TASK_WRITE_QUEUE_ENABLED,
+    TASK_WRITE_BATCH_WINDOW_MS,
+    TASK_WRITE_BATCH_MAX,
+    TASK_WRITE_SYNCHRONOUS,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, window_ms: float, max_batch: int, synchronous: str = "", session_factory=None):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.synchronous = synchronous if IS_SQLITE else ""
+        self.queue: asyncio.Queue | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Jobs already queued are still written before the writer exits
+        if self.running:
+            self.queue.put_nowait(_STOP)
+            await self.task
+        self.task = None
+
+    async def submit(self, apply):
+        """
+        Run `apply(db)` in the next batch and return its result once the
+        batch is committed (or raise its error). `apply` must not commit.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((apply, future))
+        return await future
+
+    async def _collect(self, first) -> tuple[list, bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    job = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                job = self.queue.get_nowait()
+
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+
+        return batch, False
+
+    async def _run(self):
+        while True:
+            job = await self.queue.get()
+            if job is _STOP:
+                return
+
+            batch, stopping = await self._collect(job)
+            write_batch_size.observe(len(batch))
+            try:
+                await self._write_batch(batch)
+            except Exception:
+                logger.exception("Group commit of %d jobs failed; retrying them one by one", len(batch))
+                for job in batch:
+                    await self._write_batch([job])
+
+            if stopping:
+                return
+
+    async def _write_batch(self, batch: list):
+        if not self.synchronous:
+            async with self.session_factory() as db:
+                outcomes = await self._apply(db, batch)
+        else:
+            # The batch gets its own connection, so the setting is changed and
+            # restored on the connection that commits; a session would hand
+            # its connection back to the pool at commit, before the restore
+            async with self.session_factory.kw["bind"].connect() as conn:
+                # Set before the batch's first write opens the transaction
+                restore = await conn.scalar(text("PRAGMA synchronous"))
+                await conn.execute(text(f"PRAGMA synchronous={self.synchronous}"))
+                await conn.commit()
+                try:
+                    async with self.session_factory(bind=conn) as db:
+                        outcomes = await self._apply(db, batch)
+                finally:
+                    await conn.execute(text(f"PRAGMA synchronous={restore}"))
+                    await conn.commit()
+
+        for future, result, error in outcomes or ():
+            _resolve(future, result, error)
+
+    async def _apply(self, db, batch: list) -> list | None:
+        """Run the batch's jobs and commit; None when a lone job failed (already answered)."""
+        try:
+            outcomes = []
+            for apply, future in batch:
+                try:
+                    outcomes.append((future, await apply(db), None))
+                except HTTPException as error:
+                    outcomes.append((future, None, error))
+
+            await db.commit()
+            return outcomes
+        except Exception as error:
+            await db.rollback()
+            if len(batch) == 1:
+                _resolve(batch[0][1], None, error)
+                return None
+            raise
+
+
+def _resolve(future: asyncio.Future, result, error):
+    # The request may have been cancelled (client went away) while queued
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# One writer per shard, found by the engine the request's session is bound to
+status_writers = {
+    shard.async_engine: GroupCommitWriter(
+        TASK_WRITE_BATCH_WINDOW_MS, TASK_WRITE_BATCH_MAX, TASK_WRITE_SYNCHRONOUS, shard.session
+    )
+    for shard in shards
+}
+
+
+def status_writer_for(db) -> GroupCommitWriter:
+    return status_writers[db.bind]
+
+
+async def start_status_writers():
+    for writer in status_writers.values():
+        await writer.start()
+
+
+async def stop_status_writers():
+    for writer in status_writers.values():
+        await writer.stop()
+
+
+def use_status_writer() -> bool:
+    return TASK_WRITE_QUEUE_ENABLED and all(writer.running for writer in status_writers.values())
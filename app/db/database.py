@@ -1,12 +1,186 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
 
-DATABASE_URL = "sqlite:///./db.sqlite"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./db.sqlite")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Async drivers for the same database (aiosqlite locally, asyncpg/aiomysql on a server)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    return f"{ASYNC_DRIVERS.get(dialect, scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Tenant sharding (app/db/sharding.py): companies are spread over
+# DATABASE_URL (shard 0) plus these comma-separated URLs, with usernames,
+# company placement and ids kept in the directory database. Empty: one
+# database, no directory.
+DB_SHARD_URLS = [url.strip() for url in os.getenv("DB_SHARD_URLS", "").split(",") if url.strip()]
+DIRECTORY_DATABASE_URL = os.getenv("DIRECTORY_DATABASE_URL", "sqlite:///./directory.sqlite")
+
+# Read routing: read-only routes (get_async_read_db) use their own pool.
+# For SQLite that is the same file opened with mode=ro, so readers can
+# never take the write lock; for a server database set DATABASE_READ_URL
+# (and DB_SHARD_READ_URLS, one per shard, blank = none) to a replica.
+# Without a reader, reads share the writer's pool.
+DB_READ_ROUTING = os.getenv("DB_READ_ROUTING", "true").lower() == "true"
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+DB_SHARD_READ_URLS = [url.strip() or None for url in os.getenv("DB_SHARD_READ_URLS", "").split(",")]
+
+# Engine profiles, picked with DB_PROFILE. Any single setting can still be
+# overridden from the environment, e.g. SQLITE_BUSY_TIMEOUT=10000 or DB_POOL_SIZE=20.
+#
+# - development: SQLite defaults (rollback journal, writers block readers)
+# - production:  WAL so readers never wait on the writer, NORMAL sync (safe
+#                with WAL), a busy timeout instead of instant "database is
+#                locked", and a larger page cache / mmap window
+DB_PROFILES = {
+    "development": {
+        "pragmas": {},
+        "pool": "queue",
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_pre_ping": False,
+    },
+    "production": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,       # ms
+            "mmap_size": 268435456,     # 256 MB
+            "cache_size": -65536,       # negative = KiB, i.e. 64 MB per connection
+            "temp_store": "MEMORY",
+        },
+        "pool": "queue",
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_pre_ping": True,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+
+
+def _profile_settings() -> dict:
+    profile = DB_PROFILES[DB_PROFILE]
+
+    return {
+        "pragmas": {
+            name: os.getenv(f"SQLITE_{name.upper()}", value)
+            for name, value in profile["pragmas"].items()
+        },
+        "pool": os.getenv("DB_POOL", profile["pool"]),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", profile["pool_size"])),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", profile["max_overflow"])),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", str(profile["pool_pre_ping"])).lower() == "true",
+    }
+
+
+DB_SETTINGS = _profile_settings()
+
+
+def _engine_options(url: str, is_async: bool) -> dict:
+    pool_classes = {
+        "queue": AsyncAdaptedQueuePool if is_async else QueuePool,
+        "null": NullPool,
+        "static": StaticPool,
+    }
+    options = {
+        "poolclass": pool_classes[DB_SETTINGS["pool"]],
+        # A SQLite file connection cannot be dropped by a server, so the
+        # ping would only add a round-trip (a thread hop with aiosqlite) per checkout
+        "pool_pre_ping": DB_SETTINGS["pool_pre_ping"] and not url.startswith("sqlite"),
+    }
+
+    if DB_SETTINGS["pool"] == "queue":
+        options["pool_size"] = DB_SETTINGS["pool_size"]
+        options["max_overflow"] = DB_SETTINGS["max_overflow"]
+
+    if url.startswith("sqlite") and not is_async:
+        options["connect_args"] = {"check_same_thread": False}
+
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in DB_SETTINGS["pragmas"].items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _apply_sqlite_read_pragmas(dbapi_connection, connection_record):
+    # The journal mode belongs to the file (the writer sets it) and a
+    # read-only connection cannot change it
+    cursor = dbapi_connection.cursor()
+    for name, value in DB_SETTINGS["pragmas"].items():
+        if name != "journal_mode":
+            cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_engines(url: str, async_url: str | None = None):
+    """Sync and async engine for one database, with the profile's pool and pragmas."""
+    sync_engine = create_engine(url, **_engine_options(url, is_async=False))
+    async_engine = create_async_engine(async_url or to_async_url(url), **_engine_options(url, is_async=True))
+
+    if url.startswith("sqlite"):
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+    return sync_engine, async_engine
+
+
+def read_only_url(url: str) -> str | None:
+    """The SQLite file of `url` opened read-only; None for in-memory and server databases."""
+    if not url.startswith("sqlite") or ":///" not in url:
+        return None
+    scheme, path = url.split(":///", 1)
+    if not path or path.startswith((":memory:", "file:")):
+        return None
+    return f"{scheme}:///file:{path}{'&' if '?' in path else '?'}mode=ro&uri=true"
+
+
+def create_read_engine(url: str, read_url: str | None = None):
+    """
+    Async engine for read-only routes: `read_url` (a replica) if given,
+    else `url`'s SQLite file opened with mode=ro. None when reads should
+    share the writer's engine.
+    """
+    read_url = read_url or read_only_url(url)
+    if not DB_READ_ROUTING or not read_url:
+        return None
+
+    read_engine = create_async_engine(to_async_url(read_url), **_engine_options(read_url, is_async=True))
+    if read_url.startswith("sqlite"):
+        event.listen(read_engine.sync_engine, "connect", _apply_sqlite_read_pragmas)
+    return read_engine
+
+
+def dialect_insert(db):
+    """The dialect's insert() (with on_conflict_*) for the database behind session `db`."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+engine, async_engine = create_engines(DATABASE_URL, ASYNC_DATABASE_URL)
+read_engine = create_read_engine(DATABASE_URL, DATABASE_READ_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -14,4 +188,16 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=read_engine or async_engine
+)
+
 Base = declarative_base()
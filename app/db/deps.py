@@ -1,6 +1,14 @@
+import math
+import time
 from .database import SessionLocal
+from .sharding import tenant_session
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Request, Response
+from app.core.auth import get_token_claims
+from app.core.config import READ_YOUR_WRITES_SECONDS
+
+# Set on every mutating request; while it is fresh the client reads from the writer
+RECENT_WRITE_COOKIE = "last_write"
 
 def get_db():
     db = SessionLocal()
@@ -8,3 +16,37 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        return time.time() - float(request.cookies.get(RECENT_WRITE_COOKIE, 0)) < READ_YOUR_WRITES_SECONDS
+    except ValueError:
+        return False
+
+
+async def get_async_db(request: Request, response: Response):
+    # The caller's company decides the shard (app/db/sharding.py)
+    claims = get_token_claims(request)
+
+    if request.method not in ("GET", "HEAD") and READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(
+            key=RECENT_WRITE_COOKIE,
+            value=f"{time.time():.3f}",
+            httponly=True,
+            samesite="lax",
+            max_age=math.ceil(READ_YOUR_WRITES_SECONDS)
+        )
+
+    async with tenant_session(claims["company_id"] if claims else None) as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """
+    For routes that only read: a session from the shard's read-only pool,
+    unless this client mutated something in the last READ_YOUR_WRITES_SECONDS.
+    """
+    claims = get_token_claims(request)
+    async with tenant_session(claims["company_id"] if claims else None, read=not _wrote_recently(request)) as db:
+        yield db
@@ -0,0 +1,160 @@
+"""
+Minimal forward-only schema migrations.
+
+Each migration is (version, description, fn) and runs once inside its own
+transaction. Applied versions are recorded in `schema_migrations`, so an
+existing db.sqlite picks up new indexes/columns on the next startup.
+
+Migrations must be safe to run against a database that was created with
+`Base.metadata.create_all` before this table existed (use checkfirst / IF NOT EXISTS).
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from app.db.database import Base
+
+logger = logging.getLogger(__name__)
+
+_meta = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+
+def _create_tables(conn):
+    # Importing models registers them on Base.metadata
+    import app.models  # noqa: F401
+
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _create_indexes(conn, table_name: str, index_names: list[str]):
+    table = Base.metadata.tables[table_name]
+    existing = {ix["name"] for ix in inspect(conn).get_indexes(table_name)}
+
+    for index in table.indexes:
+        if index.name in index_names and index.name not in existing:
+            index.create(bind=conn)
+
+
+def _hot_path_indexes(conn):
+    import app.models  # noqa: F401
+
+    _create_indexes(conn, "tasks", [
+        "ix_tasks_creator_feed",
+        "ix_tasks_assignee_feed",
+    ])
+    _create_indexes(conn, "users", [
+        "ix_users_company_role",
+    ])
+
+
+def _add_column(conn, table_name: str, column_ddl: str):
+    name = column_ddl.split()[0]
+    if name not in {col["name"] for col in inspect(conn).get_columns(table_name)}:
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}"))
+
+
+def _task_change_sequence(conn):
+    import app.models  # noqa: F401
+
+    _add_column(conn, "tasks", "change_seq INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "task_events", "change_seq INTEGER")
+    Base.metadata.tables["change_sequences"].create(bind=conn, checkfirst=True)
+
+    # Existing tasks get their id as change number; new changes continue after it
+    conn.execute(text("UPDATE tasks SET change_seq = id WHERE change_seq = 0"))
+    conn.execute(text(
+        "INSERT INTO change_sequences (name, value) "
+        "SELECT 'tasks', COALESCE(MAX(change_seq), 0) FROM tasks "
+        "WHERE NOT EXISTS (SELECT 1 FROM change_sequences WHERE name = 'tasks')"
+    ))
+
+    _create_indexes(conn, "tasks", [
+        "ix_tasks_creator_changes",
+        "ix_tasks_assignee_changes",
+    ])
+    _create_indexes(conn, "task_events", [
+        "ix_task_events_revoked",
+    ])
+
+
+def _task_search(conn):
+    import app.models  # noqa: F401
+    from app.core.search import FTS_SCHEMA, FTS_BACKFILL
+
+    _create_indexes(conn, "tasks", [
+        "ix_tasks_creator_status_feed",
+        "ix_tasks_assignee_status_feed",
+    ])
+
+    # FTS5 is SQLite-only; elsewhere GET /tasks?q= falls back to LIKE
+    if conn.dialect.name != "sqlite":
+        return
+
+    for statement in FTS_SCHEMA:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql(FTS_BACKFILL)
+
+
+def _task_status_counts(conn):
+    import app.models  # noqa: F401
+    from app.core.task_stats import rebuild
+
+    Base.metadata.tables["task_status_counts"].create(bind=conn, checkfirst=True)
+    rebuild(conn)
+
+
+def _user_hierarchy(conn):
+    import app.models  # noqa: F401
+    from app.core.hierarchy import rebuild_hierarchy
+
+    Base.metadata.tables["user_hierarchy"].create(bind=conn, checkfirst=True)
+    rebuild_hierarchy(conn)
+
+
+MIGRATIONS = [
+    (1, "initial schema", _create_tables),
+    (2, "task list and user validation indexes", _hot_path_indexes),
+    (3, "reportee import jobs", _create_tables),
+    (4, "task list change versions", _create_tables),
+    (5, "task event log", _create_tables),
+    (6, "task change sequence", _task_change_sequence),
+    (7, "task search index and status filters", _task_search),
+    (8, "task status counters", _task_status_counts),
+    (9, "user hierarchy closure table", _user_hierarchy),
+]
+
+
+def run_migrations(engine):
+    _meta.create_all(bind=engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    for version, description, fn in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(
+                schema_migrations.insert().values(version=version, description=description)
+            )
+
+        logger.info(f"Applied migration {version}: {description}")
+
+
+if __name__ == "__main__":
+    # Deploy step: `python -m app.db.migrations`, then start workers with
+    # RUN_MIGRATIONS_ON_STARTUP=false. Migrates every shard (and the directory)
+    from app.db.sharding import migrate_all
+
+    logging.basicConfig(level=logging.INFO)
+    migrate_all()
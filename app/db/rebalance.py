@@ -0,0 +1,245 @@
+"""
+Move companies between shards (see app/db/sharding.py).
+
+    python -m app.db.rebalance status                   # companies and tasks per shard
+    python -m app.db.rebalance move <company_id> <shard>
+    python -m app.db.rebalance rebalance [--dry-run]    # even out tasks per shard
+
+A move
+1. flags the company as moving in the directory and waits
+   SHARD_MAP_TTL_SECONDS, so every worker answers the company's requests
+   with 503 instead of writing to the old shard;
+2. takes the source shard's write lock, copies the company's rows to the
+   target in one transaction and points the directory at the target;
+3. deletes the rows from the source and releases its lock.
+
+Company, user and task ids are global, so rows keep them. Task events get
+fresh ids above the highest event id of both shards: a stream resuming
+with a Last-Event-ID from the old shard then replays the copied events
+instead of missing any (with TASK_EVENT_BROKER=database, connected streams
+see them once more as well). The target's change sequence is raised to at
+least the source's, so sync tokens issued before the move stay valid.
+Finished import jobs move with new ids; a move does not start while an
+import is running. Written for SQLite shards: explicit event ids would
+also need the target's id sequence advanced on a server database.
+"""
+
+import argparse
+import sys
+import time
+from sqlalchemy import func, select, update
+from app.db.database import Base
+from app.db.sharding import SHARDED, shards, directory_engine, directory_companies
+from app.core.config import SHARD_MAP_TTL_SECONDS
+
+
+def _tables() -> list:
+    """Every table holding company data, parents first."""
+    import app.models  # noqa: F401
+
+    return [
+        table for table in Base.metadata.sorted_tables
+        if table.name == "companies" or "company_id" in table.c
+    ]
+
+
+def _of_company(table, company_id: int):
+    return table.c.id == company_id if table.name == "companies" else table.c.company_id == company_id
+
+
+def _set_moving(company_id: int, moving: bool):
+    with directory_engine.begin() as directory:
+        directory.execute(
+            update(directory_companies).where(directory_companies.c.id == company_id).values(moving=moving)
+        )
+
+
+def _lock_sequence(conn) -> int:
+    # Bumping the change sequence row takes the shard's write lock for the
+    # rest of the transaction, so no task change can commit meanwhile
+    from app.models.change_sequence import ChangeSequence
+    from app.core.sync import TASK_SEQUENCE
+
+    value = conn.scalar(
+        update(ChangeSequence)
+        .where(ChangeSequence.name == TASK_SEQUENCE)
+        .values(value=ChangeSequence.value)
+        .returning(ChangeSequence.value)
+    )
+    return value or 0
+
+
+def move_company(company_id: int, target: int, wait: float = SHARD_MAP_TTL_SECONDS):
+    from app.models.change_sequence import ChangeSequence
+    from app.models.import_job import ImportJob
+    from app.models.task_event import TaskEvent
+    from app.core.job_status import JobStatus
+    from app.core.sync import TASK_SEQUENCE
+
+    with directory_engine.connect() as directory:
+        placement = directory.execute(
+            select(directory_companies.c.shard).where(directory_companies.c.id == company_id)
+        ).first()
+    if placement is None:
+        raise SystemExit(f"Unknown company {company_id}")
+    if placement.shard == target:
+        print(f"Company {company_id} is already on shard {target}")
+        return
+
+    source, dest = shards[placement.shard], shards[target]
+    tables = _tables()
+
+    with source.engine.connect() as conn:
+        running = conn.scalar(
+            select(func.count()).select_from(ImportJob).where(
+                ImportJob.company_id == company_id,
+                ImportJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+            )
+        )
+    if running:
+        raise SystemExit(f"Company {company_id} has a reportee import running; retry when it finished")
+
+    # 1️⃣ Stop the company's traffic
+    _set_moving(company_id, True)
+    time.sleep(wait)
+
+    copied = moved = False
+    try:
+        with source.engine.begin() as src:
+            source_seq = _lock_sequence(src)
+            rows = {
+                table.name: [dict(row._mapping) for row in src.execute(
+                    select(table).where(_of_company(table, company_id)).order_by(*table.primary_key.columns)
+                )]
+                for table in tables
+            }
+
+            # 2️⃣ Copy in one transaction on the target
+            with dest.engine.begin() as dst:
+                target_seq = _lock_sequence(dst)
+                dst.execute(
+                    update(ChangeSequence)
+                    .where(ChangeSequence.name == TASK_SEQUENCE)
+                    .values(value=max(source_seq, target_seq))
+                )
+
+                floor = max(
+                    src.scalar(select(func.max(TaskEvent.id))) or 0,
+                    dst.scalar(select(func.max(TaskEvent.id))) or 0
+                )
+                for offset, event in enumerate(rows["task_events"], start=1):
+                    event["id"] = floor + offset
+                for job in rows["import_jobs"]:
+                    del job["id"]
+
+                for table in tables:
+                    if rows[table.name]:
+                        dst.execute(table.insert(), rows[table.name])
+            copied = True
+
+            with directory_engine.begin() as directory:
+                directory.execute(
+                    update(directory_companies)
+                    .where(directory_companies.c.id == company_id)
+                    .values(shard=target, moving=False)
+                )
+            moved = True
+
+            # 3️⃣ Drop the source copy; committing releases the source's lock
+            for table in reversed(tables):
+                src.execute(table.delete().where(_of_company(table, company_id)))
+
+    except Exception:
+        if not moved:
+            # Still served from the source: drop a half-finished copy and reopen
+            if copied:
+                with dest.engine.begin() as dst:
+                    for table in reversed(tables):
+                        dst.execute(table.delete().where(_of_company(table, company_id)))
+            _set_moving(company_id, False)
+        else:
+            print(f"⚠ company {company_id} now lives on shard {target}, but its old rows could not be "
+                  f"deleted from shard {source.index}; delete them by hand", file=sys.stderr)
+        raise
+
+    counts = ", ".join(f"{len(rows[table.name])} {table.name}" for table in tables if rows[table.name])
+    print(f"✓ moved company {company_id} from shard {source.index} to shard {target} ({counts})")
+
+
+def shard_loads() -> dict[int, dict[int, int]]:
+    """{shard: {company_id: task rows}} for every company in the directory."""
+    from app.models.task import Task
+
+    with directory_engine.connect() as directory:
+        placements = directory.execute(select(directory_companies.c.id, directory_companies.c.shard)).all()
+
+    loads = {shard.index: {} for shard in shards}
+    for company_id, shard in placements:
+        loads[shard][company_id] = 0
+
+    for shard in shards:
+        with shard.engine.connect() as conn:
+            for company_id, count in conn.execute(
+                select(Task.company_id, func.count()).group_by(Task.company_id)
+            ):
+                if company_id in loads[shard.index]:
+                    loads[shard.index][company_id] = count
+    return loads
+
+
+def plan_rebalance(loads: dict[int, dict[int, int]]) -> list[tuple[int, int, int]]:
+    """
+    Greedy plan of (company_id, from, to) moves: repeatedly move the
+    largest company from the fullest shard to the emptiest one that still
+    narrows the gap between them.
+    """
+    loads = {shard: dict(companies) for shard, companies in loads.items()}
+    moves = []
+
+    while True:
+        totals = {shard: sum(companies.values()) for shard, companies in loads.items()}
+        fullest = max(totals, key=totals.get)
+        emptiest = min(totals, key=totals.get)
+        gap = totals[fullest] - totals[emptiest]
+
+        candidates = [(size, company_id) for company_id, size in loads[fullest].items() if 0 < size < gap]
+        if not candidates:
+            return moves
+
+        size, company_id = max(candidates)
+        loads[emptiest][company_id] = loads[fullest].pop(company_id)
+        moves.append((company_id, fullest, emptiest))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move companies between shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="companies and tasks per shard")
+    move = commands.add_parser("move", help="move one company")
+    move.add_argument("company_id", type=int)
+    move.add_argument("shard", type=int)
+    rebalance = commands.add_parser("rebalance", help="even out tasks per shard")
+    rebalance.add_argument("--dry-run", action="store_true", help="only print the moves")
+    args = parser.parse_args()
+
+    if not SHARDED:
+        raise SystemExit("Sharding is off (no DB_SHARD_URLS): there is only one database")
+
+    if args.command == "status":
+        for shard, companies in shard_loads().items():
+            print(f"shard {shard}: {len(companies)} companies, {sum(companies.values())} tasks")
+
+    elif args.command == "move":
+        if not 0 <= args.shard < len(shards):
+            raise SystemExit(f"Shard must be between 0 and {len(shards) - 1}")
+        move_company(args.company_id, args.shard)
+
+    else:
+        moves = plan_rebalance(shard_loads())
+        if not moves:
+            print("✓ shards are balanced")
+        for company_id, source, target in moves:
+            if args.dry_run:
+                print(f"would move company {company_id}: shard {source} -> {target}")
+            else:
+                move_company(company_id, target)
@@ -0,0 +1,341 @@
+"""
+Tenant sharding: companies spread over several databases.
+
+DATABASE_URL is shard 0 and DB_SHARD_URLS adds shards 1..N. A company and
+everything it owns (users, tasks, events, counters) lives on exactly one
+shard, and every request already carries its company_id in the JWT, so
+`get_async_db` opens the caller's shard and one tenant's write lock no
+longer blocks everybody else.
+
+What has to be global lives in a small directory database
+(DIRECTORY_DATABASE_URL):
+
+- directory_companies: every company's id, name and shard, plus a `moving`
+  flag that `python -m app.db.rebalance` sets while it copies a company
+- directory_users: usernames, unique across shards, and the user ids
+- id_blocks: task ids, reserved SHARD_ID_BLOCK_SIZE at a time per worker
+
+Company, user and task ids all come from the directory, so they are unique
+across shards and a company can move without renumbering anything that
+appears in URLs, tokens or ETags.
+
+Without DB_SHARD_URLS there is one shard and no directory; every helper
+below then falls straight through to the single database.
+"""
+
+import math
+import time
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.db.database import (
+    DB_SHARD_READ_URLS,
+    DB_SHARD_URLS,
+    DIRECTORY_DATABASE_URL,
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    async_engine,
+    create_engines,
+    create_read_engine,
+    dialect_insert,
+    engine,
+    read_engine,
+)
+from app.core.config import SHARD_MAP_TTL_SECONDS, SHARD_ID_BLOCK_SIZE
+
+SHARDED = bool(DB_SHARD_URLS)
+
+
+class Shard:
+    def __init__(self, index: int, sync_engine, async_engine, read_engine=None,
+                 session: async_sessionmaker | None = None, read_session: async_sessionmaker | None = None):
+        self.index = index
+        self.engine = sync_engine
+        self.async_engine = async_engine
+        # None: reads share the writer's engine
+        self.read_engine = read_engine
+        self.session = session or async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
+        self.read_session = read_session or async_sessionmaker(
+            autoflush=False, expire_on_commit=False, bind=read_engine or async_engine
+        )
+
+
+shards = [Shard(0, engine, async_engine, read_engine, AsyncSessionLocal, AsyncReadSessionLocal)] + [
+    Shard(index, *create_engines(url), create_read_engine(url, read_url))
+    for index, (url, read_url) in enumerate(
+        zip(DB_SHARD_URLS, DB_SHARD_READ_URLS + [None] * len(DB_SHARD_URLS)), start=1
+    )
+]
+
+
+# ---- Directory ----
+
+_meta = MetaData()
+
+directory_companies = Table(
+    "directory_companies",
+    _meta,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False, unique=True),
+    Column("shard", Integer, nullable=False, index=True),
+    Column("moving", Boolean, nullable=False, default=False),
+)
+
+directory_users = Table(
+    "directory_users",
+    _meta,
+    Column("id", Integer, primary_key=True),
+    Column("username", String, nullable=False, unique=True),
+    Column("company_id", Integer, nullable=False, index=True),
+)
+
+id_blocks = Table(
+    "id_blocks",
+    _meta,
+    Column("name", String, primary_key=True),
+    Column("next_id", Integer, nullable=False),
+)
+
+directory_engine = directory_async_engine = DirectorySession = None
+if SHARDED:
+    directory_engine, directory_async_engine = create_engines(DIRECTORY_DATABASE_URL)
+    DirectorySession = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=directory_async_engine)
+
+
+def init_directory():
+    """
+    Create the directory schema. On its first start it registers what the
+    shards already hold (e.g. the single database sharding was turned on
+    for), so existing companies stay where they are.
+    """
+    from app.models.company import Company
+    from app.models.user import User
+    from app.models.task import Task
+
+    _meta.create_all(bind=directory_engine, checkfirst=True)
+
+    with directory_engine.begin() as directory:
+        if not directory.scalar(select(func.count()).select_from(directory_companies)):
+            for shard in shards:
+                with shard.engine.connect() as conn:
+                    companies = conn.execute(select(Company.id, Company.name)).all()
+                    users = conn.execute(select(User.id, User.username, User.company_id)).all()
+                if companies:
+                    directory.execute(insert(directory_companies), [
+                        {"id": company_id, "name": name, "shard": shard.index} for company_id, name in companies
+                    ])
+                if users:
+                    directory.execute(insert(directory_users), [
+                        {"id": user_id, "username": username, "company_id": company_id}
+                        for user_id, username, company_id in users
+                    ])
+
+        # Task ids continue above the highest id on any shard
+        if directory.scalar(select(id_blocks.c.next_id).where(id_blocks.c.name == "tasks")) is None:
+            top = 0
+            for shard in shards:
+                with shard.engine.connect() as conn:
+                    top = max(top, conn.scalar(select(func.max(Task.id))) or 0)
+            directory.execute(insert(id_blocks).values(name="tasks", next_id=top + 1))
+
+
+def migrate_all():
+    from app.db.migrations import run_migrations
+
+    for shard in shards:
+        run_migrations(shard.engine)
+    if SHARDED:
+        init_directory()
+
+
+# ---- Routing ----
+
+# company_id -> (shard index, moving, expires at)
+_placements: dict[int, tuple[int, bool, float]] = {}
+
+
+async def shard_for(company_id: int | None) -> Shard:
+    if not SHARDED or company_id is None:
+        return shards[0]
+
+    now = time.monotonic()
+    placement = _placements.get(company_id)
+    if placement is None or placement[2] < now:
+        async with DirectorySession() as directory:
+            row = (await directory.execute(
+                select(directory_companies.c.shard, directory_companies.c.moving).where(
+                    directory_companies.c.id == company_id
+                )
+            )).first()
+        if row is None:
+            raise HTTPException(status_code=401, detail="Unknown company")
+        placement = (row.shard, row.moving, now + SHARD_MAP_TTL_SECONDS)
+        _placements[company_id] = placement
+
+    if placement[1]:
+        raise HTTPException(
+            status_code=503,
+            detail="Company data is being moved; retry shortly",
+            headers={"Retry-After": str(math.ceil(SHARD_MAP_TTL_SECONDS))}
+        )
+    return shards[placement[0]]
+
+
+@asynccontextmanager
+async def tenant_session(company_id: int | None, read: bool = False):
+    """Session on the shard holding `company_id` (None: shard 0); `read` picks its read-only pool."""
+    shard = await shard_for(company_id)
+    async with (shard.read_session if read else shard.session)() as db:
+        yield db
+
+
+@asynccontextmanager
+async def login_session(username: str):
+    """Session on the shard of the user logging in (shard 0 if the name is unknown)."""
+    company_id = None
+    if SHARDED:
+        async with DirectorySession() as directory:
+            company_id = await directory.scalar(
+                select(directory_users.c.company_id).where(directory_users.c.username == username)
+            )
+
+    async with tenant_session(company_id) as db:
+        yield db
+
+
+# ---- Global names and ids ----
+
+async def _least_loaded_shard(directory: AsyncSession) -> int:
+    counts = dict.fromkeys(range(len(shards)), 0)
+    counts.update((await directory.execute(
+        select(directory_companies.c.shard, func.count()).group_by(directory_companies.c.shard)
+    )).all())
+    return min(counts, key=lambda index: (counts[index], index))
+
+
+async def register_manager(company_name: str, username: str) -> tuple[int | None, int | None]:
+    """
+    Directory side of a signup: the company's id (a new company is placed
+    on the shard with the fewest companies) and a global id for the new
+    manager. 400 if the username is taken on any shard. (None, None) with a
+    single database, where the users table's own checks decide.
+    """
+    if not SHARDED:
+        return None, None
+
+    async with DirectorySession() as directory:
+        if await directory.scalar(select(directory_users.c.id).where(directory_users.c.username == username)):
+            raise HTTPException(status_code=400, detail="User already exists")
+
+        company_id = await directory.scalar(select(directory_companies.c.id).where(directory_companies.c.name == company_name))
+        if company_id is None:
+            insert_stmt = dialect_insert(directory)
+            await directory.execute(
+                insert_stmt(directory_companies)
+                .values(name=company_name, shard=await _least_loaded_shard(directory), moving=False)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            company_id = await directory.scalar(
+                select(directory_companies.c.id).where(directory_companies.c.name == company_name)
+            )
+
+        user_ids = await _insert_usernames(directory, company_id, [username])
+        if username not in user_ids:
+            raise HTTPException(status_code=400, detail="User already exists")
+        await directory.commit()
+
+    return company_id, user_ids[username]
+
+
+async def _insert_usernames(directory: AsyncSession, company_id: int, usernames: list[str]) -> dict[str, int]:
+    insert_stmt = dialect_insert(directory)
+    rows = await directory.execute(
+        insert_stmt(directory_users)
+        .values([{"username": username, "company_id": company_id} for username in usernames])
+        .on_conflict_do_nothing(index_elements=["username"])
+        .returning(directory_users.c.username, directory_users.c.id)
+    )
+    return dict(rows.all())
+
+
+async def reserve_usernames(company_id: int, usernames: list[str]) -> dict[str, int | None]:
+    """
+    Global user ids for new users of `company_id`. Names already taken on
+    any shard are left out of the result. With a single database every
+    name maps to None and the users table's own checks decide.
+    """
+    if not SHARDED:
+        return dict.fromkeys(usernames)
+    if not usernames:
+        return {}
+
+    async with DirectorySession() as directory:
+        user_ids = await _insert_usernames(directory, company_id, usernames)
+        await directory.commit()
+    return user_ids
+
+
+async def release_usernames(usernames: list[str]):
+    """Give back reserved names whose users were never created (the shard write failed)."""
+    if not SHARDED or not usernames:
+        return
+
+    async with DirectorySession() as directory:
+        await directory.execute(directory_users.delete().where(directory_users.c.username.in_(usernames)))
+        await directory.commit()
+
+
+# name -> [next free id, end of block)
+_id_blocks: dict[str, list[int]] = {}
+
+
+async def reserve_ids(name: str, count: int = 1) -> list[int | None]:
+    """
+    `count` globally unique ids for table `name`; [None] * count with a
+    single database, where the table assigns them. Each worker takes a
+    block from the directory and hands ids out of it in memory.
+    """
+    if not SHARDED:
+        return [None] * count
+
+    block = _id_blocks.get(name)
+    if block is None or block[1] - block[0] < count:
+        size = max(count, SHARD_ID_BLOCK_SIZE)
+        async with DirectorySession() as directory:
+            end = await directory.scalar(
+                update(id_blocks)
+                .where(id_blocks.c.name == name)
+                .values(next_id=id_blocks.c.next_id + size)
+                .returning(id_blocks.c.next_id)
+            )
+            await directory.commit()
+        # Whatever was left of the previous block is dropped, never reused
+        block = _id_blocks[name] = [end - size, end]
+
+    start = block[0]
+    block[0] += count
+    return list(range(start, start + count))
+
+
+# ---- Engines, for startup / health / metrics ----
+
+def labeled_engines() -> list[tuple[str, object]]:
+    """(label, sync engine) pairs; shard 0 keeps the plain `sync` / `async` labels."""
+    labeled = []
+    for shard in shards:
+        suffix = f"_shard{shard.index}" if shard.index else ""
+        labeled += [(f"sync{suffix}", shard.engine), (f"async{suffix}", shard.async_engine.sync_engine)]
+        if shard.read_engine is not None:
+            labeled.append((f"read{suffix}", shard.read_engine.sync_engine))
+    if SHARDED:
+        labeled += [("directory_sync", directory_engine), ("directory_async", directory_async_engine.sync_engine)]
+    return labeled
+
+
+def async_engines() -> list:
+    return (
+        [shard.async_engine for shard in shards]
+        + [shard.read_engine for shard in shards if shard.read_engine is not None]
+        + ([directory_async_engine] if SHARDED else [])
+    )
@@ -1,3 +1,9 @@
 from .company import Company
 from .user import User
 from .task import Task
+from .import_job import ImportJob
+from .task_list_version import TaskListVersion
+from .task_event import TaskEvent
+from .change_sequence import ChangeSequence
+from .task_status_count import TaskStatusCount
+from .user_hierarchy import UserHierarchy
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String
+from app.db.database import Base
+
+class ChangeSequence(Base):
+    """
+    Named counters handed out inside write transactions. Tasks take their
+    `change_seq` from the "tasks" counter, which gives delta sync a
+    watermark that is ordered by commit rather than by wall clock.
+    """
+    __tablename__ = "change_sequences"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
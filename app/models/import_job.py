@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from app.db.database import Base
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    status = Column(String, default="PENDING")  # PENDING / RUNNING / COMPLETED / FAILED
+
+    total_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)
+    created_rows = Column(Integer, default=0)
+    errors = Column(JSON, default=list)  # [{"row": n, "username": ..., "detail": ...}]
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -18,9 +18,47 @@ class Task(Base):
 
     is_deleted = Column(Boolean, default=False)
 
+    # Position in the commit-ordered task change sequence (see app/core/sync.py)
+    change_seq = Column(Integer, nullable=False, default=0)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # relationships
     assigned_to = relationship("User", foreign_keys=[assigned_to_id])
     created_by = relationship("User", foreign_keys=[created_by_id])
+
+    # Hot-path indexes for the task list queries; partial so soft-deleted
+    # rows never bloat them. Trailing (created_at, id) matches the list
+    # sort order and the keyset cursor.
+    __table_args__ = (
+        Index(
+            "ix_tasks_creator_feed",
+            "company_id", "created_by_id", "created_at", "id",
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        Index(
+            "ix_tasks_assignee_feed",
+            "company_id", "assigned_to_id", "created_at", "id",
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        # GET /tasks?status=...: same feeds narrowed to one status
+        Index(
+            "ix_tasks_creator_status_feed",
+            "company_id", "created_by_id", "status", "created_at", "id",
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        Index(
+            "ix_tasks_assignee_status_feed",
+            "company_id", "assigned_to_id", "status", "created_at", "id",
+            sqlite_where=is_deleted == False,
+            postgresql_where=is_deleted == False,
+        ),
+        # Delta sync reads by change_seq and must include tombstones,
+        # so these are not partial
+        Index("ix_tasks_creator_changes", "company_id", "created_by_id", "change_seq"),
+        Index("ix_tasks_assignee_changes", "company_id", "assigned_to_id", "change_seq"),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from app.db.database import Base
+
+class TaskEvent(Base):
+    """
+    Append-only log of task changes. Feeds the live event stream and lets
+    clients resume after a disconnect with Last-Event-ID.
+    """
+    __tablename__ = "task_events"
+
+    id = Column(Integer, primary_key=True)
+
+    company_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)  # task.created / task.assigned / task.deleted / task.status_changed
+
+    status = Column(String, nullable=True)
+    created_by_id = Column(Integer, nullable=False)
+    assigned_to_id = Column(Integer, nullable=True)
+    previous_assigned_to_id = Column(Integer, nullable=True)
+    change_seq = Column(Integer, nullable=True)  # task change_seq this event produced
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_task_events_company_id", "company_id", "id"),
+        # Delta sync: tasks reassigned away from a reportee
+        Index("ix_task_events_revoked", "company_id", "previous_assigned_to_id", "change_seq"),
+    )
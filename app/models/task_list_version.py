@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.database import Base
+
+class TaskListVersion(Base):
+    """
+    Change counter for one user's view of GET /tasks, bumped in the same
+    transaction as every task mutation that touches that list. List ETags
+    and cache keys are derived from it.
+    """
+    __tablename__ = "task_list_versions"
+
+    company_id = Column(Integer, primary_key=True)
+    role = Column(String, primary_key=True)  # MANAGER / REPORTEE
+    user_id = Column(Integer, primary_key=True)
+
+    version = Column(Integer, nullable=False, default=1)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
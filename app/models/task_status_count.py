@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+from app.db.database import Base
+
+class TaskStatusCount(Base):
+    """
+    Number of live (not soft-deleted) tasks per status for one dashboard
+    scope, maintained by every task mutation (see app/core/task_stats.py).
+    """
+    __tablename__ = "task_status_counts"
+
+    company_id = Column(Integer, primary_key=True)
+    scope = Column(String, primary_key=True)  # COMPANY / MANAGER (created by) / REPORTEE (assigned to)
+    user_id = Column(Integer, primary_key=True)  # 0 for COMPANY
+    status = Column(String, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -24,3 +24,8 @@ class User(Base):
     # Relationships
     company = relationship("Company", backref="users")
     manager = relationship("User", remote_side=[id])
+
+    # Covers the "is this a reportee of my company" validation lookups
+    __table_args__ = (
+        Index("ix_users_company_role", "company_id", "role", "id"),
+    )
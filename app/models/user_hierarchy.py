@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.db.database import Base
+
+class UserHierarchy(Base):
+    """
+    Closure table of the User.manager_id tree: one row for every
+    (ancestor, descendant) pair, including each user with itself at depth 0.
+    A whole subtree is then a single indexed range read instead of a
+    recursive walk (see app/core/hierarchy.py).
+    """
+    __tablename__ = "user_hierarchy"
+
+    ancestor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Team listing: everyone under an ancestor, nearest levels first
+        Index("ix_user_hierarchy_subtree", "ancestor_id", "depth", "descendant_id"),
+        # Chain of managers above a user (used when a new user is attached)
+        Index("ix_user_hierarchy_ancestors", "descendant_id", "depth"),
+    )
@@ -1,51 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Request
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
+from fastapi import APIRouter, HTTPException, Response, Request
+from sqlalchemy import select
+from app.db.sharding import tenant_session, login_session, register_manager, release_usernames
 from app.models.user import User
 from app.models.company import Company
-from app.schemas.auth import ManagerSignup, LoginRequest
+from app.schemas.auth import ManagerSignup, LoginRequest, ManagerCreated, MessageResponse
 from app.core.roles import UserRole
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password_async, verify_password_async, needs_rehash
 from app.core.jwt import create_access_token
+from app.core.hierarchy import add_to_hierarchy
 from app.core.auth import get_current_user
+from app.core.principals import remember_principal
 from app.core.rate_limit import limiter
 from app.core.config import RATE_LIMITS
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-@router.post("/signup")
+@router.post("/signup", response_model=ManagerCreated)
 @limiter.limit(RATE_LIMITS.signup)
-def manager_signup(request: Request, payload: ManagerSignup, db: Session = Depends(get_db)):
-    # 1️⃣ Check if username already exists
-    existing_user = db.query(User).filter(
-        User.username == payload.username
-    ).first()
-
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User already exists")
-
-    # 2️⃣ Check if company already exists
-    company = db.query(Company).filter(
-        Company.name == payload.company_name
-    ).first()
-
-    # 3️⃣ If company does NOT exist, create it
-    if not company:
-        company = Company(name=payload.company_name)
-        db.add(company)
-        db.flush()  # get company.id without committing
-
-    # 4️⃣ Create manager under the company
-    manager = User(
-        username=payload.username,
-        password_hash=hash_password(payload.password),
-        role=UserRole.MANAGER,
-        company_id=company.id
-    )
-
-    db.add(manager)
-    db.commit()
-    db.refresh(manager)
+async def manager_signup(request: Request, payload: ManagerSignup):
+    # 0️⃣ Sharded: reserve the username across all shards and find / place the company
+    company_id, manager_id = await register_manager(payload.company_name, payload.username)
+
+    try:
+        async with tenant_session(company_id) as db:
+            # 1️⃣ Check if username already exists
+            existing_user = await db.scalar(
+                select(User).where(
+                    User.username == payload.username
+                )
+            )
+
+            if existing_user:
+                raise HTTPException(status_code=400, detail="User already exists")
+
+            # 2️⃣ Check if company already exists
+            company = await db.scalar(
+                select(Company).where(
+                    Company.name == payload.company_name
+                )
+            )
+
+            # 3️⃣ If company does NOT exist, create it
+            if not company:
+                company = Company(id=company_id, name=payload.company_name)
+                db.add(company)
+                await db.flush()  # get company.id without committing
+
+            # 4️⃣ Create manager under the company
+            manager = User(
+                id=manager_id,
+                username=payload.username,
+                password_hash=await hash_password_async(payload.password),
+                role=UserRole.MANAGER,
+                company_id=company.id
+            )
+
+            db.add(manager)
+            await db.flush()
+            await add_to_hierarchy(db, company.id, [manager.id])
+            await db.commit()
+    except Exception:
+        await release_usernames([payload.username])
+        raise
+
+    remember_principal(manager.id, company.id, manager.role, True, None)
 
     return {
         "manager_id": manager.id,
@@ -54,19 +72,28 @@ def manager_signup(request: Request, payload: ManagerSignup, db: Session = Depen
     }
 
 
-@router.post("/login")
+@router.post("/login", response_model=MessageResponse)
 @limiter.limit(RATE_LIMITS.login)
-def login(    
+async def login(    
         request: Request,
         payload: LoginRequest, 
-        response: Response, 
-        db: Session = Depends(get_db)
+        response: Response
     ):
     
-    user = db.query(User).filter(User.username == payload.username).first()
+    async with login_session(payload.username) as db:
+        user = await db.scalar(select(User).where(User.username == payload.username))
+
+        if not user or not await verify_password_async(payload.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        # Also warms the principal cache for this user's next requests
+        if not remember_principal(user.id, user.company_id, user.role, user.is_active, user.manager_id).is_active:
+            raise HTTPException(status_code=403, detail="Account is deactivated")
 
-    if not user or not verify_password(payload.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+        # Transparently upgrade hashes made with an older BCRYPT_ROUNDS
+        if needs_rehash(user.password_hash):
+            user.password_hash = await hash_password_async(payload.password)
+            await db.commit()
 
     token_data = {
         "sub": str(user.id),
@@ -90,7 +117,7 @@ def login(
     }
 
 
-@router.post("/logout")
+@router.post("/logout", response_model=MessageResponse)
 def logout(response: Response):
     response.delete_cookie("access_token")
     return {"message": "Logged out successfully"}
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy import text
+from app.db.sharding import async_engines
+
+router = APIRouter(tags=["Health"])
+
+
+# Liveness: the process is up and serving; never touches the database
+@router.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+# Readiness: startup finished and a pooled connection answers on every database
+@router.get("/readyz")
+async def readyz(request: Request):
+    if not request.app.state.ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+
+    try:
+        for bind in async_engines():
+            async with bind.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    return {"status": "ready"}
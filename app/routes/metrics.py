@@ -0,0 +1,22 @@
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import render_metrics
+from app.core.config import METRICS_TOKEN
+
+router = APIRouter(tags=["Metrics"])
+
+
+def require_metrics_token(request: Request):
+    if not METRICS_TOKEN:
+        return
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+# Prometheus scrape endpoint
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,70 +1,269 @@
+import asyncio
+import json
 import math
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
-from app.schemas.task import TaskCreate, TaskAssign, TaskStatusUpdate
+from collections import Counter
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_async_db, get_async_read_db
+from app.db.sharding import reserve_ids
+from app.schemas.task import (
+    TaskCreate,
+    TaskAssign,
+    TaskStatusUpdate,
+    TaskBulkCreate,
+    TaskBulkAssign,
+    TaskBulkStatusUpdate,
+    TaskListPage,
+    TaskDetail,
+    TaskCreated,
+    TaskAssigned,
+    TaskStatusUpdated,
+    TaskDeleted,
+    TaskBulkCreated,
+    TaskBulkUpdated,
+    TaskChanges,
+    TaskStats,
+)
 from app.models.task import Task
-from app.models.user import User
+from app.models.change_sequence import ChangeSequence
 from app.core.permissions import require_manager, require_reportee, get_current_user
+from app.core.auth import get_token_claims
+from app.core.principals import require_active, valid_reportee_ids
 from app.core.task_status import TaskStatus
-from app.core.rate_limit import limiter
-from app.core.config import RATE_LIMITS, TASK_LIST_PAGINATION_SIZE
+from app.core.rate_limit import limiter, batch_weight, batch_cost
+from app.core.config import (
+    RATE_LIMITS,
+    TASK_LIST_PAGINATION_SIZE,
+    TASK_LIST_MAX_PAGE_SIZE,
+    TASK_EVENT_HEARTBEAT_SECONDS,
+    TASK_EVENT_REPLAY_LIMIT,
+    TASK_SYNC_BATCH_SIZE,
+)
+from app.core.pagination import (
+    encode_cursor,
+    decode_cursor,
+    get_cached_count,
+    invalidate_cached_count,
+    task_count_key,
+    task_count_scope,
+)
+from app.core.etag import (
+    get_task_list_version,
+    bump_task_list_versions,
+    list_etag,
+    task_etag,
+    if_none_match,
+    check_if_match,
+)
+from app.core.cache import (
+    task_list_scope,
+    task_list_key,
+    get_task_list,
+    set_task_list,
+    invalidate_task_lists,
+)
+from app.core.events import LAGGED, hub, replay_events, task_event, insert_task_events, publish_task_events
+from app.core.task_stats import count_change, apply_count_changes, get_status_counts, get_team_status_counts
+from app.core.write_queue import status_writer_for, use_status_writer
+from app.core.task_queries import (
+    owner_column,
+    task_list_filters,
+    task_list_queries,
+    after_cursor,
+    team_tasks_query,
+    task_detail_query,
+    task_changes_query,
+    revoked_tasks_query,
+    task_state_query,
+    versioned_update,
+)
+from app.core.sync import TASK_SEQUENCE, next_change_seq, encode_sync_token, decode_sync_token
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+
+async def touch_task_views(db: AsyncSession, company_id: int, manager_ids=(), reportee_ids=()):
+    """
+    Record that a mutation changed the lists of these users (the creating
+    manager and old/new assignees). Call before commit: the list versions
+    are bumped in the same transaction, then cached pages/totals are dropped.
+    """
+    await bump_task_list_versions(db, company_id, manager_ids, reportee_ids)
+    invalidate_task_lists(company_id, manager_ids, reportee_ids)
+
+    for manager_id in set(manager_ids) - {None}:
+        invalidate_cached_count(task_count_scope("MANAGER", manager_id, company_id))
+    for reportee_id in set(reportee_ids) - {None}:
+        invalidate_cached_count(task_count_scope("REPORTEE", reportee_id, company_id))
+
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# ---- Task mutations ----
+# A mutation first reads the task's current state with one indexed SELECT
+# and applies its rules (company, owner, not deleted, If-Match, ...) to
+# it, so a rejected request (404, 412, 403, 409) writes nothing: no write
+# lock, no change number. The write is then an UPDATE keyed on the
+# change_seq that was read, which every write replaces; a task changed in
+# between matches nothing and the request gets a 409 instead of
+# overwriting the other change. The state read is also the "before" side
+# of the event and the status counters.
+
+async def _load_task(db: AsyncSession, request: Request, *where):
+    """The task's current state; 404 if no task matches, 412 if If-Match names another version."""
+    task = (await db.execute(task_state_query(*where))).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    check_if_match(request, task_etag(task.id, task.updated_at))
+    return task
+
+
+def _modified_concurrently() -> HTTPException:
+    # The task passed every rule when read, but changed before the write
+    return HTTPException(status_code=409, detail="Task was modified concurrently; retry")
+
+
 # List tasks for current user (manager or reportee)
-@router.get("")
+@router.get("", response_model=TaskListPage)
 @limiter.limit(RATE_LIMITS.task_list)
-def list_tasks(
+async def list_tasks(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None),
+    count: str = Query("exact", pattern="^(exact|cached|none)$"),
+    page_size: int = Query(TASK_LIST_PAGINATION_SIZE, ge=1, le=TASK_LIST_MAX_PAGE_SIZE),
+    status: TaskStatus | None = Query(None),
+    assigned_to_id: int | None = Query(None),
+    created_from: datetime | None = Query(None),
+    created_to: datetime | None = Query(None),
+    q: str | None = Query(None, min_length=1, max_length=200),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(get_current_user)
 ):
-    
-    offset = (page - 1) * TASK_LIST_PAGINATION_SIZE
-
-    # Base query depending on role
-    if current_user["role"] == "MANAGER":
-        query = db.query(Task).filter(
-            Task.created_by_id == int(current_user["sub"]),
-            Task.company_id == current_user["company_id"],
-            Task.is_deleted == False
-        )
+    """
+    Two pagination modes:
+    - page (OFFSET based, kept for existing clients)
+    - cursor (keyset on created_at/id, flat cost however deep the client scrolls)
 
-    elif current_user["role"] == "REPORTEE":
-        query = db.query(Task).filter(
-            Task.assigned_to_id == int(current_user["sub"]),
-            Task.company_id == current_user["company_id"],
-            Task.is_deleted == False
-        )
+    `count` controls the total: exact COUNT(*), a short-lived cached
+    COUNT(*), or none at all.
 
-    else:
+    Filters: `status`, `assigned_to_id`, `created_from` (inclusive) and
+    `created_to` (exclusive). `q` searches title and description and
+    ranks the matches (best first); search results are paged with `page`.
+    """
+
+    # Base filters depending on role, plus the optional ones
+    if owner_column(current_user["role"]) is None:
         raise HTTPException(status_code=403, detail="Invalid role")
 
-    total_tasks = query.count()
-    max_page = max(1, math.ceil(total_tasks / TASK_LIST_PAGINATION_SIZE))
+    created_from, created_to = _utc_naive(created_from), _utc_naive(created_to)
+    filters = task_list_filters(
+        current_user["role"], int(current_user["sub"]), current_user["company_id"],
+        status, assigned_to_id, created_from, created_to
+    )
 
-    # 🔴 Page validation
-    if page > max_page:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Page {page} does not exist. Max page is {max_page}."
-        )
+    if q is not None and cursor:
+        raise HTTPException(status_code=400, detail="Search results are ranked; page them with page, not cursor")
+
+    # Part of every cache key below, so filtered lists never mix
+    list_filters = (status and status.value, assigned_to_id, created_from, created_to, q)
 
-    tasks = (
-        query
-        .order_by(Task.created_at.desc())
-        .offset(offset)
-        .limit(TASK_LIST_PAGINATION_SIZE)
-        .all()
+    # Conditional GET: the list version changes with every mutation that
+    # touches this user's list, so a matching ETag skips the page query
+    # and the JSON encoding entirely
+    list_version = await get_task_list_version(
+        db, current_user["company_id"], current_user["role"], int(current_user["sub"])
     )
+    etag = list_etag(
+        current_user["company_id"], current_user["role"], current_user["sub"],
+        list_version, cursor or page, count, page_size, *list_filters
+    )
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
-    return {
+    # Read-through cache, keyed by the caller's scope and the page requested
+    cache_key = task_list_key(
+        task_list_scope(current_user["company_id"], current_user["role"], int(current_user["sub"])),
+        list_version,
+        cursor or page,
+        count,
+        page_size,
+        *list_filters
+    )
+    cached = get_task_list(cache_key)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+    response.headers["X-Cache"] = "MISS"
+
+    page_query, count_query = task_list_queries(
+        filters, current_user["role"], int(current_user["sub"]), q, fts=db.bind.dialect.name == "sqlite"
+    )
+
+    async def count_tasks():
+        return await db.scalar(count_query)
+
+    total_tasks = None
+    max_page = None
+
+    if count == "exact":
+        total_tasks = await count_tasks()
+    elif count == "cached":
+        total_tasks = await get_cached_count(
+            task_count_key(
+                task_count_scope(current_user["role"], int(current_user["sub"]), current_user["company_id"]),
+                list_version,
+                *list_filters
+            ),
+            count_tasks
+        )
+
+    if total_tasks is not None:
+        max_page = max(1, math.ceil(total_tasks / page_size))
+
+    if cursor:
+        # Keyset: rows strictly after the last (created_at, id) seen
+        page_query = after_cursor(page_query, *decode_cursor(cursor))
+        page = None
+
+    else:
+        # 🔴 Page validation (only possible when we know the total)
+        if max_page is not None and page > max_page:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Page {page} does not exist. Max page is {max_page}."
+            )
+
+        page_query = page_query.offset((page - 1) * page_size)
+
+    # Fetch one extra row to know whether a next page exists
+    tasks = (await db.execute(page_query.limit(page_size + 1))).all()
+    has_more = len(tasks) > page_size
+    tasks = tasks[:page_size]
+
+    # Ranked results have no (created_at, id) order to resume from
+    next_cursor = None
+    if has_more and q is None:
+        next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+
+    result = {
         "page": page,
-        "page_size": TASK_LIST_PAGINATION_SIZE,
+        "page_size": page_size,
         "total_tasks": total_tasks,
         "max_page": max_page,
+        "next_cursor": next_cursor,
         "tasks": [
             {
                 "task_id": task.id,
@@ -78,46 +277,55 @@ def list_tasks(
         ]
     }
 
+    set_task_list(cache_key, result)
+    return result
+
 
 # Create a new task (optionally assigned to a reportee)
-@router.post("")
+@router.post("", response_model=TaskCreated)
 @limiter.limit(RATE_LIMITS.task_create)
-def create_task(
+async def create_task(
     request: Request,
     payload: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(require_manager)
 ):
     assigned_to_id = None  # default: unassigned task
 
-    # 👉 Only validate reportee IF assigned_to_id is provided
+    # 👉 Only validate reportee IF assigned_to_id is provided (principal cache)
     if payload.assigned_to_id is not None:
-        reportee = db.query(User).filter(
-            User.id == payload.assigned_to_id,
-            User.company_id == current_user["company_id"],
-            User.role == "REPORTEE"
-        ).first()
-
-        if not reportee:
+        if not await valid_reportee_ids(db, current_user["company_id"], {payload.assigned_to_id}):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid reportee for this company"
             )
 
-        assigned_to_id = reportee.id
+        assigned_to_id = payload.assigned_to_id
 
     # 👉 Create task (assigned OR unassigned)
+    task_id, = await reserve_ids("tasks")
     task = Task(
+        id=task_id,  # None: assigned by the database (single shard)
         title=payload.title,
         description=payload.description,
         assigned_to_id=assigned_to_id,   # can be None
         created_by_id=int(current_user["sub"]),
-        company_id=current_user["company_id"]
+        company_id=current_user["company_id"],
+        change_seq=await next_change_seq(db)
     )
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.flush()
+    event = task_event(
+        "task.created", task.id, task.company_id, task.created_by_id, assigned_to_id, task.status, task.change_seq
+    )
+    db.add(event)
+    await touch_task_views(db, task.company_id, [task.created_by_id], [assigned_to_id])
+    await apply_count_changes(db, count_change(
+        Counter(), after=(task.company_id, task.created_by_id, assigned_to_id, TaskStatus.DEV)
+    ))
+    await db.commit()
+    publish_task_events([event])
 
     return {
         "id": task.id,
@@ -126,154 +334,787 @@ def create_task(
     }
 
 
-# Assign or reassign task to reportee of the Same company
-@router.patch("/{task_id}/assign")
-@limiter.limit(RATE_LIMITS.task_assign)
-def assign_task(
+# ---- Bulk endpoints ----
+# Registered before the /{task_id} routes so "bulk" is never parsed as an id.
+# Each validates every referenced reportee at once (principal cache, one
+# IN query for ids it does not hold), applies all changes in one
+# transaction and reports a result per item.
+
+def _duplicate_task_ids(items) -> set[int]:
+    # Only one change per task can win in a single UPDATE, so a task listed
+    # twice is rejected in every item instead of silently keeping the last
+    return {task_id for task_id, count in Counter(item.task_id for item in items).items() if count > 1}
+
+
+def _duplicate_result(index: int, task_id: int) -> dict:
+    return {"index": index, "task_id": task_id, "status_code": 400, "detail": "Task listed more than once in this batch"}
+
+
+# Create many tasks in one transaction
+@router.post(
+    "/bulk",
+    response_model=TaskBulkCreated,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(batch_weight)]
+)
+@limiter.limit(RATE_LIMITS.task_bulk_create, cost=batch_cost)
+async def bulk_create_tasks(
     request: Request,
-    task_id: int,
-    payload: TaskAssign,
-    db: Session = Depends(get_db),
+    payload: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(require_manager)
 ):
-    # 1️⃣ Fetch task (must belong to same company)
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.company_id == current_user["company_id"],
+    manager_id = int(current_user["sub"])
+    company_id = current_user["company_id"]
+
+    valid_reportees = await valid_reportee_ids(
+        db, company_id, {item.assigned_to_id for item in payload.items if item.assigned_to_id is not None}
+    )
+
+    results = [None] * len(payload.items)
+    rows = []
+    row_indexes = []
+
+    for index, item in enumerate(payload.items):
+        if item.assigned_to_id is not None and item.assigned_to_id not in valid_reportees:
+            results[index] = {
+                "index": index,
+                "status_code": 400,
+                "detail": "Invalid reportee for this company"
+            }
+            continue
+
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "assigned_to_id": item.assigned_to_id,
+            "created_by_id": manager_id,
+            "company_id": company_id
+        })
+        row_indexes.append(index)
+
+    if rows:
+        first_seq = await next_change_seq(db, len(rows))
+        reserved_ids = await reserve_ids("tasks", len(rows))
+        for offset, row in enumerate(rows):
+            row["change_seq"] = first_seq + offset
+            if reserved_ids[offset] is not None:
+                row["id"] = reserved_ids[offset]
+
+        # Unordered RETURNING keeps this one multi-row INSERT on SQLite;
+        # rows are matched back by their (unique) change number
+        task_ids = dict((await db.execute(
+            insert(Task).returning(Task.change_seq, Task.id),
+            rows
+        )).all())
+        task_ids = [task_ids[row["change_seq"]] for row in rows]
+        events = [
+            task_event(
+                "task.created", task_id, company_id, manager_id, row["assigned_to_id"], TaskStatus.DEV, row["change_seq"]
+            )
+            for row, task_id in zip(rows, task_ids)
+        ]
+        await insert_task_events(db, events)
+        await touch_task_views(db, company_id, [manager_id], [row["assigned_to_id"] for row in rows])
+
+        deltas = Counter()
+        for row in rows:
+            count_change(deltas, after=(company_id, manager_id, row["assigned_to_id"], TaskStatus.DEV))
+        await apply_count_changes(db, deltas)
+        await db.commit()
+        publish_task_events(events)
+
+        for index, row, task_id in zip(row_indexes, rows, task_ids):
+            results[index] = {
+                "index": index,
+                "status_code": 200,
+                "id": task_id,
+                "assigned_to_id": row["assigned_to_id"],
+                "message": "Task created successfully"
+            }
+
+    return {
+        "created": len(rows),
+        "failed": len(payload.items) - len(rows),
+        "results": results
+    }
+
+
+# Assign / reassign many tasks to reportees of the same company
+@router.patch(
+    "/bulk/assign",
+    response_model=TaskBulkUpdated,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(batch_weight)]
+)
+@limiter.limit(RATE_LIMITS.task_bulk_assign, cost=batch_cost)
+async def bulk_assign_tasks(
+    request: Request,
+    payload: TaskBulkAssign,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_manager)
+):
+    company_id = current_user["company_id"]
+    duplicates = _duplicate_task_ids(payload.items)
+
+    # 1️⃣ Current state of every referenced task (one IN query) and every
+    # referenced reportee (must belong to same company)
+    tasks = {task.id: task for task in (await db.execute(task_state_query(
+        Task.id.in_({item.task_id for item in payload.items} - duplicates),
+        Task.company_id == company_id,
         Task.is_deleted == False
-    ).first()
+    ))).all()}
+    valid_reportees = await valid_reportee_ids(
+        db, company_id, {item.assigned_to_id for item in payload.items}
+    )
+    updates = {
+        item.task_id: item.assigned_to_id for item in payload.items
+        if item.task_id in tasks and item.assigned_to_id in valid_reportees
+    }
+
+    # 2️⃣ One UPDATE for the whole batch; tasks changed since the read don't match
+    assigned = set()
+    if updates:
+        first_seq = await next_change_seq(db, len(updates))
+        change_seqs = {task_id: first_seq + offset for offset, task_id in enumerate(updates)}
+
+        assigned = set(await db.scalars(
+            versioned_update(
+                [tasks[task_id] for task_id in updates],
+                assigned_to_id=case(updates, value=Task.id),
+                change_seq=case(change_seqs, value=Task.id)
+            ).returning(Task.id)
+        ))
+
+    results = []
+    for index, item in enumerate(payload.items):
+        if item.task_id in duplicates:
+            results.append(_duplicate_result(index, item.task_id))
+        elif item.task_id not in tasks:
+            results.append({"index": index, "task_id": item.task_id, "status_code": 404, "detail": "Task not found"})
+        elif item.assigned_to_id not in valid_reportees:
+            results.append({"index": index, "task_id": item.task_id, "status_code": 400, "detail": "Invalid reportee for this company"})
+        elif item.task_id not in assigned:
+            results.append({"index": index, "task_id": item.task_id, "status_code": 409, "detail": _modified_concurrently().detail})
+        else:
+            results.append({
+                "index": index,
+                "task_id": item.task_id,
+                "status_code": 200,
+                "assigned_to_id": item.assigned_to_id,
+                "message": "Task assigned successfully"
+            })
+
+    if assigned:
+        before = [tasks[task_id] for task_id in updates if task_id in assigned]
+        await touch_task_views(
+            db,
+            company_id,
+            [task.created_by_id for task in before],
+            [*(updates[task_id] for task_id in assigned), *(task.assigned_to_id for task in before)]
+        )
+        events = [
+            task_event(
+                "task.assigned", task.id, company_id, task.created_by_id, updates[task.id],
+                task.status, change_seqs[task.id],
+                previous_assigned_to_id=task.assigned_to_id
+            )
+            for task in before
+        ]
+        await insert_task_events(db, events)
+
+        deltas = Counter()
+        for task in before:
+            count_change(
+                deltas,
+                before=(company_id, task.created_by_id, task.assigned_to_id, task.status),
+                after=(company_id, task.created_by_id, updates[task.id], task.status)
+            )
+        await apply_count_changes(db, deltas)
+        await db.commit()
+        publish_task_events(events)
+
+    return {
+        "updated": len(assigned),
+        "results": results
+    }
+
+
+# Update status of many tasks owned by this manager
+@router.patch(
+    "/bulk/status",
+    response_model=TaskBulkUpdated,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(batch_weight)]
+)
+@limiter.limit(RATE_LIMITS.task_bulk_status_update, cost=batch_cost)
+async def bulk_update_task_status(
+    request: Request,
+    payload: TaskBulkStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_manager)
+):
+    manager_id = int(current_user["sub"])
+    company_id = current_user["company_id"]
+    duplicates = _duplicate_task_ids(payload.items)
+
+    # 1️⃣ Current state of this manager's live tasks in the batch (one IN query)
+    tasks = {task.id: task for task in (await db.execute(task_state_query(
+        Task.id.in_({item.task_id for item in payload.items} - duplicates),
+        Task.created_by_id == manager_id,
+        Task.company_id == company_id,
+        Task.is_deleted == False
+    ))).all()}
+    updates = {item.task_id: item.status for item in payload.items if item.task_id in tasks}
+
+    # 2️⃣ One UPDATE for the whole batch; tasks changed since the read don't match
+    updated = set()
+    if updates:
+        first_seq = await next_change_seq(db, len(updates))
+        change_seqs = {task_id: first_seq + offset for offset, task_id in enumerate(updates)}
+
+        updated = set(await db.scalars(
+            versioned_update(
+                [tasks[task_id] for task_id in updates],
+                status=case(updates, value=Task.id),
+                change_seq=case(change_seqs, value=Task.id)
+            ).returning(Task.id)
+        ))
+
+    results = []
+    for index, item in enumerate(payload.items):
+        if item.task_id in duplicates:
+            results.append(_duplicate_result(index, item.task_id))
+        elif item.task_id not in tasks:
+            results.append({"index": index, "task_id": item.task_id, "status_code": 404, "detail": "Task not found"})
+        elif item.task_id not in updated:
+            results.append({"index": index, "task_id": item.task_id, "status_code": 409, "detail": _modified_concurrently().detail})
+        else:
+            results.append({
+                "index": index,
+                "task_id": item.task_id,
+                "status_code": 200,
+                "new_status": item.status,
+                "message": "Task status updated successfully"
+            })
+
+    if updated:
+        before = [tasks[task_id] for task_id in updates if task_id in updated]
+        await touch_task_views(
+            db,
+            company_id,
+            [manager_id],
+            [task.assigned_to_id for task in before]
+        )
+        events = [
+            task_event(
+                "task.status_changed", task.id, company_id, manager_id,
+                task.assigned_to_id, updates[task.id], change_seqs[task.id]
+            )
+            for task in before
+        ]
+        await insert_task_events(db, events)
+
+        deltas = Counter()
+        for task in before:
+            count_change(
+                deltas,
+                before=(company_id, manager_id, task.assigned_to_id, task.status),
+                after=(company_id, manager_id, task.assigned_to_id, updates[task.id])
+            )
+        await apply_count_changes(db, deltas)
+        await db.commit()
+        publish_task_events(events)
+
+    return {
+        "updated": len(updated),
+        "results": results
+    }
+
+
+# ---- Live change feed ----
+# Also registered before /{task_id}. Clients get the events of the tasks
+# they can see; after a disconnect they resume with Last-Event-ID instead
+# of re-polling the list.
+
+async def _task_event_stream(current_user: dict, last_event_id: int | None):
+    company_id = current_user["company_id"]
+    role = current_user["role"]
+    user_id = int(current_user["sub"])
+
+    # 1️⃣ Subscribe first so nothing committed during the replay is missed
+    subscriber = hub.subscribe(company_id, role, user_id)
+    try:
+        # 2️⃣ Replay what the client missed from the persisted log, page by page
+        last_sent = last_event_id or 0
+        if last_event_id is not None:
+            while True:
+                page = await replay_events(company_id, role, user_id, last_sent)
+                for event in page:
+                    last_sent = event["id"]
+                    yield event
+                if len(page) < TASK_EVENT_REPLAY_LIMIT:
+                    break
+
+        # 3️⃣ Live events (skip ones already replayed); None = heartbeat
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), TASK_EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+
+            if event is LAGGED:
+                return
+            if event["id"] > last_sent:
+                last_sent = event["id"]
+                yield event
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+def _parse_last_event_id(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+
+# Server-Sent Events stream of task changes
+@router.get("/events")
+@limiter.limit(RATE_LIMITS.task_events)
+async def stream_task_events(
+    request: Request,
+    last_event_id: str | None = Query(None, alias="last_event_id"),
+    current_user=Depends(get_current_user)
+):
+    # Browsers send Last-Event-ID on reconnect; the query param is for first connects
+    after_id = _parse_last_event_id(request.headers.get("Last-Event-ID") or last_event_id)
+
+    async def body():
+        yield f"retry: {TASK_EVENT_HEARTBEAT_SECONDS * 1000}\n\n"
+        async for event in _task_event_stream(current_user, after_id):
+            if await request.is_disconnected():
+                return
+            if event is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Same feed over a WebSocket (authenticated by the access_token cookie)
+@router.websocket("/events/ws")
+async def task_events_websocket(websocket: WebSocket, last_event_id: int | None = None):
+    current_user = get_token_claims(websocket)
+    if current_user is None:
+        await websocket.close(code=1008)
+        return
+    try:
+        await require_active(current_user)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    try:
+        async for event in _task_event_stream(current_user, last_event_id):
+            if event is None:
+                await websocket.send_json({"type": "heartbeat"})
+            else:
+                await websocket.send_json(event)
+        # Fell behind: ask the client to reconnect with its last id
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+
+
+# ---- Delta sync ----
+
+# Tasks created, updated or deleted since the client's watermark
+@router.get("/changes", response_model=TaskChanges, response_model_exclude_unset=True)
+@limiter.limit(RATE_LIMITS.task_changes)
+async def list_task_changes(
+    request: Request,
+    since: str | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user)
+):
+    company_id = current_user["company_id"]
+    user_id = int(current_user["sub"])
+    is_manager = current_user["role"] == "MANAGER"
+    after_seq = decode_sync_token(since) if since else 0
+
+    # 1️⃣ Upper bound for this response. Each query below reads its own,
+    # possibly newer snapshot; bounding them by `<= high_seq` keeps out
+    # anything committed after this read, and every number up to it is
+    # already committed (the sequence is commit-ordered)
+    high_seq = await db.scalar(
+        select(ChangeSequence.value).where(ChangeSequence.name == TASK_SEQUENCE)
+    ) or 0
+
+    # 2️⃣ Changed tasks in this user's view. Initial sync: the client has nothing to delete yet
+    tasks = (await db.scalars(
+        task_changes_query(company_id, current_user["role"], user_id, after_seq, high_seq, live_only=since is None)
+        .limit(TASK_SYNC_BATCH_SIZE + 1)
+    )).all()
+
+    changes = [
+        {"change_seq": task.change_seq, "task_id": task.id, "deleted": True}
+        if task.is_deleted else
+        {
+            "change_seq": task.change_seq,
+            "task_id": task.id,
+            "deleted": False,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "assigned_to_id": task.assigned_to_id,
+            "created_by_id": task.created_by_id,
+            "created_at": task.created_at,
+            "updated_at": task.updated_at
+        }
+        for task in tasks
+    ]
+
+    # 3️⃣ Reportees also lose tasks that were reassigned to someone else;
+    # those only exist in the event log and are sent as tombstones
+    if not is_manager and since is not None:
+        revoked = (await db.execute(
+            revoked_tasks_query(company_id, user_id, after_seq, high_seq).limit(TASK_SYNC_BATCH_SIZE + 1)
+        )).all()
+
+        changes.extend({"change_seq": seq, "task_id": task_id, "deleted": True} for task_id, seq in revoked)
+        changes.sort(key=lambda change: change["change_seq"])
+
+    has_more = len(changes) > TASK_SYNC_BATCH_SIZE
+    changes = changes[:TASK_SYNC_BATCH_SIZE]
+
+    # Without more pages the client is current up to high_seq, even if
+    # the changes in between belonged to other users
+    next_seq = changes[-1]["change_seq"] if has_more else high_seq
+
+    return {
+        "changes": changes,
+        "has_more": has_more,
+        "next_since": encode_sync_token(next_seq)
+    }
+
+
+# ---- Dashboard counts ----
+
+# Task counts by status, read from the maintained counters (app/core/task_stats.py)
+@router.get("/stats", response_model=TaskStats)
+@limiter.limit(RATE_LIMITS.task_stats)
+async def get_task_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user)
+):
+    company_id = current_user["company_id"]
+    user_id = int(current_user["sub"])
+    is_manager = current_user["role"] == "MANAGER"
+
+    return {
+        "user": await get_status_counts(db, company_id, current_user["role"], user_id),
+        "company": await get_status_counts(db, company_id, "COMPANY") if is_manager else None,
+        "team": await get_team_status_counts(db, company_id, user_id) if is_manager else None
+    }
+
+
+# Tasks assigned to anyone in the caller's reporting subtree
+@router.get("/team", response_model=TaskListPage)
+@limiter.limit(RATE_LIMITS.task_team)
+async def list_team_tasks(
+    request: Request,
+    cursor: str | None = Query(None),
+    page_size: int = Query(TASK_LIST_PAGINATION_SIZE, ge=1, le=TASK_LIST_MAX_PAGE_SIZE),
+    status: TaskStatus | None = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(require_manager)
+):
+    """
+    One join from the user_hierarchy subtree to each member's assignee
+    feed, newest first, paged with the same (created_at, id) cursor as
+    GET /tasks. No recursion however deep the hierarchy is.
+    """
+    tasks = (await db.execute(
+        team_tasks_query(
+            int(current_user["sub"]), current_user["company_id"], status,
+            decode_cursor(cursor) if cursor else None
+        ).limit(page_size + 1)
+    )).all()
+
+    next_cursor = None
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+
+    return {
+        "page": None,
+        "page_size": page_size,
+        "total_tasks": None,
+        "max_page": None,
+        "next_cursor": next_cursor,
+        "tasks": [
+            {
+                "task_id": task.id,
+                "title": task.title,
+                "status": task.status,
+                "assigned_to_id": task.assigned_to_id,
+                "created_at": task.created_at,
+                "updated_at": task.updated_at
+            }
+            for task in tasks
+        ]
+    }
+
+
+# Get a single task (creator manager or assignee), with conditional GET
+@router.get("/{task_id}", response_model=TaskDetail)
+@limiter.limit(RATE_LIMITS.task_detail)
+async def get_task(
+    request: Request,
+    response: Response,
+    task_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user)
+):
+    task = await db.scalar(task_detail_query(
+        task_id, current_user["role"], int(current_user["sub"]), current_user["company_id"]
+    ))
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # 2️⃣ Fetch reportee (must belong to same company)
-    reportee = db.query(User).filter(
-        User.id == payload.assigned_to_id,
-        User.company_id == current_user["company_id"],
-        User.role == "REPORTEE"
-    ).first()
+    etag = task_etag(task.id, task.updated_at)
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
 
-    if not reportee:
+    return {
+        "task_id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "assigned_to_id": task.assigned_to_id,
+        "created_by_id": task.created_by_id,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at
+    }
+
+
+# Assign or reassign task to reportee of the Same company
+@router.patch("/{task_id}/assign", response_model=TaskAssigned)
+@limiter.limit(RATE_LIMITS.task_assign)
+async def assign_task(
+    request: Request,
+    response: Response,
+    task_id: int,
+    payload: TaskAssign,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_manager)
+):
+    company_id = current_user["company_id"]
+
+    # 1️⃣ Live task of this company (404), at the client's version (412)
+    task = await _load_task(db, request, Task.id == task_id, Task.company_id == company_id, Task.is_deleted == False)
+
+    # 2️⃣ Reportee must belong to the same company (principal cache)
+    if not await valid_reportee_ids(db, company_id, {payload.assigned_to_id}):
         raise HTTPException(
             status_code=400,
             detail="Invalid reportee for this company"
         )
 
-    # 3️⃣ Assign / reassign task
-    task.assigned_to_id = reportee.id
-    db.commit()
-    db.refresh(task)
+    # 3️⃣ Assign / reassign, unless the task changed since it was read
+    change_seq = await next_change_seq(db)
+    updated_at = await db.scalar(
+        versioned_update([task], assigned_to_id=payload.assigned_to_id, change_seq=change_seq)
+        .returning(Task.updated_at)
+    )
+    if updated_at is None:
+        raise _modified_concurrently()
+
+    # 4️⃣ Event, list versions and counters in the same transaction
+    event = task_event(
+        "task.assigned", task_id, company_id, task.created_by_id, payload.assigned_to_id, task.status, change_seq,
+        previous_assigned_to_id=task.assigned_to_id
+    )
+    db.add(event)
+    await touch_task_views(db, company_id, [task.created_by_id], [task.assigned_to_id, payload.assigned_to_id])
+    await apply_count_changes(db, count_change(
+        Counter(),
+        before=(company_id, task.created_by_id, task.assigned_to_id, task.status),
+        after=(company_id, task.created_by_id, payload.assigned_to_id, task.status)
+    ))
+    await db.commit()
+    publish_task_events([event])
+
+    response.headers["ETag"] = task_etag(task_id, updated_at)
 
     return {
-        "task_id": task.id,
-        "assigned_to_id": reportee.id,
+        "task_id": task_id,
+        "assigned_to_id": payload.assigned_to_id,
         "message": "Task assigned successfully"
     }
 
 
 # To delete task by manager only
-@router.delete("/{task_id}")
+@router.delete("/{task_id}", response_model=TaskDeleted)
 @limiter.limit(RATE_LIMITS.task_delete)
-def delete_task(
+async def delete_task(
     request: Request,
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(require_manager)
 ):
-    task = db.query(Task).filter(
+    company_id = current_user["company_id"]
+    task = await _load_task(
+        db, request,
         Task.id == task_id,
         Task.created_by_id == int(current_user["sub"]),
-        Task.company_id == current_user["company_id"],
+        Task.company_id == company_id,
         Task.is_deleted == False
-    ).first()
+    )
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    change_seq = await next_change_seq(db)
+    if await db.scalar(versioned_update([task], is_deleted=True, change_seq=change_seq).returning(Task.id)) is None:
+        raise _modified_concurrently()
 
-    task.is_deleted = True
-    db.commit()
+    event = task_event(
+        "task.deleted", task_id, company_id, task.created_by_id, task.assigned_to_id, task.status, change_seq
+    )
+    db.add(event)
+    await touch_task_views(db, company_id, [task.created_by_id], [task.assigned_to_id])
+    await apply_count_changes(db, count_change(
+        Counter(), before=(company_id, task.created_by_id, task.assigned_to_id, task.status)
+    ))
+    await db.commit()
+    publish_task_events([event])
 
     return {
-        "task_id": task.id,
+        "task_id": task_id,
         "message": "Task deleted successfully"
     }
 
 
-# To update task status by manager only
-@router.patch("/{task_id}/status")
-@limiter.limit(RATE_LIMITS.task_status_update)
-def update_task_status_by_manager(
+async def _stage_status_update(
+    db: AsyncSession,
     request: Request,
+    current_user: dict,
     task_id: int,
-    payload: TaskStatusUpdate,
-    db: Session = Depends(get_db),
-    current_user=Depends(require_manager)
+    new_status: TaskStatus,
+    by_reportee: bool
 ):
-    # 1️⃣ Fetch task owned by this manager
-    task = db.query(Task).filter(
+    """
+    Write one status change without committing; returns (response body,
+    ETag, event). A rejected change fails on the read, before writing
+    anything, which is what lets the group-commit writer batch these
+    (app/core/write_queue.py).
+    """
+    company_id = current_user["company_id"]
+
+    # 1️⃣ Task assigned to this reportee / owned by this manager (404 / 412)
+    task = await _load_task(
+        db, request,
         Task.id == task_id,
-        Task.created_by_id == int(current_user["sub"]),
-        Task.company_id == current_user["company_id"],
+        owner_column("REPORTEE" if by_reportee else "MANAGER") == int(current_user["sub"]),
+        Task.company_id == company_id,
         Task.is_deleted == False
-    ).first()
+    )
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    # 2️⃣ BUSINESS RULE (current strategy): reportees can only complete a task, once
+    if by_reportee:
+        if task.status == TaskStatus.COMPLETED:
+            raise HTTPException(status_code=409, detail="Task is already completed")
+        if new_status != TaskStatus.COMPLETED:
+            raise HTTPException(
+                status_code=403,
+                detail="Reportee can update task status only to COMPLETED"
+            )
 
-    # 2️⃣ Update status (manager can set ANY status)
-    task.status = payload.status
-    db.commit()
-    db.refresh(task)
+    # 3️⃣ Update status (manager can set ANY status)
+    change_seq = await next_change_seq(db)
+    updated_at = await db.scalar(
+        versioned_update([task], status=new_status, change_seq=change_seq).returning(Task.updated_at)
+    )
+    if updated_at is None:
+        raise _modified_concurrently()
 
-    return {
-        "task_id": task.id,
-        "new_status": task.status,
+    event = task_event(
+        "task.status_changed", task_id, company_id, task.created_by_id, task.assigned_to_id, new_status, change_seq
+    )
+    db.add(event)
+    await touch_task_views(db, company_id, [task.created_by_id], [task.assigned_to_id])
+    await apply_count_changes(db, count_change(
+        Counter(),
+        before=(company_id, task.created_by_id, task.assigned_to_id, task.status),
+        after=(company_id, task.created_by_id, task.assigned_to_id, new_status)
+    ))
+
+    body = {
+        "task_id": task_id,
+        "new_status": new_status,
         "message": "Task status updated successfully"
     }
+    return body, task_etag(task_id, updated_at), event
 
 
-# To update task status by reportee only
-@router.patch("/{task_id}/self")
-@limiter.limit(RATE_LIMITS.task_status_self_update)
-def update_task_status_by_reportee(
+async def _update_task_status(
+    db: AsyncSession,
     request: Request,
+    response: Response,
+    current_user: dict,
     task_id: int,
-    payload: TaskStatusUpdate,
-    db: Session = Depends(get_db),
-    current_user=Depends(require_reportee)
+    new_status: TaskStatus,
+    by_reportee: bool
 ):
-    # 1️⃣ Fetch task assigned to this reportee
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.assigned_to_id == int(current_user["sub"]),
-        Task.company_id == current_user["company_id"],
-        Task.is_deleted == False
-    ).first()
+    async def stage(session: AsyncSession):
+        return await _stage_status_update(session, request, current_user, task_id, new_status, by_reportee)
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    if use_status_writer():
+        # Group-committed with whatever else is queued right now
+        body, etag, event = await status_writer_for(db).submit(stage)
+    else:
+        body, etag, event = await stage(db)
+        await db.commit()
 
-    if task.status == TaskStatus.COMPLETED:
-        raise HTTPException(
-            status_code=409,
-            detail="Task is already completed"
-        )
+    publish_task_events([event])
+    response.headers["ETag"] = etag
+    return body
 
 
-    # 2️⃣ BUSINESS RULE (current strategy)
-    if payload.status != TaskStatus.COMPLETED:
-        raise HTTPException(
-            status_code=403,
-            detail="Reportee can update task status only to COMPLETED"
-        )
-    
-    # 3️⃣ Update status
-    task.status = payload.status
-    db.commit()
-    db.refresh(task)
+# To update task status by manager only
+@router.patch("/{task_id}/status", response_model=TaskStatusUpdated)
+@limiter.limit(RATE_LIMITS.task_status_update)
+async def update_task_status_by_manager(
+    request: Request,
+    response: Response,
+    task_id: int,
+    payload: TaskStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_manager)
+):
+    return await _update_task_status(db, request, response, current_user, task_id, payload.status, by_reportee=False)
 
-    return {
-        "task_id": task.id,
-        "new_status": task.status,
-        "message": "Task status updated successfully"
-    }
+
+# To update task status by reportee only
+@router.patch("/{task_id}/self", response_model=TaskStatusUpdated)
+@limiter.limit(RATE_LIMITS.task_status_self_update)
+async def update_task_status_by_reportee(
+    request: Request,
+    response: Response,
+    task_id: int,
+    payload: TaskStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_reportee)
+):
+    return await _update_task_status(db, request, response, current_user, task_id, payload.status, by_reportee=True)
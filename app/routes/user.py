@@ -1,47 +1,184 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.db.deps import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.deps import get_async_db, get_async_read_db
+from app.db.sharding import reserve_usernames, release_usernames
 from app.models.user import User
-from app.schemas.user import ReporteeCreate
-from app.core.permissions import require_manager
+from app.models.import_job import ImportJob
+from app.schemas.user import (
+    ReporteeCreate,
+    ReporteeCreated,
+    ReporteeImportStarted,
+    ReporteeImportStatus,
+    TeamPage,
+)
+from app.core.permissions import require_manager, get_current_user
+from app.core.principals import remember_principal
+from app.core.hierarchy import add_to_hierarchy, team_members_query, team_size_query
+from app.core.pagination import encode_member_cursor, decode_member_cursor
 from app.core.roles import UserRole
-from app.core.security import hash_password
-from app.core.config import RATE_LIMITS
+from app.core.security import hash_password_async
+from app.core.config import RATE_LIMITS, TEAM_PAGE_SIZE
 from app.core.rate_limit import limiter
+from app.core.job_status import JobStatus
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.post("/reportees")
+@router.post("/reportees", response_model=ReporteeCreated)
 @limiter.limit(RATE_LIMITS.create_reportee)
-def create_reportee(
+async def create_reportee(
     request: Request,
     payload: ReporteeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(require_manager)
 ):
-    # Ensure username is unique
-    existing = db.query(User).filter(
-        User.username == payload.username
-    ).first()
-
-    if existing:
+    # Sharded: reserve the username (and a user id) across all shards
+    user_ids = await reserve_usernames(current_user["company_id"], [payload.username])
+    if payload.username not in user_ids:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    reportee = User(
-        username=payload.username,
-        password_hash=hash_password(payload.password),
-        role=UserRole.REPORTEE,
-        company_id=current_user["company_id"],
-        manager_id=int(current_user["sub"])
-    )
+    try:
+        # Ensure username is unique
+        existing = await db.scalar(
+            select(User).where(
+                User.username == payload.username
+            )
+        )
+
+        if existing:
+            raise HTTPException(status_code=400, detail="Username already exists")
+
+        reportee = User(
+            id=user_ids[payload.username],
+            username=payload.username,
+            password_hash=await hash_password_async(payload.password),
+            role=UserRole.REPORTEE,
+            company_id=current_user["company_id"],
+            manager_id=int(current_user["sub"])
+        )
 
-    db.add(reportee)
-    db.commit()
-    db.refresh(reportee)
+        db.add(reportee)
+        await db.flush()
+        await add_to_hierarchy(db, current_user["company_id"], [reportee.id], int(current_user["sub"]))
+        await db.commit()
+    except Exception:
+        await release_usernames([payload.username])
+        raise
+
+    # Assignable straight away, without a lookup
+    remember_principal(reportee.id, reportee.company_id, reportee.role, True, reportee.manager_id)
 
     return {
         "id": reportee.id,
         "username": reportee.username,
         "message": "Reportee created successfully"
     }
+
+
+# Bulk onboarding: JSON {"items": [...]} or text/csv upload, processed in the background
+@router.post("/reportees/bulk", status_code=202, response_model=ReporteeImportStarted)
+@limiter.limit(RATE_LIMITS.create_reportee_bulk)
+async def create_reportees_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_manager)
+):
+    # Imported on first use: the CSV/import machinery isn't needed to boot a worker
+    from app.core.reportee_import import parse_rows, run_import
+
+    rows = parse_rows(request.headers.get("content-type", ""), await request.body())
+
+    job = ImportJob(
+        company_id=current_user["company_id"],
+        created_by_id=int(current_user["sub"]),
+        status=JobStatus.PENDING,
+        total_rows=len(rows),
+        errors=[]
+    )
+    db.add(job)
+    await db.commit()
+
+    background_tasks.add_task(
+        run_import, job.id, rows, current_user["company_id"], int(current_user["sub"])
+    )
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "status_url": f"/users/reportees/bulk/{job.id}",
+        "message": "Import started"
+    }
+
+
+# Poll a bulk import for progress and per-row errors
+@router.get("/reportees/bulk/{job_id}", response_model=ReporteeImportStatus)
+@limiter.limit(RATE_LIMITS.reportee_import_status)
+async def get_reportee_import(
+    request: Request,
+    job_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(require_manager)
+):
+    job = await db.scalar(
+        select(ImportJob).where(
+            ImportJob.id == job_id,
+            ImportJob.company_id == current_user["company_id"],
+            ImportJob.created_by_id == int(current_user["sub"])
+        )
+    )
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "created_rows": job.created_rows,
+        "errors": job.errors
+    }
+
+
+# Everyone reporting to the caller, directly or through other managers
+@router.get("/me/team", response_model=TeamPage)
+@limiter.limit(RATE_LIMITS.team)
+async def get_my_team(
+    request: Request,
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Read from the user_hierarchy closure table: the whole subtree is one
+    range on ix_user_hierarchy_subtree, nearest levels first, paged by a
+    (depth, id) keyset cursor.
+    """
+    user_id = int(current_user["sub"])
+    team_size = await db.scalar(team_size_query(user_id))
+    query = team_members_query(user_id, decode_member_cursor(cursor) if cursor else None)
+
+    members = (await db.execute(query.limit(TEAM_PAGE_SIZE + 1))).all()
+    next_cursor = None
+    if len(members) > TEAM_PAGE_SIZE:
+        members = members[:TEAM_PAGE_SIZE]
+        next_cursor = encode_member_cursor(members[-1].depth, members[-1].id)
+
+    return {
+        "team_size": team_size,
+        "next_cursor": next_cursor,
+        "members": [
+            {
+                "id": member.id,
+                "username": member.username,
+                "role": member.role,
+                "manager_id": member.manager_id,
+                "is_active": bool(member.is_active),
+                "depth": member.depth
+            }
+            for member in members
+        ]
+    }
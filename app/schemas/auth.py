@@ -8,3 +8,11 @@ class ManagerSignup(BaseModel):
 class LoginRequest(BaseModel):
     username: str
     password: str
+
+class ManagerCreated(BaseModel):
+    manager_id: int
+    company_id: int
+    message: str
+
+class MessageResponse(BaseModel):
+    message: str
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, field_validator
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
 from app.core.task_status import TaskStatus
+from app.core.config import TASK_BULK_MAX_ITEMS
 
 class TaskCreate(BaseModel):
     title: str
@@ -23,3 +25,133 @@ class TaskAssign(BaseModel):
 
 class TaskStatusUpdate(BaseModel):
     status: TaskStatus
+
+
+
+class TaskBulkCreate(BaseModel):
+    items: list[TaskCreate] = Field(min_length=1, max_length=TASK_BULK_MAX_ITEMS)
+
+
+
+class TaskAssignItem(TaskAssign):
+    task_id: int
+
+
+class TaskBulkAssign(BaseModel):
+    items: list[TaskAssignItem] = Field(min_length=1, max_length=TASK_BULK_MAX_ITEMS)
+
+
+
+class TaskStatusItem(TaskStatusUpdate):
+    task_id: int
+
+
+class TaskBulkStatusUpdate(BaseModel):
+    items: list[TaskStatusItem] = Field(min_length=1, max_length=TASK_BULK_MAX_ITEMS)
+
+
+# ---- Responses ----
+# Declared as response_model on the routes, so FastAPI validates and
+# serializes them in one pydantic-core pass instead of jsonable_encoder.
+
+class TaskSummary(BaseModel):
+    task_id: int
+    title: str
+    status: TaskStatus
+    assigned_to_id: int | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskListPage(BaseModel):
+    page: int | None
+    page_size: int
+    total_tasks: int | None
+    max_page: int | None
+    next_cursor: str | None
+    tasks: list[TaskSummary]
+
+
+class TaskDetail(TaskSummary):
+    description: str | None
+    created_by_id: int
+
+
+class TaskCreated(BaseModel):
+    id: int
+    assigned_to_id: int | None
+    message: str
+
+
+class TaskAssigned(BaseModel):
+    task_id: int
+    assigned_to_id: int
+    message: str
+
+
+class TaskStatusUpdated(BaseModel):
+    task_id: int
+    new_status: TaskStatus
+    message: str
+
+
+class TaskDeleted(BaseModel):
+    task_id: int
+    message: str
+
+
+class TaskBulkItemResult(BaseModel):
+    # Only the fields relevant to the outcome are set (routes use exclude_unset)
+    index: int
+    status_code: int
+    id: int | None = None
+    task_id: int | None = None
+    assigned_to_id: int | None = None
+    new_status: TaskStatus | None = None
+    message: str | None = None
+    detail: str | None = None
+
+
+class TaskBulkCreated(BaseModel):
+    created: int
+    failed: int
+    results: list[TaskBulkItemResult]
+
+
+class TaskBulkUpdated(BaseModel):
+    updated: int
+    results: list[TaskBulkItemResult]
+
+
+class TaskChange(BaseModel):
+    # Tombstones carry only change_seq, task_id and deleted
+    change_seq: int
+    task_id: int
+    deleted: bool
+    title: str | None = None
+    description: str | None = None
+    status: TaskStatus | None = None
+    assigned_to_id: int | None = None
+    created_by_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class TaskChanges(BaseModel):
+    changes: list[TaskChange]
+    has_more: bool
+    next_since: str
+
+
+class TaskStatusCounts(BaseModel):
+    counts: dict[TaskStatus, int]
+    total: int
+
+
+class TaskStats(BaseModel):
+    # Tasks the user created (manager) or is assigned (reportee)
+    user: TaskStatusCounts
+    # Whole company; managers only
+    company: TaskStatusCounts | None
+    # Tasks assigned to anyone below the manager, at any depth; managers only
+    team: TaskStatusCounts | None
@@ -1,4 +1,6 @@
 from pydantic import BaseModel, field_validator
+from app.core.job_status import JobStatus
+from app.core.roles import UserRole
 
 class ReporteeCreate(BaseModel):
     username: str
@@ -18,3 +20,49 @@ class ReporteeCreate(BaseModel):
         if len(v) < 6:
             raise ValueError("Password must be at least 6 characters")
         return v
+
+
+class ReporteeCreated(BaseModel):
+    id: int
+    username: str
+    message: str
+
+
+class ImportRowError(BaseModel):
+    # None when the error is about the whole job rather than one row
+    row: int | None = None
+    username: str | None = None
+    detail: str
+
+
+class ReporteeImportStarted(BaseModel):
+    job_id: int
+    status: JobStatus
+    total_rows: int
+    status_url: str
+    message: str
+
+
+class ReporteeImportStatus(BaseModel):
+    job_id: int
+    status: JobStatus
+    total_rows: int
+    processed_rows: int
+    created_rows: int
+    errors: list[ImportRowError]
+
+
+class TeamMember(BaseModel):
+    id: int
+    username: str
+    role: UserRole
+    manager_id: int | None
+    is_active: bool
+    # 1 = reports directly to the caller, 2 = to one of their reportees, ...
+    depth: int
+
+
+class TeamPage(BaseModel):
+    team_size: int
+    next_cursor: str | None
+    members: list[TeamMember]
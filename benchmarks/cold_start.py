@@ -0,0 +1,121 @@
+"""
+Worker cold start: how long a fresh process needs before it can serve.
+
+For each scenario a new uvicorn process is started against a copy of the
+database and /readyz is polled until it answers 200. Reported per run:
+wall time to ready, plus the worker's own split between module import
+and lifespan startup (app_startup_seconds on /metrics).
+
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --db /tmp/bench.sqlite   # seeded file (benchmarks/seed.py)
+"""
+
+import argparse
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    # Fresh database: every migration runs inside the worker's startup
+    "fresh db, migrate on startup": {"fresh": True, "RUN_MIGRATIONS_ON_STARTUP": "true"},
+    # Migrated database, the usual restart / scale-out case
+    "migrated db, migrate on startup": {"fresh": False, "RUN_MIGRATIONS_ON_STARTUP": "true"},
+    # Migrations ran in the deploy step
+    "migrated db, no startup migration": {"fresh": False, "RUN_MIGRATIONS_ON_STARTUP": "false"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_worker(db_path: str, run_migrations: str) -> dict:
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "bench"),
+        RUN_MIGRATIONS_ON_STARTUP=run_migrations,
+    )
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                try:
+                    if client.get("/readyz").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("worker exited during startup")
+                time.sleep(0.005)
+
+            ready = time.perf_counter() - started
+            phases = dict(re.findall(r'app_startup_seconds\{phase="(\w+)"\} (\S+)', client.get("/metrics").text))
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "ready": ready,
+        "import": float(phases.get("import", 0)),
+        "lifespan": float(phases.get("lifespan", 0)),
+    }
+
+
+def migrated_copy(source: str | None) -> str:
+    path = os.path.join(tempfile.mkdtemp(), "cold.sqlite")
+    if source:
+        shutil.copyfile(source, path)
+    subprocess.run(
+        [sys.executable, "-m", "app.db.migrations"], cwd=ROOT, check=True, capture_output=True,
+        env=dict(os.environ, DATABASE_URL=f"sqlite:///{path}", JWT_SECRET_KEY="bench")
+    )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", help="seeded SQLite file to copy (default: empty database)")
+    args = parser.parse_args()
+
+    migrated = migrated_copy(args.db)
+
+    print(f"{'scenario':<36} {'ready ms':>9} {'import ms':>10} {'startup ms':>11}   (median of {args.runs})")
+    for name, scenario in SCENARIOS.items():
+        runs = []
+        for _ in range(args.runs):
+            if scenario["fresh"]:
+                db_path = os.path.join(tempfile.mkdtemp(), "cold.sqlite")
+            else:
+                db_path = migrated
+            runs.append(start_worker(db_path, scenario["RUN_MIGRATIONS_ON_STARTUP"]))
+
+        print(
+            f"{name:<36} "
+            f"{statistics.median(r['ready'] for r in runs) * 1000:>9.0f} "
+            f"{statistics.median(r['import'] for r in runs) * 1000:>10.0f} "
+            f"{statistics.median(r['lifespan'] for r in runs) * 1000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
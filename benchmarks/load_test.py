@@ -0,0 +1,448 @@
+"""
+Load test for the API against a seeded database (see benchmarks/seed.py).
+
+Drives the real app either in-process (httpx ASGI transport, no network)
+or through a local uvicorn, with one cookie session per virtual user.
+Each run works on a copy of the seeded file, so runs are repeatable.
+
+Per endpoint it reports throughput, p50/p95/p99 latency, status codes and
+SQL statements per request (diffed from /metrics before and after the run),
+and can save the results as JSON and compare them against a baseline:
+
+    python benchmarks/seed.py --db /tmp/bench.sqlite --preset medium
+    python benchmarks/load_test.py --db /tmp/bench.sqlite --workload mixed --out baseline.json
+    # ...change code...
+    python benchmarks/load_test.py --db /tmp/bench.sqlite --workload mixed --baseline baseline.json
+
+With --baseline the exit code is 1 if any endpoint got slower (p95),
+lost throughput or started running more queries beyond --tolerance.
+
+Rate limiting is disabled unless --rate-limits is passed; with several
+uvicorn --workers, /metrics (and so queries per request) covers one worker.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchpass"
+
+# Operation weights per role for each workload
+WORKLOADS = {
+    "mixed": {
+        "MANAGER": {
+            "list": 35, "detail": 12, "changes": 8, "status": 10, "assign": 8, "create": 8,
+            "login": 4, "create_reportee": 2, "bulk_create": 2, "bulk_status": 2, "delete": 1, "signup": 1,
+        },
+        "REPORTEE": {"list": 50, "detail": 20, "changes": 15, "complete": 10, "login": 5},
+    },
+    "login": {
+        "MANAGER": {"login": 1},
+        "REPORTEE": {"login": 1},
+    },
+    "poll": {
+        "MANAGER": {"list": 70, "changes": 30},
+        "REPORTEE": {"list": 70, "changes": 30},
+    },
+    "status": {
+        "MANAGER": {"status": 1},
+        "REPORTEE": {"complete": 1},
+    },
+    "assign": {
+        "MANAGER": {"assign": 1},
+        "REPORTEE": {"list": 1},
+    },
+}
+
+STATUSES = ["DEV", "TEST", "STUCK", "COMPLETED"]
+
+
+# ---- Virtual users ----
+
+def load_users(db_path: str, count: int, seed: int) -> list[dict]:
+    """Pick managers and reportees (half each) with some of their tasks."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+
+    def pick(role: str, n: int) -> list[tuple]:
+        ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE role = ?", (role,))]
+        return [
+            conn.execute("SELECT id, username, company_id FROM users WHERE id = ?", (uid,)).fetchone()
+            for uid in rng.sample(ids, min(n, len(ids)))
+        ]
+
+    users = []
+    for uid, username, company_id in pick("MANAGER", (count + 1) // 2):
+        users.append({
+            "role": "MANAGER",
+            "username": username,
+            "task_ids": [row[0] for row in conn.execute(
+                "SELECT id FROM tasks WHERE company_id = ? AND created_by_id = ? AND is_deleted = 0 LIMIT 200",
+                (company_id, uid)
+            )],
+            "reportee_ids": [row[0] for row in conn.execute(
+                "SELECT id FROM users WHERE company_id = ? AND role = 'REPORTEE'", (company_id,)
+            )],
+        })
+
+    for uid, username, company_id in pick("REPORTEE", count // 2):
+        users.append({
+            "role": "REPORTEE",
+            "username": username,
+            "task_ids": [row[0] for row in conn.execute(
+                "SELECT id FROM tasks WHERE company_id = ? AND assigned_to_id = ? AND is_deleted = 0 LIMIT 200",
+                (company_id, uid)
+            )],
+            "reportee_ids": [],
+        })
+
+    conn.close()
+    return users
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, transport, user: dict, rng: random.Random, recorder):
+        self.client = client
+        self.transport = transport
+        self.user = user
+        self.rng = rng
+        self.record = recorder
+        self.since = None
+        self.counter = 0
+
+    async def call(self, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, "error"
+        self.record(label, time.perf_counter() - start, status)
+        return response
+
+    def task_id(self) -> int:
+        return self.rng.choice(self.user["task_ids"]) if self.user["task_ids"] else 1
+
+    def reportee_id(self):
+        return self.rng.choice(self.user["reportee_ids"]) if self.user["reportee_ids"] else None
+
+    def unique(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{id(self) % 100000}x{self.counter}x{self.rng.randint(0, 10 ** 9)}"
+
+    # ---- operations ----
+
+    async def login(self):
+        await self.call("POST /auth/login", "POST", "/auth/login",
+                        json={"username": self.user["username"], "password": PASSWORD})
+
+    async def signup(self):
+        # Throwaway client: signing up must not replace this user's session cookie
+        async with httpx.AsyncClient(transport=self.transport, base_url=self.client.base_url) as client:
+            start = time.perf_counter()
+            response = await client.post("/auth/signup", json={
+                "company_name": self.unique("co"), "username": self.unique("mgr"), "password": PASSWORD
+            })
+            self.record("POST /auth/signup", time.perf_counter() - start, response.status_code)
+
+    async def list(self):
+        if self.rng.random() < 0.5:
+            await self.call("GET /tasks", "GET", "/tasks", params={"page": self.rng.randint(1, 3)})
+        else:
+            first = await self.call("GET /tasks", "GET", "/tasks", params={"count": "none"})
+            cursor = first is not None and first.status_code == 200 and first.json().get("next_cursor")
+            if cursor:
+                await self.call("GET /tasks", "GET", "/tasks", params={"cursor": cursor, "count": "none"})
+
+    async def detail(self):
+        await self.call("GET /tasks/{task_id}", "GET", f"/tasks/{self.task_id()}")
+
+    async def changes(self):
+        response = await self.call(
+            "GET /tasks/changes", "GET", "/tasks/changes", params={"since": self.since} if self.since else None
+        )
+        if response is not None and response.status_code == 200:
+            self.since = response.json()["next_since"]
+
+    async def status(self):
+        await self.call("PATCH /tasks/{task_id}/status", "PATCH", f"/tasks/{self.task_id()}/status",
+                        json={"status": self.rng.choice(STATUSES)})
+
+    async def complete(self):
+        await self.call("PATCH /tasks/{task_id}/self", "PATCH", f"/tasks/{self.task_id()}/self",
+                        json={"status": "COMPLETED"})
+
+    async def assign(self):
+        await self.call("PATCH /tasks/{task_id}/assign", "PATCH", f"/tasks/{self.task_id()}/assign",
+                        json={"assigned_to_id": self.reportee_id()})
+
+    async def create(self):
+        await self.call("POST /tasks", "POST", "/tasks",
+                        json={"title": self.unique("task "), "assigned_to_id": self.reportee_id()})
+
+    async def delete(self):
+        await self.call("DELETE /tasks/{task_id}", "DELETE", f"/tasks/{self.task_id()}")
+
+    async def create_reportee(self):
+        await self.call("POST /users/reportees", "POST", "/users/reportees",
+                        json={"username": self.unique("rep"), "password": PASSWORD})
+
+    async def bulk_create(self):
+        await self.call("POST /tasks/bulk", "POST", "/tasks/bulk", json={"items": [
+            {"title": self.unique("bulk "), "assigned_to_id": self.reportee_id()} for _ in range(20)
+        ]})
+
+    async def bulk_status(self):
+        await self.call("PATCH /tasks/bulk/status", "PATCH", "/tasks/bulk/status", json={"items": [
+            {"task_id": self.task_id(), "status": self.rng.choice(STATUSES)} for _ in range(20)
+        ]})
+
+
+# ---- Metrics scraping ----
+
+_METRIC_LINE = re.compile(r'^db_queries_per_request_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+
+async def scrape_queries(client: httpx.AsyncClient) -> dict:
+    response = await client.get("/metrics")
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            kind, method, route, value = match.groups()
+            totals[f"{method} {route}"][0 if kind == "sum" else 1] = float(value)
+    return totals
+
+
+# ---- Runner ----
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(transport, base_url: str, users: list[dict], args) -> dict:
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(label, elapsed, status):
+        samples[label].append(elapsed)
+        statuses[label][str(status)] += 1
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    clients = [
+        httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits)
+        for _ in users
+    ]
+    vus = [
+        VirtualUser(client, transport, user, random.Random(args.seed + index), record)
+        for index, (client, user) in enumerate(zip(clients, users))
+    ]
+
+    # 1️⃣ Log everyone in (not measured), then snapshot query counters
+    await asyncio.gather(*(
+        vu.client.post("/auth/login", json={"username": vu.user["username"], "password": PASSWORD})
+        for vu in vus
+    ))
+    samples.clear()
+    statuses.clear()
+    before = await scrape_queries(clients[0])
+
+    # 2️⃣ Run the workload for --duration seconds
+    workload = WORKLOADS[args.workload]
+    deadline = time.perf_counter() + args.duration
+
+    async def loop(vu: VirtualUser):
+        weights = workload[vu.user["role"]]
+        ops, op_weights = list(weights), list(weights.values())
+        while time.perf_counter() < deadline:
+            await getattr(vu, vu.rng.choices(ops, op_weights)[0])()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(vu) for vu in vus))
+    elapsed = time.perf_counter() - started
+
+    # 3️⃣ Queries per request from the /metrics delta
+    after = await scrape_queries(clients[0])
+    for client in clients:
+        await client.aclose()
+
+    endpoints = {}
+    for label, values in sorted(samples.items()):
+        values.sort()
+        query_sum = after[label][0] - before[label][0]
+        query_count = after[label][1] - before[label][1]
+        endpoints[label] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "queries_per_request": round(query_sum / query_count, 2) if query_count else None,
+            "status_codes": dict(statuses[label]),
+        }
+
+    total = sum(len(values) for values in samples.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+async def run_inprocess(users, args) -> dict:
+    sys.path.insert(0, ROOT)
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        return await run_load(httpx.ASGITransport(app=main.app), "http://bench", users, args)
+
+
+async def run_uvicorn(users, args) -> dict:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=os.environ.copy()
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            for _ in range(100):
+                try:
+                    await probe.get("/metrics")
+                    break
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+
+        return await run_load(httpx.AsyncHTTPTransport(), base_url, users, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ---- Baseline comparison ----
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for label, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(label)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {base['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if (
+            base["queries_per_request"] is not None and current["queries_per_request"] is not None
+            and current["queries_per_request"] > base["queries_per_request"] + 0.5
+        ):
+            regressions.append(
+                f"{label}: queries/request {base['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"{'endpoint':<34} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6}  status")
+    for label, row in results["endpoints"].items():
+        queries = "-" if row["queries_per_request"] is None else f"{row['queries_per_request']:.1f}"
+        codes = " ".join(f"{code}:{count}" for code, count in sorted(row["status_codes"].items()))
+        print(
+            f"{label:<34} {row['requests']:>7} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {queries:>6}  {codes}"
+        )
+    print(f"total {results['total_requests']} requests, {results['throughput_rps']:.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True, help="seeded SQLite file (benchmarks/seed.py)")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workload", choices=WORKLOADS, default="mixed")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limits", action="store_true", help="keep rate limiting on")
+    parser.add_argument("--no-copy", action="store_true", help="run against --db itself instead of a copy")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db)
+    if not args.no_copy:
+        copy = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+        shutil.copyfile(db_path, copy)
+        db_path = copy
+
+    # The app reads these at import (in-process) or startup (uvicorn)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if args.rate_limits else "false"
+
+    users = load_users(db_path, args.concurrency, args.seed)
+    runner = run_inprocess if args.mode == "inprocess" else run_uvicorn
+    results = asyncio.run(runner(users, args))
+
+    results["meta"] = {
+        "workload": args.workload,
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "workers": args.workers,
+        "rate_limits": args.rate_limits,
+        "db": os.path.abspath(args.db),
+        "git_commit": subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+    print_report(results)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("workload", "mode", "concurrency", "workers", "db"):
+            if baseline["meta"].get(key) != results["meta"][key]:
+                print(f"! baseline {key} was {baseline['meta'].get(key)!r}, this run {results['meta'][key]!r}")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"✗ {line}")
+        if regressions:
+            sys.exit(1)
+        print("✓ no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Seed a SQLite database with realistic volumes for load tests.
+
+Schema comes from the app's migrations; rows are bulk-inserted with the
+sqlite3 driver directly (the ORM would take hours for millions of tasks).
+Every seeded user has the password `benchpass`, hashed once with the
+configured BCRYPT_ROUNDS so logins cost what they cost in production.
+
+    python benchmarks/seed.py --db /tmp/bench.sqlite --preset large
+
+Presets (companies / users / tasks):
+    small    50 /    1,000 /    20,000
+    medium  500 /   10,000 /   300,000
+    large  2000 /   40,000 / 2,000,000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "benchpass"
+
+PRESETS = {
+    "small": {"companies": 50, "users": 1000, "tasks": 20000},
+    "medium": {"companies": 500, "users": 10000, "tasks": 300000},
+    "large": {"companies": 2000, "users": 40000, "tasks": 2000000},
+}
+
+MANAGER_SHARE = 0.1     # 1 manager per 10 users
+DELETED_SHARE = 0.02    # soft-deleted tasks
+UNASSIGNED_SHARE = 0.1
+STATUSES = ["DEV", "DEV", "TEST", "STUCK", "COMPLETED"]
+BATCH = 50000
+
+
+def _ts(value: datetime) -> str:
+    # SQLAlchemy's SQLite DateTime storage format
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def migrate(db_path: str):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+    sys.path.insert(0, ROOT)
+
+    from app.db.database import engine
+    from app.db.migrations import run_migrations
+    from app.core.security import hash_password
+
+    run_migrations(engine)
+    engine.dispose()
+    return hash_password(PASSWORD)
+
+
+def seed(db_path: str, companies: int, users: int, tasks: int, seed_value: int):
+    rng = random.Random(seed_value)
+    password_hash = migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    if conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]:
+        sys.exit(f"{db_path} already has data; seed into a new file")
+
+    now = datetime.utcnow()
+    now_ts = _ts(now)
+
+    # 1️⃣ Companies
+    conn.executemany(
+        "INSERT INTO companies (id, name, created_at) VALUES (?, ?, ?)",
+        [(cid, f"company{cid}", now_ts) for cid in range(1, companies + 1)]
+    )
+
+    # 2️⃣ Users: spread evenly, ~10% managers per company, each reportee
+    # reporting to one of them
+    per_company = max(2, users // companies)
+    managers_per_company = max(1, int(per_company * MANAGER_SHARE))
+    managers: dict[int, list[int]] = {}
+    reportees: dict[int, list[int]] = {}
+    user_rows = []
+    user_id = 0
+
+    for cid in range(1, companies + 1):
+        for slot in range(per_company):
+            user_id += 1
+            role = "MANAGER" if slot < managers_per_company else "REPORTEE"
+            (managers if role == "MANAGER" else reportees).setdefault(cid, []).append(user_id)
+            manager_id = None if role == "MANAGER" else managers[cid][slot % managers_per_company]
+            user_rows.append((
+                user_id, f"{role.lower()}{user_id}", password_hash, role, cid, manager_id, True, now_ts, now_ts
+            ))
+
+    conn.executemany(
+        "INSERT INTO users (id, username, password_hash, role, company_id, manager_id, is_active, "
+        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        user_rows
+    )
+
+    # 3️⃣ Tasks, in batches; change_seq follows id like the migration backfill
+    per_task_company = tasks // companies
+    history = timedelta(days=180).total_seconds()
+    task_id = 0
+    batch = []
+
+    for cid in range(1, companies + 1):
+        company_managers = managers[cid]
+        company_reportees = reportees.get(cid, [])
+
+        for _ in range(per_task_company):
+            task_id += 1
+            created_at = _ts(now - timedelta(seconds=rng.random() * history))
+            assignee = (
+                rng.choice(company_reportees)
+                if company_reportees and rng.random() >= UNASSIGNED_SHARE else None
+            )
+            batch.append((
+                task_id, f"task {task_id}", None, rng.choice(STATUSES), assignee,
+                rng.choice(company_managers), cid, rng.random() < DELETED_SHARE,
+                task_id, created_at, created_at
+            ))
+
+            if len(batch) >= BATCH:
+                _insert_tasks(conn, batch)
+                batch = []
+
+    _insert_tasks(conn, batch)
+
+    conn.execute(
+        "INSERT INTO change_sequences (name, value) VALUES ('tasks', ?) "
+        "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+        (task_id,)
+    )
+    conn.commit()
+    conn.close()
+
+    # 4️⃣ Raw inserts bypass the routes, so derive the status counters and
+    # the reporting hierarchy once
+    from app.db.database import engine
+    from app.core.task_stats import rebuild
+    from app.core.hierarchy import rebuild_hierarchy
+
+    with engine.begin() as sa_conn:
+        rebuild(sa_conn)
+        rebuild_hierarchy(sa_conn)
+        sa_conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+    return {"companies": companies, "users": user_id, "tasks": task_id}
+
+
+def _insert_tasks(conn, rows):
+    conn.executemany(
+        "INSERT INTO tasks (id, title, description, status, assigned_to_id, created_by_id, company_id, "
+        "is_deleted, change_seq, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True, help="SQLite file to create")
+    parser.add_argument("--preset", choices=PRESETS, default="small")
+    parser.add_argument("--companies", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--tasks", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = {
+        name: getattr(args, name) or value
+        for name, value in PRESETS[args.preset].items()
+    }
+
+    started = time.perf_counter()
+    counts = seed(os.path.abspath(args.db), sizes["companies"], sizes["users"], sizes["tasks"], args.seed)
+    print(
+        f"seeded {counts['companies']} companies, {counts['users']} users, {counts['tasks']} tasks "
+        f"into {args.db} in {time.perf_counter() - started:.1f}s (password: {PASSWORD})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Write throughput against the number of shards (see app/db/sharding.py).
+
+For each shard count it starts a uvicorn on fresh temporary SQLite files,
+signs up --companies companies (spread over the shards by the directory),
+gives every manager --tasks tasks and then has --concurrency clients, one
+per manager round-robin, hammer PATCH /tasks/{id}/status for --duration
+seconds. SQLite allows one writer per file, so with one shard every
+company queues behind the same lock:
+
+    python benchmarks/shard_scaling.py --shards 1 2 4 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchpass"
+STATUSES = ["DEV", "TEST", "STUCK", "COMPLETED"]
+
+
+def shard_env(shard_count: int) -> dict:
+    workdir = tempfile.mkdtemp()
+    env = os.environ.copy()
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/shard0.sqlite",
+        "DB_SHARD_URLS": ",".join(f"sqlite:///{workdir}/shard{index}.sqlite" for index in range(1, shard_count)),
+        "DIRECTORY_DATABASE_URL": f"sqlite:///{workdir}/directory.sqlite",
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY", "bench"),
+        "RATE_LIMIT_ENABLED": "false",
+        "BCRYPT_ROUNDS": "4",
+        # Migrated once below, before the workers start
+        "RUN_MIGRATIONS_ON_STARTUP": "false",
+        "PYTHONPATH": ROOT,
+    })
+    subprocess.run([sys.executable, "-m", "app.db.migrations"], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return env
+
+
+async def prepare(base_url: str, args) -> list[tuple[httpx.AsyncClient, list[int]]]:
+    """One logged-in client per company with the ids of its tasks."""
+    managers = []
+    for index in range(args.companies):
+        client = httpx.AsyncClient(base_url=base_url, timeout=30)
+        username = f"boss{index}"
+        await client.post("/auth/signup", json={"company_name": f"company{index}", "username": username, "password": PASSWORD})
+        await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+
+        task_ids = []
+        while len(task_ids) < args.tasks:
+            response = await client.post("/tasks/bulk", json={"items": [
+                {"title": f"task {len(task_ids) + item}"} for item in range(min(100, args.tasks - len(task_ids)))
+            ]})
+            task_ids += [result["id"] for result in response.json()["results"]]
+        managers.append((client, task_ids))
+    return managers
+
+
+async def hammer(managers, args) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + args.duration
+    rng = random.Random(args.seed)
+
+    async def loop(client: httpx.AsyncClient, task_ids: list[int]):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.patch(f"/tasks/{rng.choice(task_ids)}/status", json={"status": rng.choice(STATUSES)})
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(*managers[index % len(managers)]) for index in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        "errors": errors,
+    }
+
+
+async def run(shard_count: int, args) -> dict:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=shard_env(shard_count)
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    managers = []
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            for _ in range(100):
+                try:
+                    await probe.get("/readyz")
+                    break
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+
+        managers = await prepare(base_url, args)
+        return await hammer(managers, args)
+    finally:
+        for client, _ in managers:
+            await client.aclose()
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--companies", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per company")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15, help="seconds per shard count")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn workers")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for shard_count in args.shards:
+        result = asyncio.run(run(shard_count, args))
+        print(f"{shard_count:>6} {result['requests']:>9} {result['throughput_rps']:>8} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Mixed read/write throughput on SQLite for each DB_PROFILE.
+
+Every profile runs in its own subprocess (engines are built at import),
+against a fresh seeded file. Worker threads loop for --seconds doing
+`--write-ratio` status updates (SELECT + UPDATE + COMMIT) and task-list
+page reads otherwise, counting completed operations and
+"database is locked" failures.
+
+    python benchmarks/sqlite_profiles.py --threads 16 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(args):
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+    from app.db.database import SessionLocal, engine
+    from app.db.migrations import run_migrations
+    from app.models import Company, Task, User
+    from app.core.roles import UserRole
+
+    run_migrations(engine)
+    with SessionLocal() as db:
+        company = Company(name="bench")
+        db.add(company)
+        db.flush()
+        managers = [
+            User(username=f"manager{i}", password_hash="x", role=UserRole.MANAGER, company_id=company.id)
+            for i in range(args.threads)
+        ]
+        db.add_all(managers)
+        db.flush()
+        db.add_all(
+            Task(title=f"task {i}", created_by_id=managers[i % len(managers)].id, company_id=company.id)
+            for i in range(args.tasks)
+        )
+        db.commit()
+        manager_ids = [m.id for m in managers]
+
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(manager_id):
+        local = {"reads": 0, "writes": 0, "locked": 0}
+        rng = random.Random(manager_id)
+        while time.perf_counter() < deadline:
+            try:
+                with SessionLocal() as db:
+                    if rng.random() < args.write_ratio:
+                        task = db.scalar(select(Task).where(
+                            Task.id == rng.randint(1, args.tasks), Task.is_deleted == False
+                        ))
+                        if task:
+                            task.status = rng.choice(["DEV", "TEST", "STUCK"])
+                            db.commit()
+                        local["writes"] += 1
+                    else:
+                        db.scalars(
+                            select(Task)
+                            .where(Task.created_by_id == manager_id, Task.is_deleted == False)
+                            .order_by(Task.created_at.desc(), Task.id.desc())
+                            .limit(5)
+                        ).all()
+                        local["reads"] += 1
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                local["locked"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=worker, args=(mid,)) for mid in manager_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps(counts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--profiles", nargs="+", default=["development", "production"])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    for profile in args.profiles:
+        env = dict(
+            os.environ,
+            DB_PROFILE=profile,
+            DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite",
+            JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "bench"),
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        counts = json.loads(output.strip().splitlines()[-1])
+        ops = counts["reads"] + counts["writes"]
+        print(
+            f"{profile:<12} {ops / args.seconds:>8.0f} ops/s   "
+            f"reads {counts['reads']:>7}   writes {counts['writes']:>6}   locked errors {counts['locked']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Sync vs async DB path under concurrent load.
+
+Seeds a throwaway SQLite file, mounts the same task-list query twice
+(sync `def` + get_db, and `async def` + get_async_db) and drives both
+in-process with concurrent clients, reporting requests/sec and latency
+percentiles.
+
+    python benchmarks/sync_vs_async.py --tasks 20000 --concurrency 64 --requests 4000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.sqlite"
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.database import async_engine, engine
+from app.db.deps import get_async_db, get_db
+from app.db.migrations import run_migrations
+from app.models import Company, Task, User
+from app.core.roles import UserRole
+
+PAGE_SIZE = 5
+
+
+def seed(task_count: int):
+    run_migrations(engine)
+
+    with Session(engine) as db:
+        company = Company(name="bench")
+        db.add(company)
+        db.flush()
+        manager = User(username="manager", password_hash="x", role=UserRole.MANAGER, company_id=company.id)
+        db.add(manager)
+        db.flush()
+        db.add_all(
+            Task(title=f"task {i}", created_by_id=manager.id, company_id=company.id)
+            for i in range(task_count)
+        )
+        db.commit()
+        return manager.id, company.id
+
+
+def build_app(manager_id: int, company_id: int) -> FastAPI:
+    app = FastAPI()
+
+    def page_query():
+        return (
+            select(Task)
+            .where(Task.created_by_id == manager_id, Task.company_id == company_id, Task.is_deleted == False)
+            .order_by(Task.created_at.desc(), Task.id.desc())
+            .limit(PAGE_SIZE)
+        )
+
+    @app.get("/sync")
+    def sync_list(db: Session = Depends(get_db)):
+        return [task.id for task in db.scalars(page_query())]
+
+    @app.get("/async")
+    async def async_list(db: AsyncSession = Depends(get_async_db)):
+        return [task.id for task in await db.scalars(page_query())]
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    args = parser.parse_args()
+
+    app = build_app(*seed(args.tasks))
+    # one event loop for the whole run: pooled async connections are loop-bound
+    asyncio.run(run_all(app, args.concurrency, args.requests))
+
+
+async def run_all(app: FastAPI, concurrency: int, total: int):
+    for path in ("/sync", "/async"):
+        # warm up pools before measuring
+        await drive(app, path, 4, 50)
+        result = await drive(app, path, concurrency, total)
+        print(
+            f"{path:<7} {result['rps']:>8.0f} req/s   "
+            f"p50 {result['p50_ms']:>6.1f} ms   p99 {result['p99_ms']:>6.1f} ms"
+        )
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,146 @@
+import time
+_import_started = time.perf_counter()
+
 from typing import Union
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 import logging
 
+from fastapi.concurrency import run_in_threadpool
 from app.routes import auth
 
-from app.db.database import engine, Base
+from app.db.sharding import migrate_all, labeled_engines, async_engines
 from sqlalchemy import text
 from app.routes import task
 from app.routes import user
+from app.routes import metrics
+from app.routes import health
 
 from app.core.rate_limit import limiter
+from app.core.events import broker, start_event_pruning, stop_event_pruning
+from app.core.write_queue import start_status_writers, stop_status_writers
+from app.core.security import shutdown_password_pool
+from app.core.cache import get_cache_stats
+from app.core.principals import principal_stats
+from app.core.config import RUN_MIGRATIONS_ON_STARTUP, DB_CHECK_ON_STARTUP, TASK_WRITE_QUEUE_ENABLED
+from app.core.metrics import (
+    instrument_engine,
+    register_gauge,
+    start_request,
+    finish_request,
+    route_label,
+    rate_limit_rejections,
+)
 from slowapi.errors import RateLimitExceeded
 from slowapi import _rate_limit_exceeded_handler
 
-Base.metadata.create_all(bind=engine)
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+# Query counts/timings, slow-query log and pool wait for every engine (both per shard)
+for name, bind in labeled_engines():
+    instrument_engine(bind, name)
+
+register_gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool",
+    lambda: {
+        (("engine", name),): getattr(bind.pool, "checkedout", lambda: 0)()
+        for name, bind in labeled_engines()
+    }
+)
+register_gauge(
+    "task_list_cache_events", "Task list cache hits/misses/invalidations/evictions since start",
+    lambda: {(("event", name),): value for name, value in get_cache_stats().items()}
+)
+register_gauge(
+    "principal_cache_lookups", "User principal cache hits/misses since start",
+    lambda: {(("event", name),): value for name, value in principal_stats.items()}
+)
+
+startup_seconds = {}
+register_gauge(
+    "app_startup_seconds", "Worker cold start: module import and lifespan startup",
+    lambda: {(("phase", phase),): value for phase, value in startup_seconds.items()}
+)
+
+
+# Nothing touches the database at import time; schema and connectivity are
+# handled here, once the server actually starts this worker
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+
+    # 1️⃣ Schema of every shard (turn off when `python -m app.db.migrations` runs in the deploy step)
+    if RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(migrate_all)
+
+    # 2️⃣ Fail fast if a database is unreachable
+    if DB_CHECK_ON_STARTUP:
+        for bind in async_engines():
+            async with bind.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        logging.info("✅ Database connected successfully")
+
+    await broker.start()
+    await start_event_pruning()
+    if TASK_WRITE_QUEUE_ENABLED:
+        await start_status_writers()
+
+    startup_seconds["lifespan"] = time.perf_counter() - started
+    app.state.ready = True
+    logging.info(
+        "Worker ready: import %.0f ms, startup %.0f ms",
+        startup_seconds["import"] * 1000, startup_seconds["lifespan"] * 1000
+    )
+
+    yield
+
+    app.state.ready = False
+    # Queued status updates are committed before the engine goes away
+    await stop_status_writers()
+    await stop_event_pruning()
+    await broker.stop()
+    shutdown_password_pool()
+    for bind in async_engines():
+        await bind.dispose()
+
+
+# Routes declare response models, so bodies arrive here already JSON-ready
+# and orjson only has to write them out
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(auth.router)
 app.include_router(task.router)
 app.include_router(user.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.state.ready = False
 
 # Rate Limiting Middleware
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
-try:
-    with engine.connect() as connection:
-        connection.execute(text("SELECT 1"))
-    logging.info("✅ Database connected successfully (SQLite)")
-except Exception as e:
-    logging.error(f"❌ Database connection failed: {e}")
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    rate_limit_rejections.inc(route=route_label(request.scope))
+    return _rate_limit_exceeded_handler(request, exc)
+
+
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+
+# Per-route latency, status and DB usage
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    stats = start_request(request.url.path)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        stats.route = route_label(request.scope)
+        finish_request(stats, request.method, status_code, time.perf_counter() - start)
+
+
+startup_seconds["import"] = time.perf_counter() - _import_started
@@ -0,0 +1,78 @@
+"""
+Settings are read when the app is imported, so the environment is set up
+here first: a throwaway SQLite database per test run, cheap bcrypt and no
+rate limits. The app starts once per session; every test signs up its own
+company, so tests never see each other's rows.
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp()
+
+sys.path.insert(0, ROOT)
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{WORKDIR}/test.sqlite",
+    "DIRECTORY_DATABASE_URL": f"sqlite:///{WORKDIR}/directory.sqlite",
+    "RATE_LIMIT_STORAGE_URI": "memory://",
+    "RATE_LIMIT_ENABLED": "false",
+    "JWT_SECRET_KEY": "test",
+    "BCRYPT_ROUNDS": "4",
+})
+os.environ.pop("DB_SHARD_URLS", None)
+
+PASSWORD = "secret1"
+_names = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def new_client(app_client):
+    """Clients with their own cookies, all on the app's one event loop."""
+    def make() -> TestClient:
+        client = TestClient(app_client.app)
+        client.portal = app_client.portal
+        return client
+
+    return make
+
+
+@pytest.fixture
+def make_manager(new_client):
+    """Makes logged-in managers of new companies, with `add_reportee(name)` -> (id, logged-in client)."""
+    def make() -> TestClient:
+        number = next(_names)
+        client = new_client()
+        client.post("/auth/signup", json={"company_name": f"company{number}", "username": f"boss{number}", "password": PASSWORD})
+        client.post("/auth/login", json={"username": f"boss{number}", "password": PASSWORD})
+
+        def add_reportee(name: str):
+            username = f"{name}{number}"
+            user_id = client.post("/users/reportees", json={"username": username, "password": PASSWORD}).json()["id"]
+            reportee = new_client()
+            reportee.post("/auth/login", json={"username": username, "password": PASSWORD})
+            return user_id, reportee
+
+        client.add_reportee = add_reportee
+        return client
+
+    return make
+
+
+@pytest.fixture
+def manager(make_manager):
+    """A logged-in manager of a new company."""
+    return make_manager()
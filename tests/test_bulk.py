@@ -0,0 +1,114 @@
+"""
+Bulk create / assign / status: per-item results, tasks listed twice,
+items the caller may not touch, and tasks changed between the batch's
+read and its UPDATE (versioned_update).
+"""
+
+from sqlalchemy import update
+
+import app.routes.task as task_routes
+from app.db.database import engine
+from app.models.task import Task
+
+
+def _codes(response) -> list[int]:
+    return [result["status_code"] for result in response.json()["results"]]
+
+
+def _create(manager, count: int, **fields) -> list[int]:
+    response = manager.post("/tasks/bulk", json={"items": [{"title": f"bulk task {i}", **fields} for i in range(count)]})
+    return [result["id"] for result in response.json()["results"]]
+
+
+def test_bulk_create_rejects_only_invalid_items(make_manager):
+    manager, other = make_manager(), make_manager()
+    reportee_id, _ = manager.add_reportee("bulkrep")
+    foreign_id, _ = other.add_reportee("foreignrep")
+
+    response = manager.post("/tasks/bulk", json={"items": [
+        {"title": "mine", "assigned_to_id": reportee_id},
+        {"title": "foreign", "assigned_to_id": foreign_id},
+        {"title": "unassigned"},
+    ]})
+
+    assert response.json()["created"] == 2
+    assert _codes(response) == [200, 400, 200]
+
+
+def test_task_listed_twice_is_rejected_in_every_item(manager):
+    reportee_id, _ = manager.add_reportee("duprep")
+    first, second = _create(manager, 2)
+
+    status = manager.patch("/tasks/bulk/status", json={"items": [
+        {"task_id": first, "status": "TEST"},
+        {"task_id": second, "status": "STUCK"},
+        {"task_id": first, "status": "COMPLETED"},
+    ]})
+    assert status.json()["updated"] == 1
+    assert _codes(status) == [400, 200, 400]
+    assert status.json()["results"][0]["detail"] == "Task listed more than once in this batch"
+    assert manager.get(f"/tasks/{first}").json()["status"] == "DEV"
+
+    assign = manager.patch("/tasks/bulk/assign", json={"items": [
+        {"task_id": second, "assigned_to_id": reportee_id},
+        {"task_id": second, "assigned_to_id": reportee_id},
+    ]})
+    assert assign.json()["updated"] == 0
+    assert _codes(assign) == [400, 400]
+
+
+def test_other_companies_tasks_and_reportees_are_refused(make_manager):
+    manager, other = make_manager(), make_manager()
+    reportee_id, _ = manager.add_reportee("ownrep")
+    foreign_reportee, _ = other.add_reportee("otherrep")
+    mine, also_mine = _create(manager, 2)
+    theirs, = _create(other, 1)
+
+    status = manager.patch("/tasks/bulk/status", json={"items": [
+        {"task_id": mine, "status": "TEST"},
+        {"task_id": theirs, "status": "TEST"},
+    ]})
+    assert _codes(status) == [200, 404]
+
+    assign = manager.patch("/tasks/bulk/assign", json={"items": [
+        {"task_id": mine, "assigned_to_id": reportee_id},
+        {"task_id": theirs, "assigned_to_id": reportee_id},
+        {"task_id": also_mine, "assigned_to_id": foreign_reportee},
+    ]})
+    assert _codes(assign) == [200, 404, 400]
+    assert other.get(f"/tasks/{theirs}").json()["status"] == "DEV"
+    assert other.get(f"/tasks/{theirs}").json()["assigned_to_id"] is None
+
+
+def test_task_changed_after_the_read_gets_409(manager, monkeypatch):
+    reportee_id, _ = manager.add_reportee("stalerep")
+    stale, fresh = _create(manager, 2)
+    next_change_seq = task_routes.next_change_seq
+
+    async def changed_meanwhile(db, count=1):
+        # Another request commits a change to `stale` between the batch's read and its UPDATE
+        with engine.begin() as conn:
+            conn.execute(update(Task).where(Task.id == stale).values(change_seq=Task.change_seq + 1))
+        return await next_change_seq(db, count)
+
+    monkeypatch.setattr(task_routes, "next_change_seq", changed_meanwhile)
+
+    status = manager.patch("/tasks/bulk/status", json={"items": [
+        {"task_id": stale, "status": "TEST"},
+        {"task_id": fresh, "status": "TEST"},
+    ]})
+    assert status.json()["updated"] == 1
+    assert _codes(status) == [409, 200]
+    assert status.json()["results"][0]["detail"] == "Task was modified concurrently; retry"
+
+    assign = manager.patch("/tasks/bulk/assign", json={"items": [
+        {"task_id": stale, "assigned_to_id": reportee_id},
+        {"task_id": fresh, "assigned_to_id": reportee_id},
+    ]})
+    assert _codes(assign) == [409, 200]
+
+    monkeypatch.undo()
+    assert manager.get(f"/tasks/{stale}").json()["status"] == "DEV"
+    assert manager.get(f"/tasks/{stale}").json()["assigned_to_id"] is None
+    fresh_task = manager.get(f"/tasks/{fresh}").json()
+    assert (fresh_task["status"], fresh_task["assigned_to_id"]) == ("TEST", reportee_id)
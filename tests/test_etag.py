@@ -0,0 +1,43 @@
+"""Conditional requests: If-None-Match -> 304 on reads, If-Match -> 412 on stale writes."""
+
+
+def test_task_detail_not_modified_until_changed(manager):
+    task_id = manager.post("/tasks", json={"title": "etag task"}).json()["id"]
+
+    first = manager.get(f"/tasks/{task_id}")
+    etag = first.headers["ETag"]
+    cached = manager.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    manager.patch(f"/tasks/{task_id}/status", json={"status": "TEST"})
+    changed = manager.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_task_list_not_modified_until_changed(manager):
+    manager.post("/tasks", json={"title": "listed task"})
+
+    etag = manager.get("/tasks").headers["ETag"]
+    assert manager.get("/tasks", headers={"If-None-Match": etag}).status_code == 304
+
+    manager.post("/tasks", json={"title": "another listed task"})
+    assert manager.get("/tasks", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_stale_if_match_is_rejected(manager):
+    task_id = manager.post("/tasks", json={"title": "if-match task"}).json()["id"]
+    etag = manager.get(f"/tasks/{task_id}").headers["ETag"]
+
+    updated = manager.patch(f"/tasks/{task_id}/status", json={"status": "TEST"}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+
+    # The client's copy is now out of date: its write must not go through
+    stale = manager.patch(f"/tasks/{task_id}/status", json={"status": "STUCK"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert manager.get(f"/tasks/{task_id}").json()["status"] == "TEST"
+
+    current = manager.get(f"/tasks/{task_id}").headers["ETag"]
+    assert manager.delete(f"/tasks/{task_id}", headers={"If-Match": etag}).status_code == 412
+    assert manager.delete(f"/tasks/{task_id}", headers={"If-Match": current}).status_code == 200
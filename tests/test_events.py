@@ -0,0 +1,60 @@
+"""Task event log: resuming after a disconnect, and retention whatever the broker (the suite uses memory)."""
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import TASK_BULK_MAX_ITEMS, TASK_EVENT_BROKER, TASK_EVENT_REPLAY_LIMIT, TASK_EVENT_RETENTION_HOURS
+from app.core.events import start_event_pruning, stop_event_pruning
+from app.db.database import engine
+from app.models.task_event import TaskEvent
+
+
+def _events(task_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(TaskEvent).where(TaskEvent.task_id == task_id))
+
+
+def test_old_events_are_pruned(app_client):
+    assert TASK_EVENT_BROKER == "memory"
+    old = datetime.utcnow() - timedelta(hours=TASK_EVENT_RETENTION_HOURS + 1)
+    with engine.begin() as conn:
+        conn.execute(insert(TaskEvent), [
+            {"company_id": 0, "task_id": -1, "type": "task.created", "created_by_id": 0, "created_at": old},
+            {"company_id": 0, "task_id": -2, "type": "task.created", "created_by_id": 0, "created_at": datetime.utcnow()},
+        ])
+
+    # A restarted pruner runs at once, then every TASK_EVENT_PRUNE_INTERVAL_SECONDS
+    app_client.portal.call(stop_event_pruning)
+    app_client.portal.call(start_event_pruning)
+    for _ in range(50):
+        if not _events(-1):
+            break
+        time.sleep(0.05)
+
+    assert _events(-1) == 0
+    assert _events(-2) == 1
+
+
+def test_resume_replays_more_than_one_page(manager):
+    with engine.connect() as conn:
+        last_seen = conn.scalar(select(func.max(TaskEvent.id))) or 0
+
+    created = []
+    while len(created) <= TASK_EVENT_REPLAY_LIMIT:
+        response = manager.post("/tasks/bulk", json={"items": [
+            {"title": f"missed task {len(created) + i}"} for i in range(TASK_BULK_MAX_ITEMS)
+        ]})
+        created += [result["id"] for result in response.json()["results"]]
+
+    with manager.websocket_connect(f"/tasks/events/ws?last_event_id={last_seen}") as websocket:
+        replayed = []
+        while len(replayed) < len(created):
+            event = websocket.receive_json()
+            if event["type"] == "heartbeat":  # replay over, nothing more is coming
+                break
+            replayed.append(event)
+
+    assert [event["task_id"] for event in replayed] == created
+    assert all(event["type"] == "task.created" for event in replayed)
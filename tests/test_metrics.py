@@ -0,0 +1,24 @@
+"""Per-statement timing from the engine events (app/core/metrics.py)."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.metrics import db_query_latency
+from app.db.database import engine
+
+
+def _timed() -> int:
+    data = db_query_latency.values.get((), [0, 0])
+    return data[-2]
+
+
+def test_failed_statement_leaves_no_timing_behind(app_client):
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+
+        before = _timed()
+        conn.execute(text("SELECT 1"))
+        assert _timed() == before + 1
+        assert not any(key.startswith("query_start") for key in conn.info)
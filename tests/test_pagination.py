@@ -0,0 +1,16 @@
+"""Cached list totals (count=cached) across workers."""
+
+import app.routes.task as task_routes
+
+
+def test_cached_count_sees_another_workers_write(manager, monkeypatch):
+    manager.post("/tasks", json={"title": "counted task"})
+    assert manager.get("/tasks", params={"count": "cached"}).json()["total_tasks"] == 1
+
+    # A write handled by another worker only bumps the list version in the
+    # database; this process's caches never hear about it
+    monkeypatch.setattr(task_routes, "invalidate_cached_count", lambda scope: None)
+    monkeypatch.setattr(task_routes, "invalidate_task_lists", lambda *args, **kwargs: None)
+    manager.post("/tasks", json={"title": "written elsewhere"})
+
+    assert manager.get("/tasks", params={"count": "cached"}).json()["total_tasks"] == 2
@@ -0,0 +1,94 @@
+"""
+SQL statements per request for the task endpoints, checked against a
+budget. Counts come from the per-request instrumentation that feeds
+/metrics, so a change that adds a round-trip to a hot path fails here.
+"""
+
+from app.core.metrics import db_queries_per_request
+
+BULK_ITEMS = 20
+
+# Statements per successful request, including the transaction's bookkeeping
+# (change number, list versions, status counters, event row). A mutation is
+# one UPDATE / INSERT on top of that, plus the read of the current state
+# for changes to existing tasks (a rejected one stops there); bulk budgets are for
+# BULK_ITEMS items and must not grow with the batch size. Caller and
+# reportee checks come from the principal cache (warmed by login and
+# reportee creation) and cost nothing.
+BUDGETS = {
+    "POST /tasks": 5,
+    "POST /tasks/bulk": 5,
+    "PATCH /tasks/bulk/assign": 6,
+    "PATCH /tasks/bulk/status": 6,
+    "GET /tasks": 3,
+    "GET /tasks/stats": 3,
+    "GET /tasks/changes": 2,
+    "GET /tasks/{task_id}": 1,
+    "PATCH /tasks/{task_id}/assign": 6,
+    "PATCH /tasks/{task_id}/status": 6,
+    "PATCH /tasks/{task_id}/self": 6,
+    "DELETE /tasks/{task_id}": 6,
+}
+
+
+def _statements(label: str) -> float:
+    method, route = label.split(" ", 1)
+    data = db_queries_per_request.values.get((("method", method), ("route", route)))
+    return data[-1] if data else 0
+
+
+def _call(client, label: str, url: str | None = None, expect: int = 200, **kwargs):
+    method, route = label.split(" ", 1)
+    before = _statements(label)
+    response = client.request(method, url or route, **kwargs)
+    assert response.status_code == expect, response.text
+    return response, int(_statements(label) - before)
+
+
+def test_task_endpoints_stay_within_budget(manager):
+    reportee_ids, clients = zip(*(manager.add_reportee(f"rep{i}x") for i in range(2)))
+    counts = {}
+
+    def call(client, label, url=None, **kwargs):
+        response, counts[label] = _call(client, label, url, **kwargs)
+        return response.json()
+
+    single = call(manager, "POST /tasks", json={"title": "single task", "assigned_to_id": reportee_ids[0]})["id"]
+    bulk = [result["id"] for result in call(manager, "POST /tasks/bulk", json={"items": [
+        {"title": f"bulk task {i}", "assigned_to_id": reportee_ids[i % 2]} for i in range(BULK_ITEMS)
+    ]})["results"]]
+    call(manager, "PATCH /tasks/bulk/assign", json={"items": [
+        {"task_id": task_id, "assigned_to_id": reportee_ids[0]} for task_id in bulk
+    ]})
+    call(manager, "PATCH /tasks/bulk/status", json={"items": [
+        {"task_id": task_id, "status": "TEST"} for task_id in bulk
+    ]})
+    call(manager, "GET /tasks")
+    call(manager, "GET /tasks/stats")
+    call(manager, "GET /tasks/changes")
+    call(manager, "GET /tasks/{task_id}", f"/tasks/{single}")
+    call(manager, "PATCH /tasks/{task_id}/assign", f"/tasks/{single}/assign", json={"assigned_to_id": reportee_ids[1]})
+    call(manager, "PATCH /tasks/{task_id}/status", f"/tasks/{bulk[0]}/status", json={"status": "STUCK"})
+    call(clients[0], "PATCH /tasks/{task_id}/self", f"/tasks/{bulk[1]}/self", json={"status": "COMPLETED"})
+    call(manager, "DELETE /tasks/{task_id}", f"/tasks/{bulk[2]}")
+
+    over = {label: (counts[label], budget) for label, budget in BUDGETS.items() if counts[label] > budget}
+    assert not over, f"statements over budget (count, budget): {over}"
+
+
+def test_rejected_mutations_only_read(manager):
+    reportee_id, reportee = manager.add_reportee("rejected")
+    done, todo = (
+        manager.post("/tasks", json={"title": title, "assigned_to_id": reportee_id}).json()["id"]
+        for title in ("finished task", "open task")
+    )
+    reportee.patch(f"/tasks/{done}/self", json={"status": "COMPLETED"})
+
+    # 404, 412, 409 and 403 are decided on the read: no write lock, no change number
+    counts = [
+        _call(manager, "PATCH /tasks/{task_id}/status", "/tasks/999999/status", 404, json={"status": "TEST"})[1],
+        _call(manager, "DELETE /tasks/{task_id}", f"/tasks/{todo}", 412, headers={"If-Match": '"0-0"'})[1],
+        _call(reportee, "PATCH /tasks/{task_id}/self", f"/tasks/{done}/self", 409, json={"status": "COMPLETED"})[1],
+        _call(reportee, "PATCH /tasks/{task_id}/self", f"/tasks/{todo}/self", 403, json={"status": "TEST"})[1],
+    ]
+    assert counts == [1, 1, 1, 1]
@@ -0,0 +1,105 @@
+"""
+EXPLAIN QUERY PLAN guard for the route hot paths: every statement below
+comes from the same builders the routes call, and none may fall back to a
+full table scan or a temp b-tree sort (e.g. after an index was dropped or
+a filter changed).
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from app.core.hierarchy import manager_chain_query, team_members_query, team_size_query
+from app.core.principals import principals_query
+from app.core.task_queries import (
+    after_cursor,
+    revoked_tasks_query,
+    task_changes_query,
+    task_detail_query,
+    task_list_filters,
+    task_list_queries,
+    task_state_query,
+    team_tasks_query,
+    versioned_update,
+)
+from app.core.task_stats import status_counts_query, team_status_counts_query
+from app.models.task import Task
+
+CURSOR = (datetime(2024, 1, 1), 10)
+PAGE = 6
+
+
+def _list(role: str, q: str | None = None, **filters):
+    return task_list_queries(task_list_filters(role, 1, 1, **filters), role, 1, q)
+
+
+def _hot_queries() -> dict:
+    queries = {}
+    for role in ("MANAGER", "REPORTEE"):
+        page, count = _list(role)
+        queries[f"list_tasks {role} count"] = count
+        queries[f"list_tasks {role} page"] = page.offset(PAGE).limit(PAGE + 1)
+        queries[f"list_tasks {role} cursor"] = after_cursor(page, *CURSOR).limit(PAGE + 1)
+        queries[f"list_tasks {role} status filter"] = _list(role, status="DEV")[0].limit(PAGE + 1)
+        queries[f"list_tasks {role} search"] = _list(role, "fix login")[0].limit(PAGE + 1)
+        queries[f"task detail {role}"] = task_detail_query(1, role, 1, 1)
+        queries[f"task changes {role}"] = task_changes_query(1, role, 1, 10, 20).limit(501)
+
+    queries.update({
+        "list_tasks MANAGER assignee filter": _list("MANAGER", assigned_to_id=2)[0].limit(PAGE + 1),
+        "list_tasks MANAGER date range": _list(
+            "MANAGER", created_from=CURSOR[0], created_to=datetime(2024, 2, 1)
+        )[0].limit(PAGE + 1),
+        "task changes reportee revoked": revoked_tasks_query(1, 1, 10, 20).limit(501),
+        "team tasks": team_tasks_query(1, 1, after=CURSOR).limit(PAGE + 1),
+        "mutation read": task_state_query(Task.id == 1, Task.created_by_id == 1, Task.company_id == 1, Task.is_deleted == False),
+        "bulk mutation read": task_state_query(Task.id.in_([1, 2, 3]), Task.company_id == 1, Task.is_deleted == False),
+        "mutation update": versioned_update(
+            [SimpleNamespace(id=1, change_seq=5)], status="TEST", change_seq=6
+        ).returning(Task.updated_at),
+        "bulk mutation update": versioned_update(
+            [SimpleNamespace(id=1, change_seq=5), SimpleNamespace(id=2, change_seq=7)], status="TEST", change_seq=8
+        ).returning(Task.id),
+        "principals": principals_query([1, 2]),
+        "task stats": status_counts_query(1, "MANAGER", 1),
+        "team stats": team_status_counts_query(1, 1),
+        "team members page": team_members_query(1, (1, 10)).limit(51),
+        "team size": team_size_query(1),
+        "manager chain": manager_chain_query(1),
+    })
+    return queries
+
+
+HOT_QUERIES = _hot_queries()
+
+# Merges the members' assignee feeds, so it sorts the team's live tasks;
+# each member's share is still an index range, never a table scan
+SORT_ALLOWED = {"team tasks"}
+
+
+def _plan(conn, stmt) -> list[str]:
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+
+
+@pytest.fixture(scope="module")
+def conn(app_client):
+    # The app's startup has migrated the database
+    from app.db.database import engine
+
+    with engine.connect() as conn:
+        yield conn
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_indexes(conn, name):
+    plan = _plan(conn, HOT_QUERIES[name])
+
+    # An FTS5 MATCH shows up as a SCAN of the virtual table but is an index lookup
+    scans = [step for step in plan if step.startswith("SCAN") and "VIRTUAL TABLE" not in step]
+    sorts = [step for step in plan if "TEMP B-TREE" in step and name not in SORT_ALLOWED]
+    assert not scans and not sorts, " | ".join(plan)
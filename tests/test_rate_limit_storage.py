@@ -0,0 +1,95 @@
+"""
+Limiter storages the workers can share (app/core/rate_limit_storage.py and
+redis), checked with the limits strategy the app uses and bulk costs.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.core.config import RATE_LIMITS, TASK_BULK_MAX_ITEMS
+from app.core.rate_limit_storage import SQLiteStorage
+
+WORKERS = 4
+ATTEMPTS = 200
+LIMIT = 400
+
+
+def _sqlite_storage(tmp_path):
+    return SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.sqlite'}")
+
+
+def _redis_storage(tmp_path):
+    # requirements-dev.txt; fakeredis runs the limits Lua scripts with lupa
+    import fakeredis
+    import redis
+    from limits.storage import RedisStorage
+
+    pool = redis.ConnectionPool(connection_class=fakeredis.FakeRedisConnection, server=fakeredis.FakeServer())
+    return RedisStorage("redis://localhost:6379", connection_pool=pool)
+
+
+@pytest.mark.parametrize("make_storage", [_sqlite_storage, _redis_storage], ids=["sqlite", "redis"])
+def test_bulk_limit_charges_per_item(tmp_path, make_storage):
+    limiter = SlidingWindowCounterRateLimiter(make_storage(tmp_path))
+    limit = parse(RATE_LIMITS.task_bulk_create)
+
+    assert limiter.hit(limit, "user:1", cost=TASK_BULK_MAX_ITEMS)
+    assert limiter.hit(limit, "user:1", cost=TASK_BULK_MAX_ITEMS)
+    assert not limiter.hit(limit, "user:1", cost=1)
+    # Another user has their own budget
+    assert limiter.hit(limit, "user:2", cost=TASK_BULK_MAX_ITEMS)
+
+
+def _hammer(path: str, kind: str, start, results):
+    storage = SQLiteStorage(f"sqlite:///{path}")
+    start.wait()  # all workers race from the same moment
+    if kind == "incr":
+        for _ in range(ATTEMPTS):
+            storage.incr("counter", 60)
+        results.put(ATTEMPTS)
+    else:
+        results.put(sum(storage.acquire_sliding_window_entry("window", LIMIT, 60) for _ in range(ATTEMPTS)))
+
+
+@pytest.mark.parametrize("kind", ["incr", "window"])
+def test_sqlite_storage_is_atomic_across_processes(tmp_path, kind):
+    path = str(tmp_path / "rate_limits.sqlite")
+    SQLiteStorage(f"sqlite:///{path}")  # create the table before the workers race
+
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Barrier(WORKERS), context.Queue()
+    workers = [context.Process(target=_hammer, args=(path, kind, start, results)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    accepted = sum(results.get(timeout=60) for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    storage = SQLiteStorage(f"sqlite:///{path}")
+    if kind == "incr":
+        assert storage.get("counter") == WORKERS * ATTEMPTS
+    else:
+        # No two workers took the same slot, and none was lost
+        assert accepted == LIMIT
+        assert storage.get_sliding_window("window", 60)[2] == LIMIT
+
+
+def test_moving_window_rejected_with_sqlite_storage(tmp_path):
+    env = {
+        **os.environ,
+        "RATE_LIMIT_STORAGE_URI": f"sqlite:///{tmp_path / 'rate_limits.sqlite'}",
+        "RATE_LIMIT_STRATEGY": "moving-window",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.core.rate_limit"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True
+    )
+    assert result.returncode != 0
+    assert "moving-window is not supported with sqlite:// storage" in result.stderr
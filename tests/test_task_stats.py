@@ -0,0 +1,72 @@
+"""
+The status counters (app/core/task_stats.py) are kept up to date by every
+task mutation. Random sequences of mutations through the API, rejected
+ones included, must leave them equal to a full recount of the tasks table.
+"""
+
+import random
+
+import pytest
+
+from app.core.task_stats import find_drift
+from app.db.database import engine
+
+STATUSES = ["DEV", "TEST", "STUCK", "COMPLETED"]
+STEPS = 120
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_counters_match_recount_after_random_mutations(manager, seed):
+    rng = random.Random(seed)
+    reportees = dict(manager.add_reportee(f"stats{seed}r{i}x") for i in range(3))
+    reportee_ids = list(reportees)
+    task_ids = []
+
+    def assignee():
+        return rng.choice([None, *reportee_ids])
+
+    def create():
+        response = manager.post("/tasks", json={"title": f"random task {len(task_ids)}", "assigned_to_id": assignee()})
+        task_ids.append(response.json()["id"])
+
+    def bulk_create():
+        response = manager.post("/tasks/bulk", json={"items": [
+            {"title": f"random task {len(task_ids)}-{i}", "assigned_to_id": assignee()} for i in range(rng.randint(1, 5))
+        ]})
+        task_ids.extend(result["id"] for result in response.json()["results"])
+
+    def assign():
+        return manager.patch(f"/tasks/{rng.choice(task_ids)}/assign", json={"assigned_to_id": rng.choice(reportee_ids)})
+
+    def bulk_assign():
+        return manager.patch("/tasks/bulk/assign", json={"items": [
+            {"task_id": task_id, "assigned_to_id": rng.choice(reportee_ids)}
+            for task_id in rng.sample(task_ids, min(len(task_ids), 4))
+        ]})
+
+    def set_status():
+        return manager.patch(f"/tasks/{rng.choice(task_ids)}/status", json={"status": rng.choice(STATUSES)})
+
+    def bulk_status():
+        return manager.patch("/tasks/bulk/status", json={"items": [
+            {"task_id": task_id, "status": rng.choice(STATUSES)}
+            for task_id in rng.sample(task_ids, min(len(task_ids), 4))
+        ]})
+
+    def self_status():
+        # Often not the reportee's task: a rejected update must not move any counter
+        reportee = reportees[rng.choice(reportee_ids)]
+        return reportee.patch(f"/tasks/{rng.choice(task_ids)}/self", json={"status": rng.choice(STATUSES)})
+
+    def delete():
+        return manager.delete(f"/tasks/{rng.choice(task_ids)}")
+
+    create()
+    mutations = [create, bulk_create, assign, bulk_assign, set_status, bulk_status, self_status, delete]
+    for _ in range(STEPS):
+        response = rng.choice(mutations)()
+        if response is not None:
+            assert response.status_code < 500, response.text
+
+    with engine.connect() as conn:
+        assert find_drift(conn) == {}